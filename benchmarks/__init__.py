@@ -0,0 +1,5 @@
+"""
+Benchmarks for the logging_http_client library.
+
+Each benchmark module is runnable on its own, e.g. ``python -m benchmarks.bench_hook_snapshots``.
+"""
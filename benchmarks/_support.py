@@ -0,0 +1,99 @@
+"""
+Shared helpers for the benchmarks.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+class CannedAdapter(BaseAdapter):
+    """
+    A transport adapter that answers every request with the same in-memory response,
+    so the benchmarks measure the library overhead rather than the network.
+    """
+
+    def __init__(self, status: int = 200, body: bytes = b"", headers: dict = None) -> None:
+        super().__init__()
+        self._status = status
+        self._body = body
+        self._headers = headers or {"Content-Type": "application/json"}
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        response = Response()
+        response.status_code = self._status
+        response._content = self._body
+        response.headers = CaseInsensitiveDict(self._headers)
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def time_per_call_us(fn: Callable[[], object], iterations: int, repeat: int = 5) -> float:
+    """
+    Time a callable and return the best (lowest) mean time per call in microseconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter_ns() - start) / iterations / 1000)
+    return best
+
+
+class LocalServer:
+    """
+    A threaded HTTP/1.1 server running in-process, answering every request (whatever its method)
+    after a fixed latency with a payload of a fixed size, so the benchmarks exercise the real
+    transport (sockets, connection pooling, chunking) without any network access.
+
+    Usage: ``with LocalServer(latency_ms=1, payload_size=1024) as server: requests.get(server.url)``
+    """
+
+    def __init__(self, latency_ms: float = 0.0, payload_size: int = 0) -> None:
+        latency_s = latency_ms / 1000
+        payload = b"x" * payload_size
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # The headers and payload are written separately, which Nagle's algorithm would delay by ~40ms.
+            disable_nagle_algorithm = True
+
+            def _answer(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                if latency_s:
+                    time.sleep(latency_s)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _answer
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "LocalServer":
+        threading.Thread(target=self._server.serve_forever, name="benchmark-server", daemon=True).start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._server.shutdown()
+        self._server.server_close()
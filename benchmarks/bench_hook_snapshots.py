@@ -0,0 +1,109 @@
+"""
+Compares the per-request overhead of handing the logging hooks a deep copy of the
+request/response (the previous behaviour) against the shared read-only snapshots.
+
+The absolute times per request are reported, along with the no-hooks baseline measured around
+each variant. The speedup (of the hooks overhead) is only reported when both overheads exceed
+the noise of the baseline.
+
+Usage: ``python -m benchmarks.bench_hook_snapshots [--iterations N] [--body-size BYTES]``
+"""
+
+import argparse
+import copy
+import logging
+
+from requests import PreparedRequest, Response
+
+import logging_http_client.logging_http_client_config_globals as config
+from benchmarks._support import CannedAdapter, time_per_call_us
+from logging_http_client.http_session import LoggingSession
+
+HOOK_COUNTS = (1, 3, 10)
+# The smallest difference between two timings that isn't reported as noise.
+MIN_NOISE_US = 1.0
+
+
+class DeepCopyLoggingSession(LoggingSession):
+    """
+    Reproduces the previous hook runners, which deep copied the request/response once per hook.
+    """
+
+    def _run_logging_request_hooks(self, request: PreparedRequest, *_, **__) -> None:
+        for hook in config.get_request_logging_hooks():
+            hook(self._logger, copy.deepcopy(request))
+
+    def _run_logging_response_hooks(self, response: Response, *_, **__) -> None:
+        for hook in config.get_response_logging_hooks():
+            hook(self._logger, copy.deepcopy(response))
+
+
+def reading_hook(_, exchange) -> None:
+    exchange.headers.get("x-request-id")
+
+
+def session_of(session_type: type, body: bytes) -> LoggingSession:
+    session = session_type("benchmark", logging.getLogger("benchmark"))
+    session.mount("http://", CannedAdapter(body=body))
+    return session
+
+
+def time_session_us(session: LoggingSession, body: bytes, iterations: int) -> float:
+    def send() -> object:
+        return session.get("http://bench.local/resource", data=body)
+
+    time_per_call_us(send, max(iterations // 10, 1), repeat=1)
+    return time_per_call_us(send, iterations)
+
+
+def time_no_hooks_us(session: LoggingSession, body: bytes, iterations: int) -> float:
+    config.set_request_logging_enabled(False)
+    config.set_response_logging_enabled(False)
+    try:
+        return time_session_us(session, body, iterations)
+    finally:
+        config.set_request_logging_enabled(True)
+        config.set_response_logging_enabled(True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--body-size", type=int, default=16 * 1024)
+    args = parser.parse_args()
+
+    body = b"x" * args.body_size
+    baseline = session_of(LoggingSession, body)
+
+    print(
+        f"{'hooks':>5} | {'no hooks (us)':>13} | {'deepcopy (us)':>13} | {'snapshot (us)':>13} | "
+        f"{'noise (us)':>10} | {'speedup':>7}"
+    )
+    for count in HOOK_COUNTS:
+        config.set_request_logging_hooks([reading_hook] * count)
+        config.set_response_logging_hooks([reading_hook] * count)
+
+        # The no-hooks baseline is measured around each variant, so a drift of the machine shows up as noise.
+        no_hooks_us = [time_no_hooks_us(baseline, body, args.iterations)]
+        variants_us = []
+        for session_type in (DeepCopyLoggingSession, LoggingSession):
+            variants_us.append(time_session_us(session_of(session_type, body), body, args.iterations))
+            no_hooks_us.append(time_no_hooks_us(baseline, body, args.iterations))
+
+        deepcopy_us, snapshot_us = variants_us
+        deepcopy_overhead_us = deepcopy_us - (no_hooks_us[0] + no_hooks_us[1]) / 2
+        snapshot_overhead_us = snapshot_us - (no_hooks_us[1] + no_hooks_us[2]) / 2
+        noise_us = max(max(no_hooks_us) - min(no_hooks_us), MIN_NOISE_US)
+        # The hooks overhead can't be compared when one of them is within the noise of the baseline.
+        if min(deepcopy_overhead_us, snapshot_overhead_us) > noise_us:
+            speedup = f"{deepcopy_overhead_us / snapshot_overhead_us:>6.1f}x"
+        else:
+            speedup = f"{'~':>7}"
+        print(
+            f"{count:>5} | {min(no_hooks_us):>13.1f} | {deepcopy_us:>13.1f} | {snapshot_us:>13.1f} | "
+            f"{noise_us:>10.1f} | {speedup}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares the per-record cost of logging an HTTP log record through a generic JSON formatter
+(which walks every attribute of the `LogRecord`, as most JSON logging libraries do) and a
+`StreamHandler`, against the `HttpJsonFormatter` and `BufferedJsonLineHandler` pair.
+
+Usage: ``python -m benchmarks.bench_json_logging [--iterations N]``
+"""
+
+import argparse
+import io
+import json
+import logging
+
+from benchmarks._support import time_per_call_us
+from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.logging_json import BufferedJsonLineHandler, HttpJsonFormatter, orjson
+
+# The attributes of every `LogRecord`, which generic JSON formatters skip when collecting the extra fields.
+RESERVED_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+
+class GenericJsonFormatter(logging.Formatter):
+    """
+    Reproduces a generic JSON formatter, serializing the standard fields and every extra attribute.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.message = record.getMessage()
+        document = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.message,
+        }
+        for name, value in record.__dict__.items():
+            if name not in RESERVED_ATTRIBUTES and not name.startswith("_"):
+                document[name] = value
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        return json.dumps(document, default=str)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    extra = HttpLogRecord(
+        request_id="01J9Z3K4X8N6T2VQ7R5W0YB1CD",
+        request_source="benchmark",
+        request_method="GET",
+        request_url="http://bench.local/resource?page=2",
+        request_headers={"Accept": "application/json", "User-Agent": "python-requests/2.32.3"},
+        response_status=200,
+        response_headers={"Content-Type": "application/json", "Content-Length": "512"},
+        response_duration_ms=12,
+        response_body_length=512,
+    ).to_extra()
+
+    def new_record() -> logging.LogRecord:
+        record = logging.LogRecord("benchmark", logging.INFO, __file__, 1, "RESPONSE", (), None)
+        record.__dict__.update(extra)
+        return record
+
+    generic = logging.StreamHandler(io.StringIO())
+    generic.setFormatter(GenericJsonFormatter())
+    stdlib = BufferedJsonLineHandler(io.StringIO(), formatter=HttpJsonFormatter(use_orjson=False))
+    handlers = {"generic": generic, "http-json": stdlib}
+    if orjson is not None:
+        handlers["http-json (orjson)"] = BufferedJsonLineHandler(io.StringIO())
+
+    # A new record is needed per call, as the formatted line is cached on the record.
+    record_us = time_per_call_us(new_record, args.iterations)
+    results = {}
+    for name, handler in handlers.items():
+        format_us = time_per_call_us(lambda: handler.format(new_record()), args.iterations) - record_us
+        handle_us = time_per_call_us(lambda: handler.handle(new_record()), args.iterations) - record_us
+        results[name] = (format_us, handle_us)
+
+    baseline = results["generic"][0]
+    print(f"{'formatter':>18} | {'format (us)':>11} | {'format + write (us)':>19} | {'format speedup':>14}")
+    for name, (format_us, handle_us) in results.items():
+        print(f"{name:>18} | {format_us:>11.2f} | {handle_us:>19.2f} | {baseline / max(format_us, 0.01):>13.1f}x")
+
+
+if __name__ == "__main__":
+    main()
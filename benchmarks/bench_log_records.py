@@ -0,0 +1,113 @@
+"""
+Compares the previous log record implementation (a `__dict__` dataclass serialized with
+`dataclasses.asdict`) against the slotted `HttpLogRecord`, in time and allocated memory.
+
+Usage: ``python -m benchmarks.bench_log_records [--iterations N]``
+"""
+
+import argparse
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+
+from benchmarks._support import time_per_call_us
+from logging_http_client.http_log_record import HttpLogRecord
+
+
+@dataclass
+class DictHttpLogRecord:
+    """
+    Reproduces the previous log record, with its `asdict` based serialization.
+    """
+
+    request_id: str = ""
+    request_source: str = ""
+    request_method: str = ""
+    request_url: str = ""
+    request_query_params: Dict[str, Any] = None
+    request_headers: Dict[str, Any] = None
+    request_body: str = ""
+    request_body_length: int = 0
+    response_source: str = None
+    response_status: int = 0
+    response_headers: Dict[str, Any] = None
+    response_duration_ms: int = 0
+    response_body: str = ""
+    response_body_length: int = 0
+    sampling_rate: float = 0.0
+    sampling_reason: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v not in (None, {}, [], "", 0, 0.0)}
+
+
+HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "Content-Type": "application/json",
+    "User-Agent": "python-requests/2.32.3",
+    "x-request-id": "01J9Z3K4X8N6T2VQ7R5W0YB1CD",
+    "x-source": "benchmark",
+}
+
+
+def build(record_type: type) -> Any:
+    record = record_type()
+    record.request_id = "01J9Z3K4X8N6T2VQ7R5W0YB1CD"
+    record.request_source = "benchmark"
+    record.response_source = "bench.local"
+    record.response_status = 200
+    record.response_headers = dict(HEADERS)
+    record.response_duration_ms = 12
+    record.response_body_length = 512
+    return record
+
+
+def build_and_serialize(record_type: type) -> Dict[str, Any]:
+    return {"http": build(record_type).to_dict()}
+
+
+def allocated_bytes(fn, count: int) -> float:
+    """
+    The memory allocated (and retained) by a call, on average.
+    """
+    tracemalloc.start()
+    retained = [fn() for _ in range(count)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return allocated / count
+
+
+def serialization_peak_bytes(record_type: type, count: int) -> float:
+    """
+    The peak memory allocated while serializing a record, on average.
+    """
+    records = [build(record_type) for _ in range(count)]
+    tracemalloc.start()
+    total = 0
+    for record in records:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        record.to_dict()
+        total += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return total / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'record':>8} | {'build + to_dict (us)':>20} | {'record (bytes)':>14} | {'to_dict peak (bytes)':>20}")
+    for name, record_type in (("asdict", DictHttpLogRecord), ("slotted", HttpLogRecord)):
+        elapsed_us = time_per_call_us(lambda: build_and_serialize(record_type), args.iterations)
+        record_bytes = allocated_bytes(record_type, args.iterations // 10)
+        peak_bytes = serialization_peak_bytes(record_type, args.iterations // 10)
+        print(f"{name:>8} | {elapsed_us:>20.2f} | {record_bytes:>14.0f} | {peak_bytes:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
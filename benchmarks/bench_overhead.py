@@ -0,0 +1,259 @@
+"""
+Measures what the logging client adds on top of a plain `requests.Session`, end to end, against
+an in-process local HTTP server (see `LocalServer`), i.e. through real sockets and connection pools.
+
+For each scenario, it reports:
+- the per-request overhead over its plain requests baseline, in microseconds (best mean of the repeats),
+- the peak memory allocated per request, and its overhead over the baseline, in KiB (with `tracemalloc`),
+- the throughput in requests per second, at each of the thread counts (one client per thread).
+
+The results can be written as JSON (``--output``), and compared against a previous run (``--baseline``):
+the script exits with status 1 if the overhead of a scenario regressed by more than the tolerance, so
+CI can flag the regressions.
+
+NOTE:
+    The server shares the process (and the GIL) with the clients, so the throughputs are lower than
+    against a remote server. Its share of the latency and allocations cancels out in the overheads.
+
+Usage: ``python -m benchmarks.bench_overhead [--iterations N] [--latency-ms MS] [--payload-size BYTES]
+[--threads 1,4,16] [--duration S] [--output FILE] [--baseline FILE] [--tolerance RATIO]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple
+
+import requests
+
+import logging_http_client
+from benchmarks._support import LocalServer, time_per_call_us
+from logging_http_client import RedactionRules
+
+# The number of requests whose allocations are measured, per scenario.
+ALLOCATION_SAMPLES = 200
+# The overhead regressions smaller than this are ignored, as they're within the noise of a run.
+MIN_REGRESSION_US = 5.0
+
+
+class Scenario(NamedTuple):
+    """
+    A way of sending the requests.
+
+    - new_client: Creates a client, i.e. anything with a `request(method, url, **kwargs)` method.
+    - baseline: The name of the scenario the overhead is measured against, or None for a baseline.
+    """
+
+    new_client: Callable[[logging.Logger], object]
+    baseline: str | None
+
+
+class _DisposableRequests:
+    # A new `requests.Session` per request, like the `requests.request` helper does.
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        with requests.Session() as session:
+            return session.request(method, url, **kwargs)
+
+
+REDACTOR = RedactionRules(
+    headers=("authorization", "cookie", "set-cookie"),
+    query_params=("api_key",),
+    json_fields=("password", "user.ssn"),
+    patterns=(r"\b\d{16}\b",),
+).compile()
+
+SCENARIOS: Dict[str, Scenario] = {
+    "requests": Scenario(lambda logger: requests.Session(), None),
+    "requests (disposable)": Scenario(lambda logger: _DisposableRequests(), None),
+    "default hooks": Scenario(lambda logger: logging_http_client.create(logger=logger), "requests"),
+    "body logging": Scenario(
+        lambda logger: logging_http_client.create(
+            logger=logger,
+            logging_config={"request_body_logging_enabled": True, "response_body_logging_enabled": True},
+        ),
+        "requests",
+    ),
+    "body logging + obscurers": Scenario(
+        lambda logger: logging_http_client.create(
+            logger=logger,
+            logging_config={
+                "request_body_logging_enabled": True,
+                "response_body_logging_enabled": True,
+                "request_log_record_obscurers": [REDACTOR],
+                "response_log_record_obscurers": [REDACTOR],
+            },
+        ),
+        "requests",
+    ),
+    "default hooks (disposable)": Scenario(
+        lambda logger: logging_http_client.create(logger=logger, reusable_session=False), "requests (disposable)"
+    ),
+}
+
+
+def benchmark_logger() -> logging.Logger:
+    # The records are formatted and written, like they would be in production, but to /dev/null.
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = logging.StreamHandler(open(os.devnull, "w"))
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s %(http)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+def peak_allocation_kib(send: Callable[[], object], samples: int) -> float:
+    """
+    Get the mean peak memory allocated by a call, in KiB.
+    """
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            send()
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+        return total / samples / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def throughput(scenario: Scenario, logger: logging.Logger, url: str, body: bytes, threads: int, duration: float):
+    """
+    Get the number of requests per second sent by a number of threads, each with its own client.
+    """
+    clients = [scenario.new_client(logger) for _ in range(threads)]
+    counts = [0] * threads
+    start = threading.Barrier(threads + 1)
+    deadline = 0.0
+
+    def run(index: int) -> None:
+        client = clients[index]
+        start.wait()
+        count = 0
+        while time.perf_counter() < deadline:
+            client.request("POST", url, data=body)
+            count += 1
+        counts[index] = count
+
+    workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    deadline = time.perf_counter() + duration
+    start.wait()
+    began = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - began)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    logger = benchmark_logger()
+    body = json.dumps({"user": {"name": "Jane", "ssn": "123-45-6789"}, "password": "secret"}).encode()
+    results: Dict[str, Dict[str, float]] = {}
+
+    with LocalServer(latency_ms=args.latency_ms, payload_size=args.payload_size) as server:
+        url = f"{server.url}/resource?page=2"
+        for name, scenario in SCENARIOS.items():
+            client = scenario.new_client(logger)
+
+            def send() -> object:
+                return client.request("POST", url, data=body, headers={"Authorization": "Bearer token"})
+
+            time_per_call_us(send, args.iterations // 10, repeat=1)
+            result = {
+                "latency_us": time_per_call_us(send, args.iterations),
+                "peak_alloc_kib": peak_allocation_kib(send, min(args.iterations, ALLOCATION_SAMPLES)),
+            }
+            if scenario.baseline is not None:
+                baseline = results[scenario.baseline]
+                result["overhead_us"] = result["latency_us"] - baseline["latency_us"]
+                result["alloc_overhead_kib"] = result["peak_alloc_kib"] - baseline["peak_alloc_kib"]
+            for threads in args.threads:
+                result[f"throughput_rps_{threads}t"] = throughput(scenario, logger, url, body, threads, args.duration)
+            results[name] = {key: round(value, 2) for key, value in result.items()}
+    return results
+
+
+def regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float):
+    """
+    Get the scenarios whose overhead regressed by more than the tolerance (and the noise floor) since the baseline.
+    """
+    regressed: List[str] = []
+    for name, result in results.items():
+        previous = baseline.get(name, {}).get("overhead_us")
+        current = result.get("overhead_us")
+        if previous is None or current is None:
+            continue
+        if current - previous > max(previous * tolerance, MIN_REGRESSION_US):
+            regressed.append(f"{name}: {previous:.1f}us -> {current:.1f}us")
+    return regressed
+
+
+def print_results(results: Dict[str, Dict[str, float]], threads: List[int]) -> None:
+    columns = ["latency_us", "overhead_us", "peak_alloc_kib", "alloc_overhead_kib"]
+    columns += [f"throughput_rps_{count}t" for count in threads]
+    headers = ["latency (us)", "overhead (us)", "alloc (KiB)", "alloc overhead (KiB)"]
+    headers += [f"rps @{count} threads" for count in threads]
+
+    print(f"{'scenario':>26} | " + " | ".join(headers))
+    for name, result in results.items():
+        cells = [
+            f"{result[column]:>{len(header)}.1f}" if column in result else " " * len(header)
+            for column, header in zip(columns, headers)
+        ]
+        print(f"{name:>26} | " + " | ".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=1024)
+    parser.add_argument("--threads", type=lambda value: [int(count) for count in value.split(",")], default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=2.0, help="The duration of each throughput run, in seconds.")
+    parser.add_argument("--output", help="The file to write the results to, as JSON.")
+    parser.add_argument("--baseline", help="The JSON results of a previous run, to check the overheads against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="The tolerated overhead regression ratio.")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_results(results, args.threads)
+
+    if args.output:
+        report = {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "parameters": {
+                "iterations": args.iterations,
+                "latency_ms": args.latency_ms,
+                "payload_size": args.payload_size,
+                "threads": args.threads,
+                "duration": args.duration,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressed = regressions(results, json.load(file)["results"], args.tolerance)
+        if regressed:
+            print("Overhead regressions:\n  " + "\n  ".join(regressed))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compares a chain of obscurer callables (one per concern, as typically written by hand) against
+the equivalent compiled redaction rules, on the same log record.
+
+Usage: ``python -m benchmarks.bench_redaction [--iterations N]``
+"""
+
+import argparse
+import copy
+import json
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from benchmarks._support import time_per_call_us
+from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.logging_redaction import RedactionRules
+
+SECRET_HEADERS = ("authorization", "cookie", "set-cookie", "x-api-key")
+SECRET_PARAMS = ("api_key", "token")
+SECRET_FIELDS = ("password", "user.ssn", "cards.*.number")
+SECRET_PATTERNS = (r"\b\d{16}\b", r"sk_live_\w+")
+
+
+def headers_obscurer(record: HttpLogRecord) -> HttpLogRecord:
+    for headers in (record.request_headers, record.response_headers):
+        for key in list(headers or {}):
+            if key.lower() in SECRET_HEADERS:
+                headers[key] = "****"
+    return record
+
+
+def query_params_obscurer(record: HttpLogRecord) -> HttpLogRecord:
+    parts = urlsplit(record.request_url)
+    params = [(k, "****" if k.lower() in SECRET_PARAMS else v) for k, v in parse_qsl(parts.query)]
+    record.request_url = urlunsplit(parts._replace(query=urlencode(params)))
+    return record
+
+
+def password_obscurer(record: HttpLogRecord) -> HttpLogRecord:
+    body = json.loads(record.request_body)
+    if "password" in body:
+        body["password"] = "****"
+    record.request_body = json.dumps(body)
+    return record
+
+
+def nested_fields_obscurer(record: HttpLogRecord) -> HttpLogRecord:
+    body = json.loads(record.request_body)
+    if "ssn" in body.get("user", {}):
+        body["user"]["ssn"] = "****"
+    for card in body.get("cards", []):
+        card["number"] = "****"
+    record.request_body = json.dumps(body)
+    return record
+
+
+def patterns_obscurer(record: HttpLogRecord) -> HttpLogRecord:
+    for pattern in SECRET_PATTERNS:
+        record.request_url = re.sub(pattern, "****", record.request_url)
+        record.request_body = re.sub(pattern, "****", record.request_body)
+    return record
+
+
+CHAIN = [headers_obscurer, query_params_obscurer, password_obscurer, nested_fields_obscurer, patterns_obscurer]
+
+
+def given_record() -> HttpLogRecord:
+    record = HttpLogRecord()
+    record.request_url = "https://api.example.com/v1/payments?api_key=secret&page=2&token=abc"
+    record.request_headers = {
+        "Authorization": "Bearer secret",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "User-Agent": "python-requests/2.32.3",
+        "x-request-id": "01J9Z3K4X8N6T2VQ7R5W0YB1CD",
+    }
+    record.response_headers = {"Content-Type": "application/json", "Set-Cookie": "session=secret"}
+    record.request_body = json.dumps(
+        {
+            "user": {"name": "bob", "ssn": "123-45-6789"},
+            "password": "secret",
+            "cards": [{"number": "4111111111111111", "expiry": "12/30"}] * 3,
+            "note": "key sk_live_abc123",
+            "items": [{"sku": f"item-{i}", "quantity": i} for i in range(20)],
+        }
+    )
+    return record
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    args = parser.parse_args()
+
+    redactor = RedactionRules(SECRET_HEADERS, SECRET_PARAMS, SECRET_FIELDS, SECRET_PATTERNS).compile()
+    template = given_record()
+    records = [copy.deepcopy(template) for _ in range(args.iterations)]
+
+    def run_chain() -> None:
+        record = records.pop()
+        for obscurer in CHAIN:
+            record = obscurer(record)
+
+    def run_redactor() -> None:
+        redactor(records.pop())
+
+    copy_us = time_per_call_us(lambda: records.pop(), args.iterations, repeat=1)
+    results = {}
+    for name, run in (("chain", run_chain), ("compiled", run_redactor)):
+        best = float("inf")
+        for _ in range(5):
+            records = [copy.deepcopy(template) for _ in range(args.iterations)]
+            best = min(best, time_per_call_us(run, args.iterations, repeat=1) - copy_us)
+        results[name] = best
+
+    print(f"{'obscurers':>9} | {'per record (us)':>15}")
+    print(f"{'chain':>9} | {results['chain']:>15.1f}")
+    print(f"{'compiled':>9} | {results['compiled']:>15.1f}")
+    print(f"speedup: {results['chain'] / max(results['compiled'], 0.1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
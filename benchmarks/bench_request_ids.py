@@ -0,0 +1,43 @@
+"""
+Compares the cost of the built-in request ID providers, i.e. the `x-request-id` generators,
+on their own and as part of preparing a request.
+
+Usage: ``python -m benchmarks.bench_request_ids [--iterations N]``
+"""
+
+import argparse
+import logging
+
+from requests import Request
+
+import logging_http_client.logging_http_client_config_globals as config
+from benchmarks._support import time_per_call_us
+from logging_http_client.http_request_id import CounterRequestIdGenerator, UlidRequestIdGenerator, uuid4_request_id
+from logging_http_client.http_session import LoggingSession
+
+PROVIDERS = {
+    "uuid4": uuid4_request_id,
+    "ulid": UlidRequestIdGenerator(),
+    "counter": CounterRequestIdGenerator(),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    session = LoggingSession("benchmark", logging.getLogger("benchmark"))
+    request = Request("GET", "http://bench.local/resource")
+
+    print(f"{'provider':>8} | {'id (us)':>8} | {'prepare_request (us)':>20} | {'example'}")
+    for name, provider in PROVIDERS.items():
+        config.set_request_id_provider(provider)
+        id_us = time_per_call_us(provider, args.iterations)
+        prepare_us = time_per_call_us(lambda: session.prepare_request(request), args.iterations // 10)
+        print(f"{name:>8} | {id_us:>8.3f} | {prepare_us:>20.2f} | {provider()}")
+    config.set_request_id_provider(None)
+
+
+if __name__ == "__main__":
+    main()
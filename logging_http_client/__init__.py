@@ -36,58 +36,136 @@ The other HTTP methods are supported - see `requests.api`.
 Full documentation is at <https://requests.readthedocs.io>.
 """
 
+from __future__ import annotations
+
+import importlib
 import logging
-from typing import Mapping
-
-# noinspection PyUnresolvedReferences
-from requests import packages, utils  # noqa: F401
-
-# noinspection PyUnresolvedReferences
-from requests.exceptions import (  # noqa: F401
-    ConnectionError,
-    ConnectTimeout,
-    FileModeWarning,
-    HTTPError,
-    JSONDecodeError,
-    ReadTimeout,
-    RequestException,
-    Timeout,
-    TooManyRedirects,
-    URLRequired,
-)
-
-# noinspection PyUnresolvedReferences
-from requests.models import PreparedRequest, Request, Response  # noqa: F401
-
-# noinspection PyUnresolvedReferences
-from requests.sessions import Session, session  # noqa: F401
-
-# noinspection PyUnresolvedReferences
-from requests.status_codes import codes  # noqa: F401
-
-from .logging_default_hooks import default_request_logging_hook, default_response_logging_hook
-from .http_log_record import HttpLogRecord  # noqa: F401
-from .logging_http_client_class import LoggingHttpClient
-from .logging_http_client_config import (  # noqa: F401
-    set_correlation_id_provider,
-    set_request_log_record_obscurers,
-    set_response_log_record_obscurers,
-    set_request_log_record_obscurer,
-    set_response_log_record_obscurer,
-    set_request_logging_hooks,
-    set_response_logging_hooks,
-    set_custom_request_logging_hook,
-    set_custom_response_logging_hook,
-    disable_request_logging,
-    disable_response_logging,
-    enable_request_body_logging,
-    enable_response_body_logging,
-    set_default_hooks_logging_level,
-)
-
-set_default_hooks_logging_level(logging.INFO)
-set_request_logging_hooks([default_request_logging_hook])
-set_response_logging_hooks([default_response_logging_hook])
+import sys
+from typing import TYPE_CHECKING, Any, Mapping
+
+if TYPE_CHECKING:
+    from requests import Response
+
+    from .logging_config_scope import LoggingConfigScope
+    from .logging_http_client_class import LoggingHttpClient
+
+# The re-exported names, by the module they're imported from on first access, see `__getattr__`.
+#
+# Nothing is imported with the package itself (not even requests), so importing it is cheap for
+# the short-lived processes (e.g. CLI tools and serverless functions), which may never send a request.
+_LAZY_ATTRIBUTES = {
+    **dict.fromkeys(("packages", "utils"), "requests"),
+    **dict.fromkeys(
+        (
+            "ConnectionError",
+            "ConnectTimeout",
+            "FileModeWarning",
+            "HTTPError",
+            "JSONDecodeError",
+            "ReadTimeout",
+            "RequestException",
+            "Timeout",
+            "TooManyRedirects",
+            "URLRequired",
+        ),
+        "requests.exceptions",
+    ),
+    **dict.fromkeys(("PreparedRequest", "Request", "Response"), "requests.models"),
+    **dict.fromkeys(("Session", "session"), "requests.sessions"),
+    "codes": "requests.status_codes",
+    **dict.fromkeys(("default_request_logging_hook", "default_response_logging_hook"), ".logging_default_hooks"),
+    **dict.fromkeys(("BatchResult", "RequestSpec"), ".http_batch"),
+    **dict.fromkeys(("BINARY_CONTENT_TYPES", "BodyCapturePolicy"), ".http_body_policy"),
+    **dict.fromkeys(("HttpBatchLogRecord", "HttpLogRecord"), ".http_log_record"),
+    **dict.fromkeys(("NormalizedUrl", "RouteNormalizer"), ".http_route"),
+    **dict.fromkeys(("SessionPool", "SessionPoolTimeout"), ".http_session_pool"),
+    **dict.fromkeys(("CounterRequestIdGenerator", "UlidRequestIdGenerator"), ".http_request_id"),
+    **dict.fromkeys(("FrozenHeaders", "HttpRequestSnapshot", "HttpResponseSnapshot"), ".http_snapshot"),
+    **dict.fromkeys(("ConnectionTimings", "ExchangeDurations", "TimingHTTPAdapter"), ".http_timing"),
+    **dict.fromkeys(
+        ("get_default_client", "configure_default_client", "reset_default_client"), ".logging_default_client"
+    ),
+    "LogAggregator": ".logging_aggregation",
+    "LogRateLimiter": ".logging_rate_limit",
+    **dict.fromkeys(("LogEmissionPipeline", "OverflowPolicy"), ".logging_emission_pipeline"),
+    "LoggingConfigScope": ".logging_config_scope",
+    "LoggingHttpClient": ".logging_http_client_class",
+    "AsyncLoggingHttpClient": ".logging_http_client_async_class",
+    "LoggingConfig": ".logging_http_client_config_globals",
+    **dict.fromkeys(("BufferedJsonLineHandler", "HttpJsonFormatter"), ".logging_json"),
+    **dict.fromkeys(("LatencyHistogram", "MetricsRecorder", "SeriesKey"), ".logging_metrics"),
+    **dict.fromkeys(("RedactionRules", "Redactor"), ".logging_redaction"),
+    **dict.fromkeys(
+        ("Sampler", "SamplingDecision", "RateSampler", "RouteRateSampler", "TailSampler"), ".logging_sampling"
+    ),
+    **dict.fromkeys(
+        (
+            "set_correlation_id_provider",
+            "set_request_id_provider",
+            "set_request_log_record_obscurers",
+            "set_response_log_record_obscurers",
+            "set_request_log_record_obscurer",
+            "set_response_log_record_obscurer",
+            "set_request_logging_hooks",
+            "set_response_logging_hooks",
+            "set_custom_request_logging_hook",
+            "set_custom_response_logging_hook",
+            "disable_request_logging",
+            "disable_response_logging",
+            "enable_request_body_logging",
+            "enable_response_body_logging",
+            "enable_connection_timings",
+            "set_default_hooks_logging_level",
+            "set_request_body_capture_policy",
+            "set_response_body_capture_policy",
+            "set_response_stream_capture_limit",
+            "set_logging_sampler",
+            "set_metrics_recorder",
+            "set_route_normalizer",
+            "get_logging_config",
+            "enable_async_logging",
+            "disable_async_logging",
+            "enable_log_aggregation",
+            "disable_log_aggregation",
+            "enable_log_rate_limit",
+            "disable_log_rate_limit",
+        ),
+        ".logging_http_client_config",
+    ),
+}
+
+# The re-exported names whose module needs an optional dependency (e.g. httpx, see the ``async`` extra), left out of
+# `__all__`, so `from logging_http_client import *` doesn't raise without it: they're imported by name instead.
+_OPTIONAL_ATTRIBUTES = frozenset({"AsyncLoggingHttpClient"})
+
+__all__ = [
+    *(name for name in _LAZY_ATTRIBUTES if name not in _OPTIONAL_ATTRIBUTES),
+    "create",
+    "create_async",
+    "request",
+    "get",
+    "post",
+    "put",
+    "delete",
+    "patch",
+    "head",
+    "options",
+]
+
+
+def __getattr__(name: str):
+    # The re-exported names are imported on first access, e.g. the asyncio client, whose httpx dependency is optional.
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cached as a global, so the next accesses don't go through `__getattr__`.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 
 def create(
@@ -95,34 +173,90 @@ def create(
     reusable_session: bool = True,
     logger: logging.Logger = logging.getLogger(),
     shared_headers: Mapping[str, str | bytes] = None,
+    logging_config: LoggingConfigScope | Mapping[str, Any] = None,
+    session_pool_size: int | None = None,
+    session_pool_timeout: float | None = None,
 ) -> LoggingHttpClient:
     """
     Factory function to create a new logging HTTP client instance.
 
+    NOTE:
+        The `logging_config` overrides some fields of the global configuration for this client only
+        (e.g. ``{"response_body_logging_enabled": True}``), the other fields following the global ones.
+
     :param source: The source of the request. This is used to identify the source/system of the request.
     :param reusable_session: Whether to use a reusable session for all requests.
     :param logger: The logger to use for logging requests and responses.
     :param shared_headers: The headers to include with every request.
+    :param logging_config: The client's overrides of the global configuration, see `LoggingConfigScope`.
+    :param session_pool_size: The maximum number of pooled sessions, the requests checking out a session of the pool
+        (i.e. a warm one, used by a single thread at a time) rather than using a reusable (or new) session.
+    :param session_pool_timeout: The maximum time to wait for a pooled session, in seconds.
     :return: A new LoggingHttpClient instance.
     """
+    from .logging_http_client_class import LoggingHttpClient
+
     return LoggingHttpClient(
         source=source,
         logger=logger,
         reusable_session=reusable_session,
         shared_headers=shared_headers,
+        logging_config=logging_config,
+        session_pool_size=session_pool_size,
+        session_pool_timeout=session_pool_timeout,
     )
 
 
+def create_async(
+    source: str = None,
+    logger: logging.Logger = logging.getLogger(),
+    shared_headers: Mapping[str, str | bytes] = None,
+    logging_config: LoggingConfigScope | Mapping[str, Any] = None,
+    **kwargs,
+):
+    """
+    Factory function to create a new asyncio logging HTTP client instance.
+
+    NOTE:
+        The asyncio client requires the httpx library, i.e. the ``async`` extra:
+        ``pip install 'logging-http-client[async]'``.
+
+    :param source: The source of the request. This is used to identify the source/system of the request.
+    :param logger: The logger to use for logging requests and responses.
+    :param shared_headers: The headers to include with every request.
+    :param logging_config: The client's overrides of the global configuration, see `LoggingConfigScope`.
+    :param kwargs: Additional arguments to pass to :class:`httpx.AsyncClient` (e.g. `limits` or `timeout`).
+    :return: A new AsyncLoggingHttpClient instance.
+    """
+    from .logging_http_client_async_class import AsyncLoggingHttpClient
+
+    return AsyncLoggingHttpClient(
+        source=source,
+        logger=logger,
+        shared_headers=shared_headers,
+        logging_config=logging_config,
+        **kwargs,
+    )
+
+
+def _default_client() -> LoggingHttpClient:
+    # Looked up as an attribute of the package, i.e. imported on first use.
+    return sys.modules[__name__].get_default_client()
+
+
 def request(method, url, **kwargs) -> Response:
     """
     Sends a request to the specified URL.
 
+    All the module-level request helpers share the process-wide default client,
+    so connections are pooled across calls, see `configure_default_client`.
+
     :param method: The HTTP method to use.
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).request(method, url, **kwargs)
+    return _default_client().request(method, url, **kwargs)
 
 
 def get(url: str, **kwargs) -> Response:
@@ -131,9 +265,9 @@ def get(url: str, **kwargs) -> Response:
 
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).get(url, **kwargs)
+    return _default_client().get(url, **kwargs)
 
 
 def post(url: str, **kwargs) -> Response:
@@ -142,9 +276,9 @@ def post(url: str, **kwargs) -> Response:
 
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).post(url, **kwargs)
+    return _default_client().post(url, **kwargs)
 
 
 def put(url: str, **kwargs) -> Response:
@@ -153,9 +287,9 @@ def put(url: str, **kwargs) -> Response:
 
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).put(url, **kwargs)
+    return _default_client().put(url, **kwargs)
 
 
 def delete(url: str, **kwargs) -> Response:
@@ -164,9 +298,9 @@ def delete(url: str, **kwargs) -> Response:
 
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).delete(url, **kwargs)
+    return _default_client().delete(url, **kwargs)
 
 
 def patch(url: str, **kwargs) -> Response:
@@ -175,9 +309,9 @@ def patch(url: str, **kwargs) -> Response:
 
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).patch(url, **kwargs)
+    return _default_client().patch(url, **kwargs)
 
 
 def head(url: str, **kwargs) -> Response:
@@ -186,9 +320,9 @@ def head(url: str, **kwargs) -> Response:
 
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).head(url, **kwargs)
+    return _default_client().head(url, **kwargs)
 
 
 def options(url: str, **kwargs) -> Response:
@@ -197,6 +331,6 @@ def options(url: str, **kwargs) -> Response:
 
     :param url: The URL to send the request to.
     :param kwargs: Additional arguments to pass to the request method.
-    :return: A new LoggingHttpClient instance.
+    :return: The response.
     """
-    return create(reusable_session=False).options(url, **kwargs)
+    return _default_client().options(url, **kwargs)
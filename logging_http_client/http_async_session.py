@@ -0,0 +1,428 @@
+"""
+This module contains the asyncio counterpart of :class:`logging_http_client.http_session.LoggingSession`.
+
+It's built on top of the httpx library (an optional dependency, i.e. the ``async`` extra). The
+httpx requests and responses are converted into their requests counterparts before applying the
+logging hooks, so the same hooks, obscurers and sampler are shared by both clients.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from concurrent.futures import Executor
+from datetime import timedelta
+from logging import Logger
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Sequence
+
+from requests import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+from typing_extensions import override
+
+try:
+    import httpx
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "The async client requires httpx, install it with: pip install 'logging-http-client[async]'"
+    ) from e
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_headers import missing_observability_headers
+from logging_http_client.http_snapshot import HttpRequestSnapshot, HttpResponseSnapshot
+from logging_http_client.http_stream_capture import ResponseStreamCapture
+from logging_http_client.http_timing import ExchangeDurations, to_ms
+from logging_http_client.logging_config_scope import LoggingConfigScope
+from logging_http_client.logging_default_hooks import default_error_logging_hook
+from logging_http_client.logging_http_client_config_globals import LoggingConfig
+from logging_http_client.logging_metrics import MetricsRecorder
+from logging_http_client.logging_sampling import EXCEPTION, Sampler, SamplingDecision
+
+# The keys of the per-exchange state kept in the httpx request extensions (shared by its redirects).
+_SAMPLER_EXTENSION = "logging_http_client.sampler"
+_DECISION_EXTENSION = "logging_http_client.sampling"
+_STREAM_EXTENSION = "logging_http_client.stream"
+_SENT_AT_EXTENSION = "logging_http_client.sent_at"
+_OVERHEAD_EXTENSION = "logging_http_client.overhead"
+_CONFIG_EXTENSION = "logging_http_client.config"
+
+DEFAULT_ASYNC_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+
+
+class AsyncLoggingSession(httpx.AsyncClient):
+    """
+    A subclass of :class:`httpx.AsyncClient` that adds the observability headers to the requests,
+    and applies the logging hooks to every request/response exchange (redirects included).
+    """
+
+    _logger: Logger
+    _source: str | None
+    _hook_executor: Executor | None
+    _resolve_config: Callable[[], LoggingConfig]
+
+    def __init__(
+        self,
+        source: str | None,
+        logger: Logger,
+        hook_executor: Executor | None = None,
+        config_scope: LoggingConfigScope | None = None,
+        **kwargs,
+    ) -> None:
+        """
+        :param source: The source of the requests.
+        :param logger: The logger to use for logging requests and responses.
+        :param hook_executor: The executor running the (synchronous) logging hooks, defaults to the loop's one.
+        :param config_scope: The configuration scope of the session, defaults to the global configuration.
+        :param kwargs: Additional arguments to pass to :class:`httpx.AsyncClient`.
+        """
+        kwargs.setdefault("limits", DEFAULT_ASYNC_LIMITS)
+        super().__init__(**kwargs)
+        config.install_default_hooks()
+
+        self._source = source
+        self._logger = logger
+        self._hook_executor = hook_executor
+        # Resolved once, so the exchanges don't look the scope up.
+        self._resolve_config = config_scope.resolve if config_scope is not None else config.get_config
+
+        event_hooks = self.event_hooks
+        self.event_hooks = {
+            "request": [*event_hooks["request"], self._on_request],
+            "response": [self._on_response, *event_hooks["response"]],
+        }
+
+    @override
+    def build_request(self, method, url, **kwargs) -> httpx.Request:
+        """
+        Builds the request by adding the observability headers to the request.
+
+        NOTE:
+            The observability headers are added to the request if they do NOT exist
+            in the request headers, exactly like :meth:`LoggingSession.prepare_request`.
+            If an exception occurs during the preparation of the request, we catch the
+            exception and log it to avoid disturbing the request flow.
+        """
+        request = super().build_request(method, url, **kwargs)
+        try:
+            settings = self._resolve_config()
+            request.headers.update(
+                missing_observability_headers(
+                    request.headers,
+                    self._source,
+                    settings.request_id_provider,
+                    settings.correlation_id_provider,
+                )
+            )
+        except Exception as e:
+            self._logger.exception("Error preparing observability request headers", exc_info=e)
+        return request
+
+    @override
+    async def send(self, request: httpx.Request, *, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        We override the send method to apply the exception tail sampling rule, the request
+        and response logging hooks being applied by the client's event hooks.
+
+        NOTE:
+            The synchronous logging hooks are run in an executor, while the async ones (i.e.
+            coroutine functions) are awaited, so the hooks never block the event loop.
+
+            For streamed responses (i.e. `stream=True`), the response hooks are applied once the
+            stream is exhausted or closed, with the body captured while the caller consumed it,
+            exactly like :class:`LoggingSession`.
+
+            When a metrics recorder is set, every exchange (sampled or not) is recorded once,
+            redirects included.
+        """
+        request.extensions[_STREAM_EXTENSION] = stream
+        recorder: MetricsRecorder | None = self._resolve_config().metrics_recorder
+        started_at = time.perf_counter_ns()
+        try:
+            response = await super().send(request, stream=stream, **kwargs)
+        except Exception as e:
+            if recorder is not None:
+                self._record_metrics(recorder, request, None, time.perf_counter_ns() - started_at)
+            settings: LoggingConfig | None = request.extensions.get(_CONFIG_EXTENSION)
+            if settings is None or settings.logs_nothing:
+                # The request hooks weren't applied.
+                raise
+            sampler: Sampler | None = request.extensions.get(_SAMPLER_EXTENSION)
+            decision: SamplingDecision | None = request.extensions.get(_DECISION_EXTENSION)
+            prepared_request = to_prepared_request(request)
+            if decision is not None and (sampler.has_tail_rules or not decision.sampled):
+                if sampler.keep_exception(decision, e):
+                    decision = decision.kept_by(EXCEPTION)
+                elif not decision.sampled:
+                    raise
+                await self._run_logging_request_hooks(prepared_request, settings, decision)
+            sent_at = request.extensions.get(_SENT_AT_EXTENSION, started_at)
+            await self._run_logging_error_hooks(
+                prepared_request, settings, e, decision, time.perf_counter_ns() - sent_at
+            )
+            raise
+        if recorder is not None:
+            self._record_metrics(recorder, request, response.status_code, time.perf_counter_ns() - started_at)
+        return response
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        # The configuration is read once per exchange, and kept along with the other exchange state.
+        settings = request.extensions[_CONFIG_EXTENSION] = self._resolve_config()
+        if settings.logs_nothing:
+            return
+
+        started_at = time.perf_counter_ns()
+        prepared_request = to_prepared_request(request)
+
+        sampler = settings.logging_sampler
+        decision = None
+        if sampler is not None:
+            decision = self._sample_request(sampler, prepared_request)
+            request.extensions[_SAMPLER_EXTENSION] = sampler
+        request.extensions[_DECISION_EXTENSION] = decision
+
+        # With tail rules, the request records wait for the final decision, see `SamplingDecision.rate`.
+        if decision is None or (decision.sampled and not sampler.has_tail_rules):
+            await self._run_logging_request_hooks(prepared_request, settings, decision)
+
+        sent_at = request.extensions[_SENT_AT_EXTENSION] = time.perf_counter_ns()
+        request.extensions[_OVERHEAD_EXTENSION] = sent_at - started_at
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        received_at = time.perf_counter_ns()
+        request = response.request
+        extensions = request.extensions
+        settings: LoggingConfig = extensions.get(_CONFIG_EXTENSION) or self._resolve_config()
+        if settings.logs_nothing or (not settings.logs_responses and extensions.get(_SAMPLER_EXTENSION) is None):
+            return
+
+        streamed = extensions.get(_STREAM_EXTENSION, False)
+        if not streamed:
+            await response.aread()
+        read_at = time.perf_counter_ns()
+
+        sent_at = extensions.get(_SENT_AT_EXTENSION, received_at)
+        elapsed = timedelta(microseconds=(received_at - sent_at) // 1000)
+        prepared_request = to_prepared_request(request)
+        converted = to_response(response, prepared_request, elapsed)
+
+        sampler: Sampler | None = extensions.get(_SAMPLER_EXTENSION)
+        decision: SamplingDecision | None = extensions.get(_DECISION_EXTENSION)
+        if decision is not None:
+            final_decision = self._sample_response(sampler, decision, converted)
+            if not final_decision.sampled:
+                return
+            if sampler.has_tail_rules or not decision.sampled:
+                await self._run_logging_request_hooks(prepared_request, settings, final_decision)
+            decision = final_decision
+
+        if streamed:
+            self._capture_streamed_response(response, converted, settings, decision, sent_at, received_at)
+            return
+
+        durations = ExchangeDurations(
+            headers_ms=to_ms(received_at - sent_at),
+            total_ms=to_ms(read_at - sent_at),
+            logging_overhead_ms=to_ms(extensions.get(_OVERHEAD_EXTENSION, 0) + time.perf_counter_ns() - read_at),
+        )
+        await self._run_logging_response_hooks(converted, settings, decision, durations)
+
+    def _capture_streamed_response(
+        self,
+        response: httpx.Response,
+        converted: Response,
+        settings: LoggingConfig,
+        sampling: SamplingDecision = None,
+        sent_at: int = 0,
+        received_at: int = 0,
+    ) -> None:
+        if not settings.logs_responses:
+            return
+        max_bytes = settings.response_stream_capture_limit if settings.response_body_logging_enabled else 0
+        overhead_ns = response.request.extensions.get(_OVERHEAD_EXTENSION, 0)
+
+        async def on_complete(capture: ResponseStreamCapture) -> None:
+            # The total covers the consumption of the stream by the caller.
+            durations = ExchangeDurations(
+                headers_ms=to_ms(received_at - sent_at),
+                total_ms=to_ms(time.perf_counter_ns() - sent_at),
+                logging_overhead_ms=to_ms(overhead_ns),
+            )
+            await self._run_logging_response_hooks(converted, settings, sampling, durations, capture)
+
+        response.stream = _TeeByteStream(response.stream, max_bytes, on_complete)
+
+    def _record_metrics(
+        self,
+        recorder: MetricsRecorder,
+        request: httpx.Request,
+        status_code: int | None,
+        duration_ns: int,
+    ) -> None:
+        try:
+            recorder.record(to_prepared_request(request), status_code, duration_ns)
+        except Exception as e:
+            self._logger.exception("Error recording exchange metrics", exc_info=e)
+
+    def _sample_request(self, sampler: Sampler, request: PreparedRequest) -> SamplingDecision | None:
+        try:
+            return sampler.sample_request(request)
+        except Exception as e:
+            self._logger.exception("Error sampling request", exc_info=e)
+            return None
+
+    def _sample_response(self, sampler: Sampler, decision: SamplingDecision, response: Response) -> SamplingDecision:
+        try:
+            return sampler.sample_response(decision, response)
+        except Exception as e:
+            self._logger.exception("Error sampling response", exc_info=e)
+            return decision
+
+    async def _run_logging_request_hooks(
+        self,
+        request: PreparedRequest,
+        settings: LoggingConfig | None = None,
+        sampling: SamplingDecision = None,
+    ) -> None:
+        if settings is None:
+            settings = self._resolve_config()
+        if settings.logs_requests:
+            try:
+                snapshot = HttpRequestSnapshot(request, sampling, settings)
+                await self._apply_hooks(settings.request_logging_hooks, snapshot)
+            except Exception as e:
+                self._logger.exception("Error applying request logging hooks", exc_info=e)
+
+    async def _run_logging_error_hooks(
+        self,
+        request: PreparedRequest,
+        settings: LoggingConfig,
+        error: BaseException,
+        sampling: SamplingDecision = None,
+        duration_ns: int = 0,
+    ) -> None:
+        # Only the aggregation mode of the default hooks logs the raised exchanges, see `default_error_logging_hook`.
+        if settings.logs_requests and settings.log_aggregator is not None:
+            try:
+                snapshot = HttpRequestSnapshot(request, sampling, settings)
+                duration_ms = to_ms(duration_ns)
+                await self._run_in_executor(
+                    [lambda logger, exchange: default_error_logging_hook(logger, exchange, error, duration_ms)],
+                    snapshot,
+                )
+            except Exception as e:
+                self._logger.exception("Error applying error logging hooks", exc_info=e)
+
+    async def _run_logging_response_hooks(
+        self,
+        response: Response,
+        settings: LoggingConfig | None = None,
+        sampling: SamplingDecision = None,
+        durations: ExchangeDurations = None,
+        stream_capture: ResponseStreamCapture = None,
+    ) -> None:
+        if settings is None:
+            settings = self._resolve_config()
+        if settings.logs_responses:
+            try:
+                snapshot = HttpResponseSnapshot(response, stream_capture, sampling, settings, durations)
+                await self._apply_hooks(settings.response_logging_hooks, snapshot)
+            except Exception as e:
+                self._logger.exception("Error applying response logging hooks", exc_info=e)
+
+    async def _apply_hooks(self, hooks: Sequence[Callable], exchange: Any) -> None:
+        # Consecutive synchronous hooks are batched into a single executor call.
+        pending = []
+        for hook in hooks:
+            if inspect.iscoroutinefunction(hook):
+                if pending:
+                    await self._run_in_executor(pending, exchange)
+                    pending = []
+                await hook(self._logger, exchange)
+            else:
+                pending.append(hook)
+        if pending:
+            await self._run_in_executor(pending, exchange)
+
+    async def _run_in_executor(self, hooks: List[Callable], exchange: Any) -> None:
+        def run() -> None:
+            for hook in hooks:
+                hook(self._logger, exchange)
+
+        await asyncio.get_running_loop().run_in_executor(self._hook_executor, run)
+
+
+class _TeeByteStream(httpx.AsyncByteStream):
+    """
+    A proxy of the body stream of an httpx response, recording the chunks read through it.
+    """
+
+    def __init__(
+        self,
+        stream: httpx.AsyncByteStream,
+        max_bytes: int,
+        on_complete: Callable[[ResponseStreamCapture], Awaitable[None]],
+    ) -> None:
+        self.stream = stream
+        # The completion is awaited here, as the response hooks may be coroutines.
+        self.capture = ResponseStreamCapture(max_bytes, lambda capture: None)
+        self._on_complete = on_complete
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.capture.record(chunk)
+            yield chunk
+        await self._complete()
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            await self._complete()
+
+    async def _complete(self) -> None:
+        if not self.capture.completed:
+            self.capture.complete()
+            await self._on_complete(self.capture)
+
+
+def to_prepared_request(request: httpx.Request) -> PreparedRequest:
+    """
+    Convert an httpx request into a requests' prepared request, for the logging hooks.
+
+    :param request: The httpx request.
+    :return: The prepared request (without the body, if it's streamed).
+    """
+    prepared = PreparedRequest()
+    prepared.method = request.method
+    prepared.url = str(request.url)
+    prepared.headers = CaseInsensitiveDict(request.headers.items())
+    try:
+        prepared.body = request.content or None
+    except httpx.RequestNotRead:
+        prepared.body = None
+    return prepared
+
+
+def to_response(response: httpx.Response, request: PreparedRequest, elapsed: timedelta) -> Response:
+    """
+    Convert an httpx response into a requests' response, for the logging hooks.
+
+    :param response: The httpx response.
+    :param request: The converted request of the response.
+    :param elapsed: The time elapsed between sending the request and receiving the response.
+    :return: The response (without the body, if it's not been read yet).
+    """
+    converted = Response()
+    converted.status_code = response.status_code
+    converted.reason = response.reason_phrase
+    converted.url = str(response.url)
+    converted.headers = CaseInsensitiveDict(response.headers.items())
+    converted.encoding = response.charset_encoding
+    converted.elapsed = elapsed
+    converted.request = request
+    try:
+        converted._content = response.content
+    except httpx.ResponseNotRead:
+        converted._content = None
+    converted._content_consumed = True
+    return converted
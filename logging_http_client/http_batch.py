@@ -0,0 +1,275 @@
+"""
+This module contains the batch API, sending many requests concurrently over a single session.
+
+The requests are sent on a sliding window of at most ``max_concurrency`` in-flight requests. When
+the connection pools of the session are smaller than that, the batch sends its requests with
+adapters of its own, whose pools match it, so no connection is thrown away. Each exchange is logged
+as usual, and a summary record of the whole batch is logged once it's done.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Mapping, NamedTuple
+
+from requests import Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_log_record import HttpBatchLogRecord
+from logging_http_client.http_session import LoggingSession
+from logging_http_client.logging_http_client_config_globals import LoggingConfig
+
+
+class RequestSpec(NamedTuple):
+    """
+    A request of a batch.
+
+    - method: The HTTP method to use.
+    - url: The URL to send the request to.
+    - kwargs: Additional arguments to pass to the request method (e.g. ``{"json": {...}}``).
+    """
+
+    method: str
+    url: str
+    kwargs: Mapping[str, Any] = {}
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of a request of a batch.
+
+    - index: The position of the request in the batch.
+    - spec: The request.
+    - response: The response, or None if sending the request raised an exception.
+    - exception: The exception raised, if any.
+    - duration_ms: The time it took to get the response (or the exception), in milliseconds.
+    """
+
+    index: int
+    spec: RequestSpec
+    response: Response | None
+    exception: BaseException | None
+    duration_ms: float
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether a response was received, with a status code below 400.
+        """
+        return self.exception is None and self.response.ok
+
+    def result(self) -> Response:
+        """
+        Get the response, or raise the exception of the request.
+
+        :return: The response.
+        """
+        if self.exception is not None:
+            raise self.exception
+        return self.response
+
+
+def as_request_spec(spec: RequestSpec | str) -> RequestSpec:
+    """
+    Get the request spec of a batch item, where plain URLs are GET requests.
+
+    :param spec: The request spec, or a URL.
+    :return: The request spec.
+    """
+    if isinstance(spec, RequestSpec):
+        return spec
+    if isinstance(spec, str):
+        return RequestSpec("GET", spec)
+    raise TypeError(f"Unsupported batch request: {spec!r}")
+
+
+def check_max_concurrency(max_concurrency: int) -> None:
+    """
+    Check the maximum number of requests in flight of a batch.
+
+    :param max_concurrency: The maximum number of requests in flight.
+    :raises ValueError: If it isn't at least 1.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+
+def run_batch(
+    session: Session,
+    specs: Iterable[RequestSpec | str],
+    max_concurrency: int,
+    as_completed: bool,
+    logger: logging.Logger,
+) -> Iterator[BatchResult]:
+    """
+    Send a batch of requests over a session, with at most `max_concurrency` requests in flight.
+
+    :param session: The session to send the requests with.
+    :param specs: The requests to send.
+    :param max_concurrency: The maximum number of requests in flight.
+    :param as_completed: Whether to yield the results as they complete, instead of in the batch order.
+    :param logger: The logger of the batch summary record.
+    :return: The results of the requests, as a generator.
+    :raises ValueError: If `max_concurrency` isn't at least 1.
+    """
+    check_max_concurrency(max_concurrency)
+    return _run_batch(session, specs, max_concurrency, as_completed, logger)
+
+
+def batch_adapters(session: Session, max_concurrency: int) -> Dict[BaseAdapter, HTTPAdapter]:
+    """
+    Get the adapters of a batch, i.e. a copy of each HTTP adapter of a session whose connection pools
+    can't keep `max_concurrency` connections alive per host, with pools of its own that can.
+
+    NOTE:
+        The mounted adapters are left untouched, as other threads may be sending requests with them.
+        The copies are NOT mounted: the batch workers use them instead of the mounted adapters, see
+        :meth:`LoggingSession.replace_thread_adapters`.
+
+    :param session: The session.
+    :param max_concurrency: The number of connections to keep alive per host.
+    :return: The copy of each adapter to replace.
+    """
+    replacements: Dict[BaseAdapter, HTTPAdapter] = {}
+    for adapter in session.adapters.values():
+        if not isinstance(adapter, HTTPAdapter) or adapter._pool_maxsize >= max_concurrency or adapter in replacements:
+            continue
+        # A shallow copy keeps the state of the adapter subclasses (e.g. their retries), but for its pools.
+        replacement = object.__new__(type(adapter))
+        replacement.__dict__.update(adapter.__dict__)
+        replacement.proxy_manager = {}
+        replacement.init_poolmanager(adapter._pool_connections, max_concurrency, block=adapter._pool_block)
+        replacements[adapter] = replacement
+    return replacements
+
+
+def _run_batch(
+    session: Session,
+    specs: Iterable[RequestSpec | str],
+    max_concurrency: int,
+    as_completed: bool,
+    logger: logging.Logger,
+) -> Iterator[BatchResult]:
+    replacements = batch_adapters(session, max_concurrency) if isinstance(session, LoggingSession) else {}
+
+    pending_specs = enumerate(as_request_spec(spec) for spec in specs)
+    in_flight: Dict[Future, int] = {}
+    completed: Dict[int, BatchResult] = {}
+    next_index = 0
+    durations: List[float] = []
+    errors = 0
+    started_at = time.perf_counter()
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_concurrency,
+        thread_name_prefix="logging-http-client-batch",
+        # The workers are dedicated to the batch, so they can keep its adapters for good.
+        initializer=session.replace_thread_adapters if replacements else None,
+        initargs=(replacements,) if replacements else (),
+    )
+    try:
+        for index, spec in pending_specs:
+            in_flight[executor.submit(_send, session, index, spec)] = index
+            if len(in_flight) >= max_concurrency:
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                del in_flight[future]
+                result = future.result()
+                durations.append(result.duration_ms)
+                errors += not result.ok
+                completed[result.index] = result
+
+                for index, spec in pending_specs:
+                    in_flight[executor.submit(_send, session, index, spec)] = index
+                    break
+
+            if as_completed:
+                for index in sorted(completed):
+                    yield completed.pop(index)
+            else:
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        _close_when_done(list(in_flight), replacements.values())
+
+    settings = session.resolve_config() if isinstance(session, LoggingSession) else config.get_config()
+    _log_batch_summary(logger, settings, durations, errors, max_concurrency, time.perf_counter() - started_at)
+
+
+def _close_when_done(futures: List[Future], adapters: Collection[HTTPAdapter]) -> None:
+    # The requests still in flight (i.e. of a batch stopped early) keep using the adapters until they're done.
+    def close_adapters() -> None:
+        for adapter in adapters:
+            adapter.close()
+
+    if not adapters:
+        return
+    if not futures:
+        close_adapters()
+        return
+
+    lock = threading.Lock()
+    remaining = len(futures)
+
+    def on_done(_: Future) -> None:
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            if remaining:
+                return
+        close_adapters()
+
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+def _send(session: Session, index: int, spec: RequestSpec) -> BatchResult:
+    started_at = time.perf_counter()
+    try:
+        response = session.request(spec.method, spec.url, **spec.kwargs)
+    except Exception as e:
+        return BatchResult(index, spec, None, e, (time.perf_counter() - started_at) * 1000)
+    return BatchResult(index, spec, response, None, (time.perf_counter() - started_at) * 1000)
+
+
+def _log_batch_summary(
+    logger: logging.Logger,
+    settings: LoggingConfig,
+    durations: List[float],
+    errors: int,
+    max_concurrency: int,
+    elapsed: float,
+) -> None:
+    if not settings.response_logging_enabled:
+        return
+    try:
+        durations.sort()
+        record = HttpBatchLogRecord(
+            batch_size=len(durations),
+            batch_errors=errors,
+            batch_max_concurrency=max_concurrency,
+            batch_duration_ms=int(elapsed * 1000),
+            batch_latency_p50_ms=_percentile(durations, 50),
+            batch_latency_p99_ms=_percentile(durations, 99),
+        )
+        logger.log(level=settings.default_hooks_logging_level, msg="BATCH", extra=record.to_extra())
+    except Exception as e:
+        logger.exception("Error logging batch summary", exc_info=e)
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    # Nearest-rank percentile.
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percentile / 100 * len(sorted_values)), 1)
+    return round(sorted_values[rank - 1], 3)
@@ -0,0 +1,178 @@
+"""
+This module contains the policy deciding how much of a request/response body is logged.
+
+A policy can cap the logged body size (keeping its head and tail around a truncation marker),
+and skip content types that should not be decoded (e.g. images or archives). It decodes the
+kept bytes with the charset of the body, without ever raising on binary payloads.
+
+The default policy logs every body whole, the caps and the skipped content types being opt-in.
+"""
+
+from __future__ import annotations
+
+import codecs
+from dataclasses import dataclass
+from typing import NamedTuple, Tuple
+
+# The binary content types, e.g. to skip with ``BodyCapturePolicy(denied_content_types=BINARY_CONTENT_TYPES)``.
+BINARY_CONTENT_TYPES = (
+    "image/*",
+    "audio/*",
+    "video/*",
+    "font/*",
+    "application/octet-stream",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-tar",
+    "application/x-protobuf",
+    "application/grpc",
+    "multipart/form-data",
+)
+
+TRUNCATION_MARKER = "...[truncated {} bytes]..."
+
+
+class CapturedBody(NamedTuple):
+    """
+    The loggable part of a body.
+
+    - text: The decoded (and possibly truncated) body.
+    - length: The full body length, in bytes (text bodies being encoded with their charset).
+    - truncated: The number of bytes left out of the text.
+    """
+
+    text: str
+    length: int
+    truncated: int
+
+
+@dataclass(frozen=True)
+class BodyCapturePolicy:
+    """
+    How much of a body is logged, and which bodies are logged at all.
+
+    NOTE:
+        By default, the bodies of any size and content type are logged.
+
+    :param max_bytes: The maximum body size to log (None logs bodies of any size).
+    :param tail_bytes: How much of the ``max_bytes`` is taken from the end of a truncated body.
+    :param allowed_content_types: If set, ONLY these content types are logged, e.g. ``("application/json", "text/*")``.
+    :param denied_content_types: The content types that are never logged, e.g. ``("image/*",)``.
+    :param default_charset: The charset used when the content type doesn't declare a (known) one.
+    """
+
+    max_bytes: int | None = None
+    tail_bytes: int = 1024
+    allowed_content_types: Tuple[str, ...] = ()
+    denied_content_types: Tuple[str, ...] = ()
+    default_charset: str = "utf-8"
+
+    def __post_init__(self) -> None:
+        if self.max_bytes is not None and self.max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        if self.tail_bytes < 0:
+            raise ValueError("tail_bytes must not be negative")
+        codecs.lookup(self.default_charset)
+        # Normalise the content types once, so matching them is a plain comparison.
+        object.__setattr__(self, "allowed_content_types", tuple(t.lower() for t in self.allowed_content_types))
+        object.__setattr__(self, "denied_content_types", tuple(t.lower() for t in self.denied_content_types))
+
+    def is_capturable(self, content_type: str | None) -> bool:
+        """
+        Check whether bodies of the given content type should be logged.
+
+        :param content_type: The value of the Content-Type header, if any.
+        :return: True if the body should be logged.
+        """
+        media_type = _media_type(content_type)
+        if media_type is None:
+            return not self.allowed_content_types
+        if _matches_any(media_type, self.denied_content_types):
+            return False
+        return not self.allowed_content_types or _matches_any(media_type, self.allowed_content_types)
+
+    def capture(
+        self,
+        body: bytes | bytearray | memoryview | str,
+        content_type: str | None = None,
+        total_length: int | None = None,
+    ) -> CapturedBody:
+        """
+        Decode the loggable part of a body.
+
+        :param body: The body, or the head of the body when it's only been partially captured.
+        :param content_type: The value of the Content-Type header, if any.
+        :param total_length: The full body length, when the body given is only its head.
+        :return: The captured body.
+        """
+        if isinstance(body, str):
+            # Measured and truncated in bytes, as sent.
+            body = body.encode(_charset(content_type, self.default_charset), "replace")
+        length = len(body) if total_length is None else max(total_length, len(body))
+        head_only = length > len(body)
+
+        if self.max_bytes is None or length <= self.max_bytes:
+            return CapturedBody(self._decode(body, content_type), length, 0)
+
+        if head_only:
+            head, tail = min(self.max_bytes, len(body)), 0
+        else:
+            tail = min(self.tail_bytes, self.max_bytes)
+            head = self.max_bytes - tail
+
+        view = memoryview(body)
+        truncated = length - head - tail
+        text = self._decode(view[:head], content_type) + TRUNCATION_MARKER.format(truncated)
+        if tail:
+            tail_start = len(view) - tail
+            text += self._decode(view[tail_start:], content_type)
+        return CapturedBody(text, length, truncated)
+
+    def _decode(self, data: bytes | bytearray | memoryview, content_type: str | None) -> str:
+        return str(data, _charset(content_type, self.default_charset), "replace")
+
+
+def body_length(body: object) -> int | None:
+    """
+    Get the length of an in-memory body, in bytes.
+
+    :param body: The body (a text body being measured UTF-8 encoded).
+    :return: The body length, or None if the body is not held in memory (e.g. a file or a generator).
+    """
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, memoryview):
+        return body.nbytes
+    if isinstance(body, str):
+        return len(body) if body.isascii() else len(body.encode("utf-8", "replace"))
+    return None
+
+
+def _media_type(content_type: str | None) -> str | None:
+    if not content_type or not isinstance(content_type, str):
+        return None
+    return content_type.split(";", 1)[0].strip().lower() or None
+
+
+def _matches_any(media_type: str, patterns: Tuple[str, ...]) -> bool:
+    for pattern in patterns:
+        if pattern.endswith("/*"):
+            if media_type.startswith(pattern[:-1]):
+                return True
+        elif media_type == pattern:
+            return True
+    return False
+
+
+def _charset(content_type: str | None, default: str) -> str:
+    if content_type and isinstance(content_type, str):
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "charset":
+                charset = value.strip().strip("\"'")
+                try:
+                    return codecs.lookup(charset).name
+                except LookupError:
+                    break
+    return default
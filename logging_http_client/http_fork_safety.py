@@ -0,0 +1,45 @@
+"""
+This module contains the fork safety of the library, for the prefork servers (e.g. gunicorn or Celery workers).
+
+A child process inherits the memory of its parent, i.e.:
+- the connections pooled by the sessions, whose sockets would be shared by both processes,
+- the random pools of the request ID generators, so both processes would generate the same IDs,
+- the locks held by other threads when forking, which would never be released in the child,
+- the state of the background threads, which are NOT running in the child.
+
+The objects holding such state register themselves with :func:`reset_after_fork`, and their
+``_after_fork_in_child`` method is called in every child process, right after the fork. This way,
+the clients (and the configuration) can be set up once in the parent, before forking the workers.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import weakref
+from typing import Any
+
+# The objects to reset in the child processes, held by weak references so they're NOT kept alive.
+_instances: weakref.WeakSet = weakref.WeakSet()
+
+
+def reset_after_fork(instance: Any) -> None:
+    """
+    Register an object to reset in the child processes, i.e. to call its ``_after_fork_in_child`` method.
+
+    :param instance: The object, which MUST be weakly referenceable.
+    """
+    _instances.add(instance)
+
+
+def _after_fork_in_child() -> None:
+    for instance in list(_instances):
+        try:
+            instance._after_fork_in_child()
+        except Exception as e:
+            # The other objects must still be reset.
+            logging.getLogger(__name__).exception("Error resetting %r after fork", instance, exc_info=e)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
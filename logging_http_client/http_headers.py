@@ -1,3 +1,7 @@
+from __future__ import annotations
+
+from typing import Callable, Mapping
+
 HEADERS_KWARG = "headers"
 
 X_SOURCE_HEADER = "x-source"
@@ -7,3 +11,28 @@ X_CORRELATION_ID_HEADER = "x-correlation-id"
 
 def with_source_header(value: str) -> dict:
     return {X_SOURCE_HEADER: value}
+
+
+def missing_observability_headers(
+    headers: Mapping[str, str],
+    source: str | None,
+    request_id_provider: Callable[[], str],
+    correlation_id_provider: Callable[[], str] | None,
+) -> dict:
+    """
+    Get the observability headers missing from a request's headers.
+
+    :param headers: The (case-insensitive) request headers.
+    :param source: The source of the request, if any.
+    :param request_id_provider: The request ID provider.
+    :param correlation_id_provider: The correlation ID provider, if any.
+    :return: The headers to add to the request.
+    """
+    missing = {}
+    if headers.get(X_REQUEST_ID_HEADER, None) is None:
+        missing[X_REQUEST_ID_HEADER] = request_id_provider()
+    if headers.get(X_SOURCE_HEADER, None) is None and source is not None:
+        missing[X_SOURCE_HEADER] = source
+    if headers.get(X_CORRELATION_ID_HEADER, None) is None and correlation_id_provider is not None:
+        missing[X_CORRELATION_ID_HEADER] = correlation_id_provider()
+    return missing
@@ -1,75 +1,182 @@
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, Union
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
+from typing import Any, Dict, Tuple, Union
 from urllib.parse import urlparse
 
 from requests.models import PreparedRequest, Response
 
-import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_body_policy import body_length
 from logging_http_client.http_headers import X_SOURCE_HEADER, X_REQUEST_ID_HEADER
+from logging_http_client.http_route import NormalizedUrl, RouteNormalizer
+from logging_http_client.http_snapshot import HttpRequestSnapshot, HttpResponseSnapshot, exchange_config
 
 # Define Primitive type
 Primitive = Union[int, float, str, bool]
 
+# The values omitted from the serialized log records.
+_EMPTY_VALUES = (None, {}, [], "", 0, 0.0)
+
+# The types of the values that can't hold a data class.
+_PLAIN_TYPES = frozenset({str, int, float, bool, bytes, type(None)})
+
 
 @dataclass
 class BaseLogRecord:
     """
     A base class for all custom log record extensions.
+
+    NOTE:
+        The subclasses declared with `@dataclass(slots=True)` keep their fields in slots,
+        but the base class has an instance `__dict__` (only created on first use), so the
+        obscurers can still set attributes a record doesn't declare (which aren't serialized).
     """
 
+    __slots__ = ("__dict__",)
+
     def to_dict(self) -> Dict[str, Primitive]:
-        # Clean dictionary, removing empty and default values
-        # noinspection PyTypeChecker
-        to_dict_cleaned = {k: v for k, v in asdict(self).items() if v not in (None, {}, [], "", 0, 0.0)}
-        return to_dict_cleaned
+        """
+        Serialize the record, removing empty and default values.
 
+        NOTE:
+            The nested data classes are converted to dictionaries (as by `dataclasses.asdict`), but
+            the other field values are NOT copied, i.e. the nested dictionaries (e.g. the headers)
+            are shared between the record and its dictionary.
+        """
+        serialized = {}
+        for name in _field_names(type(self)):
+            value = getattr(self, name)
+            if type(value) not in _PLAIN_TYPES and _holds_dataclass(value):
+                value = _converted(value)
+            if value or value not in _EMPTY_VALUES:
+                serialized[name] = value
+        return serialized
 
-@dataclass
+    def to_extra(self, key: str = "http") -> Dict[str, Dict[str, Primitive]]:
+        """
+        Serialize the record into the `extra` mapping of a log call, i.e. ``logger.info(msg, extra=record.to_extra())``.
+
+        :param key: The key of the serialized record.
+        :return: The `extra` mapping.
+        """
+        return {key: self.to_dict()}
+
+
+@lru_cache(maxsize=None)
+def _field_names(record_type: type) -> Tuple[str, ...]:
+    return tuple(field.name for field in fields(record_type))
+
+
+def _holds_dataclass(value: Any) -> bool:
+    if isinstance(value, dict):
+        items = value.values()
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        return hasattr(type(value), "__dataclass_fields__")
+    # The containers of plain values (e.g. the headers) are checked without a call per item.
+    return not _PLAIN_TYPES.issuperset(map(type, items)) and any(map(_holds_dataclass, items))
+
+
+def _converted(value: Any) -> Any:
+    if hasattr(type(value), "__dataclass_fields__"):
+        return asdict(value)
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*(_converted(item) for item in value))
+    if isinstance(value, (list, tuple)):
+        return type(value)(_converted(item) for item in value)
+    if isinstance(value, dict):
+        return type(value)((key, _converted(item)) for key, item in value.items())
+    return value
+
+
+def _normalized_url(normalizer: RouteNormalizer | None, url: str | None) -> NormalizedUrl | None:
+    if normalizer is None or not url:
+        return None
+    try:
+        return normalizer.normalize(url)
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
 class HttpLogRecord(BaseLogRecord):
     request_id: str = ""
     request_source: str = ""
     request_method: str = ""
     request_url: str = ""
+    request_route: str = ""
     request_query_params: Dict[str, Any] = None
     request_headers: Dict[str, Any] = None
     request_body: str = ""
+    request_body_length: int = 0
     response_source: str = None
     response_status: int = 0
     response_headers: Dict[str, Any] = None
     response_duration_ms: int = 0
+    response_headers_ms: float = 0.0
+    response_total_ms: float = 0.0
+    logging_overhead_ms: float = 0.0
+    redirect_count: int = 0
     response_body: str = ""
+    response_body_length: int = 0
+    sampling_rate: float = 0.0
+    sampling_reason: str = ""
+    timing_dns_ms: float = 0.0
+    timing_connect_ms: float = 0.0
+    timing_tls_ms: float = 0.0
+    timing_ttfb_ms: float = 0.0
+    timing_download_ms: float = 0.0
+    connection_reused: bool = False
 
     @staticmethod
     def from_request(request: PreparedRequest) -> Dict[str, Any]:
+        config = exchange_config(request)
         record = HttpLogRecord()
 
         record.request_id = request.headers.get(X_REQUEST_ID_HEADER, None)
         record.request_source = request.headers.get(X_SOURCE_HEADER, "UNKNOWN")
         record.request_method = request.method
         record.request_url = request.url
+        normalized = _normalized_url(config.route_normalizer, request.url)
+        if normalized is not None:
+            record.request_route = normalized.route
         record.request_query_params = request.params if hasattr(request, "params") else {}
         record.request_headers = dict(request.headers) if request.headers else {}
 
-        if request.body and config.is_request_body_logging_enabled():
-            if isinstance(request.body, bytes):
-                record.request_body = request.body.decode()
-            else:
-                record.request_body = request.body
+        length = body_length(request.body)
+        if length:
+            record.request_body_length = length
+            if config.request_body_logging_enabled:
+                policy = config.request_body_capture_policy
+                content_type = request.headers.get("content-type")
+                if policy.is_capturable(content_type):
+                    record.request_body = policy.capture(request.body, content_type).text
 
-        for obscurer in config.get_request_log_record_obscurers():
+        if isinstance(request, HttpRequestSnapshot) and request.sampling is not None:
+            record.sampling_rate = request.sampling.rate
+            record.sampling_reason = request.sampling.reason
+
+        for obscurer in config.request_log_record_obscurers:
             record = obscurer(record)
 
-        return {"http": record.to_dict()}
+        return record.to_extra()
 
     @staticmethod
     def from_response(response: Response) -> Dict[str, Any]:
+        config = exchange_config(response)
         record = HttpLogRecord()
 
         record.request_id = response.request.headers.get(X_REQUEST_ID_HEADER, None)
         record.response_source = response.headers.get(X_SOURCE_HEADER, None)
         record.response_status = response.status_code
         record.response_headers = dict(response.headers) if response.headers else {}
-        record.response_duration_ms = int(response.elapsed.microseconds // 1000)
+
+        # The host is cached along with the route, so the URL isn't parsed again.
+        normalized = _normalized_url(config.route_normalizer, response.request.url)
+        if normalized is not None:
+            record.request_route = normalized.route
+            if record.response_source is None:
+                record.response_source = normalized.host
 
         if record.response_source is None:
             try:
@@ -77,10 +184,74 @@ class HttpLogRecord(BaseLogRecord):
             except ValueError:
                 record.response_source = "UNKNOWN"
 
-        if response.content and config.is_response_body_logging_enabled():
-            record.response_body = response.content.decode()
+        snapshot = response if isinstance(response, HttpResponseSnapshot) else HttpResponseSnapshot(response)
+        durations = snapshot.durations
+        if durations is not None:
+            record.response_headers_ms = durations.headers_ms
+            record.response_total_ms = durations.total_ms
+            record.logging_overhead_ms = durations.logging_overhead_ms
+            record.redirect_count = durations.redirects
+        else:
+            record.response_headers_ms = round(response.elapsed.total_seconds() * 1000, 3)
+        record.response_duration_ms = int(record.response_headers_ms)
+
+        length = snapshot.body_length
+        if length is not None:
+            record.response_body_length = length
+
+        if config.response_body_logging_enabled:
+            policy = config.response_body_capture_policy
+            content_type = response.headers.get("content-type")
+            if policy.is_capturable(content_type) and response.content:
+                record.response_body = policy.capture(response.content, content_type, length).text
+
+        if snapshot.sampling is not None:
+            record.sampling_rate = snapshot.sampling.rate
+            record.sampling_reason = snapshot.sampling.reason
 
-        for obscurer in config.get_response_log_record_obscurers():
+        timings = snapshot.timings
+        if timings is not None:
+            record.timing_dns_ms = timings.dns_ms
+            record.timing_connect_ms = timings.connect_ms
+            record.timing_tls_ms = timings.tls_ms
+            record.timing_ttfb_ms = timings.ttfb_ms
+            record.timing_download_ms = timings.download_ms
+            record.connection_reused = timings.connection_reused
+
+        for obscurer in config.response_log_record_obscurers:
             record = obscurer(record)
 
-        return {"http": record.to_dict()}
+        return record.to_extra()
+
+
+@dataclass(slots=True)
+class HttpBatchLogRecord(BaseLogRecord):
+    batch_size: int = 0
+    batch_errors: int = 0
+    batch_max_concurrency: int = 0
+    batch_duration_ms: int = 0
+    batch_latency_p50_ms: float = 0.0
+    batch_latency_p99_ms: float = 0.0
+
+
+@dataclass(slots=True)
+class HttpAggregateLogRecord(BaseLogRecord):
+    aggregate_host: str = ""
+    aggregate_method: str = ""
+    aggregate_route: str = ""
+    aggregate_status: int = 0
+    aggregate_error: str = ""
+    aggregate_count: int = 0
+    aggregate_window_ms: int = 0
+    aggregate_duration_min_ms: float = 0.0
+    aggregate_duration_avg_ms: float = 0.0
+    aggregate_duration_max_ms: float = 0.0
+    aggregate_request_bytes: int = 0
+    aggregate_response_bytes: int = 0
+    aggregate_sample_request_id: str = ""
+
+
+@dataclass(slots=True)
+class HttpSuppressedLogRecord(BaseLogRecord):
+    suppressed_key: str = ""
+    suppressed_count: int = 0
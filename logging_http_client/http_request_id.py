@@ -0,0 +1,131 @@
+"""
+This module contains the built-in request ID providers, i.e. the generators of the `x-request-id` header values.
+
+- uuid4_request_id: A random UUID (the default), which costs an ``os.urandom`` call per ID.
+- UlidRequestIdGenerator: A time-ordered ULID, drawing its randomness from a buffered per-thread pool.
+- CounterRequestIdGenerator: A random per-process prefix followed by a counter, the cheapest of them.
+
+The time-ordered IDs also sort (and so index) by creation time in log stores.
+"""
+
+from __future__ import annotations
+
+import base64
+import itertools
+import os
+import threading
+import time
+import uuid
+
+from logging_http_client.http_fork_safety import reset_after_fork
+
+# Maps the base32hex alphabet (0-9A-V) to Crockford's base32 alphabet, as used by ULIDs.
+_CROCKFORD_BASE32 = bytes.maketrans(b"0123456789ABCDEFGHIJKLMNOPQRSTUV", b"0123456789ABCDEFGHJKMNPQRSTVWXYZ")
+
+
+def uuid4_request_id() -> str:
+    """
+    Generate a random (version 4) UUID request ID, e.g. ``"6a09ec23-b318-43d2-81a1-8c1fcaf77d05"``.
+
+    :return: The request ID.
+    """
+    return str(uuid.uuid4())
+
+
+class UlidRequestIdGenerator:
+    """
+    Generates ULID request IDs, e.g. ``"01J9Z3K4X8N6T2VQ7R5W0YB1CD"``.
+
+    A ULID is made of a 48 bits millisecond timestamp followed by 80 random bits, encoded as
+    26 characters of Crockford's base32, so the IDs sort by creation time (to the millisecond).
+
+    The random bits are drawn from a per-thread pool, refilled (and encoded) with a single
+    ``os.urandom`` call every `pool_size` IDs, and the encoded timestamp is reused within the
+    same millisecond, so generating an ID mostly boils down to concatenating two strings.
+    """
+
+    __slots__ = ("_pool_size", "_local", "_timestamp", "__weakref__")
+
+    def __init__(self, pool_size: int = 256) -> None:
+        """
+        :param pool_size: The number of IDs whose random bits are drawn at once, per thread.
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self._pool_size = pool_size
+        self._local = threading.local()
+        self._timestamp = (-1, "")
+        reset_after_fork(self)
+
+    def __call__(self) -> str:
+        try:
+            randomness = next(self._local.randomness)
+        except (AttributeError, StopIteration):
+            randomness = self._refill()
+
+        milliseconds = time.time_ns() // 1_000_000
+        timestamp = self._timestamp
+        if timestamp[0] != milliseconds:
+            # The 10 characters of the timestamp are the base32 encoding of its 50 bits, 2 leading zero bits
+            # included, i.e. the first 10 characters of the base32 encoding of the timestamp shifted by 6 bits.
+            encoded = _encode(((milliseconds & 0xFFFFFFFFFFFF) << 6).to_bytes(7))[:10]
+            timestamp = self._timestamp = (milliseconds, encoded)
+
+        return timestamp[1] + randomness
+
+    def _refill(self) -> str:
+        # 10 random bytes (80 bits) are encoded as exactly 16 characters.
+        encoded = _encode(os.urandom(10 * self._pool_size))
+        size = len(encoded)
+        randomness = iter([encoded[i:j] for i, j in zip(range(0, size, 16), range(16, size + 1, 16))])
+        self._local.randomness = randomness
+        return next(randomness)
+
+    def reseed(self) -> None:
+        """
+        Drop the random pools of the threads, e.g. after a fork, so they're refilled on their next ID.
+        """
+        self._local = threading.local()
+
+    def _after_fork_in_child(self) -> None:
+        # The child would otherwise draw the same random bits as its parent.
+        self.reseed()
+
+
+class CounterRequestIdGenerator:
+    """
+    Generates request IDs made of a per-process prefix and a counter, e.g. ``"5f0c2e9ab41d-1a"``.
+
+    The IDs are unique as long as the prefixes are, so the default prefix is random. They're ordered by
+    creation time within a process, and generating them costs little more than incrementing the counter.
+    """
+
+    __slots__ = ("_given_prefix", "_prefix", "_counter", "__weakref__")
+
+    def __init__(self, prefix: str | None = None) -> None:
+        """
+        :param prefix: The prefix of the IDs, defaults to 12 random hexadecimal characters.
+            A given prefix MUST be unique to the process (e.g. include its hostname and PID).
+        """
+        self._given_prefix = prefix
+        self.reseed()
+        reset_after_fork(self)
+
+    def __call__(self) -> str:
+        return f"{self._prefix}-{next(self._counter):x}"
+
+    def reseed(self) -> None:
+        """
+        Restart the counter with a new random prefix (unless a prefix was given), e.g. after a fork.
+        """
+        self._prefix = self._given_prefix if self._given_prefix is not None else os.urandom(6).hex()
+        self._counter = itertools.count(1)
+
+    def _after_fork_in_child(self) -> None:
+        # The child would otherwise generate the same IDs as its parent.
+        self.reseed()
+
+
+def _encode(data: bytes) -> str:
+    # Crockford's base32, without padding.
+    return base64.b32hexencode(data).translate(_CROCKFORD_BASE32).decode("ascii").rstrip("=")
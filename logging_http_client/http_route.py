@@ -0,0 +1,127 @@
+"""
+This module contains the route normalization of the request URLs, i.e. low-cardinality keys for the exchanges.
+
+A raw URL (e.g. ``/users/8123/orders/55``) makes a poor key to group exchanges by, as it has
+about as many values as there are users. The :class:`RouteNormalizer` turns it into a route
+template instead (e.g. ``/users/{id}/orders/{id}``), using the templates registered by the user
+first, then detecting the id-like segments (numbers, UUIDs and hashes). The results are cached
+in a size-bounded LRU keyed by URL, so the hot URLs are only parsed once.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest
+
+# The placeholders of the detected id-like segments.
+ID_PLACEHOLDER = "{id}"
+UUID_PLACEHOLDER = "{uuid}"
+HASH_PLACEHOLDER = "{hash}"
+
+_UUID_PATTERN = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+# Hex digests, e.g. commit hashes or object ids (MD5 or SHA digests being longer).
+_HASH_PATTERN = re.compile(r"[0-9a-fA-F]{16,}")
+
+
+class NormalizedUrl(NamedTuple):
+    """
+    The normalized parts of a URL.
+
+    - host: The host (and port) of the URL.
+    - route: The route template of its path, e.g. ``/users/{id}``.
+    """
+
+    host: str
+    route: str
+
+
+class RouteNormalizer:
+    """
+    Normalizes the request URLs into their host and route template.
+
+    The templates name their variable segments between braces, e.g. ``/users/{user_id}/orders/{order_id}``,
+    and are matched in the order they are given. The paths matching no template have their id-like segments
+    replaced by a placeholder instead, i.e. "{id}" for numbers, "{uuid}" for UUIDs and "{hash}" for hex digests.
+
+    NOTE:
+        A normalizer is thread-safe, and can be shared by the logging, sampling and metrics,
+        e.g. ``MetricsRecorder(route=normalizer.route)``.
+    """
+
+    __slots__ = ("_templates", "_detect_ids", "_normalize")
+
+    _templates: Dict[int, Tuple[Tuple[str, Tuple[str | None, ...]], ...]]
+    _detect_ids: bool
+
+    def __init__(self, templates: Iterable[str] = (), detect_ids: bool = True, cache_size: int = 4096) -> None:
+        """
+        :param templates: The route templates, e.g. ``/users/{user_id}``.
+        :param detect_ids: Whether to replace the id-like segments of the paths matching no template.
+        :param cache_size: The maximum number of URLs whose normalization is cached.
+        :raises ValueError: If a template isn't an absolute path.
+        """
+        by_length: Dict[int, List[Tuple[str, Tuple[str | None, ...]]]] = {}
+        for template in templates:
+            if not template.startswith("/"):
+                raise ValueError(f"Route templates must start with '/', got: {template}")
+            segments = tuple(
+                None if segment.startswith("{") and segment.endswith("}") else segment
+                for segment in template[1:].split("/")
+            )
+            by_length.setdefault(len(segments), []).append((template, segments))
+        self._templates = {length: tuple(candidates) for length, candidates in by_length.items()}
+        self._detect_ids = detect_ids
+        # The cache holds the normalizer, which is fine as they're both dropped at once.
+        self._normalize = lru_cache(maxsize=cache_size)(self._parse)
+
+    def normalize(self, url: str) -> NormalizedUrl:
+        """
+        Normalize a URL.
+
+        :param url: The URL, its query string and fragment being ignored.
+        :return: The host and route template of the URL.
+        """
+        return self._normalize(url.split("?", 1)[0].split("#", 1)[0])
+
+    def route(self, request: PreparedRequest) -> str:
+        """
+        Get the route template of a request.
+
+        :param request: The request.
+        :return: The route template of its URL.
+        """
+        return self.normalize(request.url or "").route
+
+    def cache_info(self):
+        """
+        Get the hits, misses and size of the URL cache, see :func:`functools.lru_cache`.
+        """
+        return self._normalize.cache_info()
+
+    def _parse(self, url: str) -> NormalizedUrl:
+        parts = urlsplit(url)
+        return NormalizedUrl(parts.netloc, self._route_of(parts.path or "/"))
+
+    def _route_of(self, path: str) -> str:
+        segments = path[1:].split("/")
+        for template, template_segments in self._templates.get(len(segments), ()):
+            if all(expected is None or expected == actual for expected, actual in zip(template_segments, segments)):
+                return template
+
+        if not self._detect_ids:
+            return path
+        return "/" + "/".join(_placeholder_of(segment) for segment in segments)
+
+
+def _placeholder_of(segment: str) -> str:
+    if segment.isdigit() and segment.isascii():
+        return ID_PLACEHOLDER
+    if len(segment) == 36 and _UUID_PATTERN.fullmatch(segment):
+        return UUID_PLACEHOLDER
+    if len(segment) >= 16 and _HASH_PATTERN.fullmatch(segment):
+        return HASH_PLACEHOLDER
+    return segment
@@ -1,12 +1,28 @@
-import copy
-import uuid
+from __future__ import annotations
+
+import threading
+import time
 from logging import Logger
+from typing import Callable, Mapping
 
 from requests import Session, Response, Request, PreparedRequest
+from requests.adapters import BaseAdapter, HTTPAdapter
 from typing_extensions import override
 
 import logging_http_client.logging_http_client_config_globals as config
-from logging_http_client.http_headers import X_REQUEST_ID_HEADER, X_CORRELATION_ID_HEADER, X_SOURCE_HEADER
+from logging_http_client.http_fork_safety import reset_after_fork
+from logging_http_client.http_headers import missing_observability_headers
+from logging_http_client.logging_config_scope import LoggingConfigScope
+from logging_http_client.logging_http_client_config_globals import LoggingConfig
+from logging_http_client.logging_metrics import MetricsRecorder
+from logging_http_client.http_snapshot import HttpRequestSnapshot, HttpResponseSnapshot
+from logging_http_client.http_stream_capture import ResponseStreamCapture
+from logging_http_client.http_timing import ExchangeDurations, TimingHTTPAdapter, elapsed_ms, to_ms
+from logging_http_client.logging_default_hooks import default_error_logging_hook
+from logging_http_client.logging_sampling import EXCEPTION, Sampler, SamplingDecision
+
+# Whether the current thread is sending an exchange, so its redirects are not recorded on their own.
+_exchange = threading.local()
 
 
 class LoggingSession(Session):
@@ -17,12 +33,61 @@ class LoggingSession(Session):
 
     _logger: Logger
     _source: str
+    _resolve_config: Callable[[], LoggingConfig]
+    _thread_adapters: threading.local
 
-    def __init__(self, source: str, logger: Logger) -> None:
+    def __init__(self, source: str, logger: Logger, config_scope: LoggingConfigScope | None = None) -> None:
+        """
+        :param source: The source of the requests.
+        :param logger: The logger to use for logging requests and responses.
+        :param config_scope: The configuration scope of the session, defaults to the global configuration.
+        """
         super().__init__()
+        config.install_default_hooks()
+        reset_after_fork(self)
 
         self._source = source
         self._logger = logger
+        # Resolved once, so the exchanges don't look the scope up.
+        self._resolve_config = config_scope.resolve if config_scope is not None else config.get_config
+        # The adapters replaced for the requests of some threads only, see `replace_thread_adapters`.
+        self._thread_adapters = threading.local()
+
+        if self._resolve_config().connection_timings_enabled:
+            for prefix in ("https://", "http://"):
+                self.mount(prefix, TimingHTTPAdapter())
+
+    def resolve_config(self) -> LoggingConfig:
+        """
+        Get the configuration the next exchange is logged with.
+
+        :return: The configuration, i.e. the global one with the overrides of the session's scope (if any).
+        """
+        return self._resolve_config()
+
+    def replace_thread_adapters(self, replacements: Mapping[BaseAdapter, BaseAdapter] | None) -> None:
+        """
+        Replace some of the mounted adapters, for the requests sent by the current thread only.
+
+        The mounted adapters are left untouched, so the requests of the other threads are NOT affected
+        (e.g. the workers of a batch use adapters of their own, see :func:`logging_http_client.http_batch.run_batch`).
+
+        :param replacements: The adapter to use instead of each replaced mounted adapter, or None to restore them all.
+        """
+        self._thread_adapters.replacements = replacements
+
+    @override
+    def get_adapter(self, url: str) -> BaseAdapter:
+        adapter = super().get_adapter(url)
+        replacements = getattr(self._thread_adapters, "replacements", None)
+        return replacements.get(adapter, adapter) if replacements else adapter
+
+    def _after_fork_in_child(self) -> None:
+        # The inherited connections are dropped, NOT closed (e.g. with a TLS close_notify), as the parent uses them.
+        for adapter in self.adapters.values():
+            if isinstance(adapter, HTTPAdapter):
+                adapter.init_poolmanager(adapter._pool_connections, adapter._pool_maxsize, block=adapter._pool_block)
+                adapter.proxy_manager = {}
 
     @override
     def request(
@@ -81,10 +146,102 @@ class LoggingSession(Session):
             The logging hooks are applied BEFORE (request) and AFTER (response) the request is made.
             In the event of a hook exception, the request will NOT be blocked. Instead, we gracefully
             catch the exception and log it to avoid disturbing the request/response flow.
+
+            All hooks of an exchange share a single read-only snapshot of the request (and
+            of the response), see :mod:`logging_http_client.http_snapshot`.
+
+            For streamed responses (i.e. `stream=True`), the body is NOT downloaded up front.
+            Instead, the response hooks are applied once the caller has exhausted or closed
+            the stream, with up to the configured capture limit of the body bytes.
+
+            When a logging sampler is set, exchanges that are not sampled skip the logging
+            hooks entirely, unless a tail rule keeps them once their outcome is known (in
+            which case their request hooks are applied late, just before the response hooks).
+
+            The configuration is read once per exchange (see `LoggingConfig`), so all the
+            hooks of an exchange see the same one, whatever the other threads change.
+
+            When a metrics recorder is set, every exchange (sampled or not) is recorded once,
+            redirects included, with its duration up to the response headers for streamed
+            responses, and up to the whole body otherwise.
+
+            Each redirect hop is logged once: the nested sends log the hops they follow, while
+            this exchange logs the response to its own request, along with the durations of the
+            whole redirect chain (see `ExchangeDurations`).
         """
-        self._run_logging_request_hooks(request)
-        response = super().send(request, **kwargs)
-        self._run_logging_response_hooks(response)
+        settings = self._resolve_config()
+        if settings.observes_nothing:
+            return super().send(request, **kwargs)
+
+        recorder = settings.metrics_recorder
+        if recorder is None or getattr(_exchange, "active", False):
+            # The redirects are sent (and so logged) by nested calls, but recorded as part of the whole exchange.
+            return self._send_and_log(request, settings, **kwargs)
+
+        _exchange.active = True
+        started_at = time.perf_counter_ns()
+        response = None
+        try:
+            response = self._send_and_log(request, settings, **kwargs)
+            return response
+        finally:
+            _exchange.active = False
+            self._record_metrics(recorder, request, response, time.perf_counter_ns() - started_at)
+
+    def _send_and_log(self, request: PreparedRequest, settings: LoggingConfig, **kwargs) -> Response:
+        if settings.logs_nothing:
+            return super().send(request, **kwargs)
+
+        started_at = time.perf_counter_ns()
+        sampler = settings.logging_sampler
+        decision = self._sample_request(sampler, request) if sampler is not None else None
+        # With tail rules, the request records wait for the final decision, see `SamplingDecision.rate`.
+        defers_request = decision is not None and sampler.has_tail_rules
+
+        if decision is None or (decision.sampled and not defers_request):
+            self._run_logging_request_hooks(request, settings, decision)
+
+        sent_at = time.perf_counter_ns()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as e:
+            if decision is not None and (defers_request or not decision.sampled):
+                if sampler.keep_exception(decision, e):
+                    decision = decision.kept_by(EXCEPTION)
+                elif not decision.sampled:
+                    raise
+                self._run_logging_request_hooks(request, settings, decision)
+            self._run_logging_error_hooks(request, settings, e, decision, time.perf_counter_ns() - sent_at)
+            raise
+        received_at = time.perf_counter_ns()
+
+        # The hops of a redirect chain are logged by the nested sends, the first one being this request's.
+        logged_response = response.history[0] if response.history else response
+
+        if decision is not None:
+            final_decision = self._sample_response(sampler, decision, logged_response)
+            if not final_decision.sampled:
+                return response
+            if defers_request or not decision.sampled:
+                self._run_logging_request_hooks(request, settings, final_decision)
+            decision = final_decision
+
+        overhead_ns = sent_at - started_at + time.perf_counter_ns() - received_at
+        if (
+            logged_response is response
+            and kwargs.get("stream")
+            and settings.logs_responses
+            and response.raw is not None
+        ):
+            self._capture_streamed_response(response, settings, decision, sent_at, overhead_ns)
+        else:
+            durations = ExchangeDurations(
+                headers_ms=elapsed_ms(response),
+                total_ms=to_ms(received_at - sent_at),
+                logging_overhead_ms=to_ms(overhead_ns),
+                redirects=len(response.history),
+            )
+            self._run_logging_response_hooks(logged_response, settings, sampling=decision, durations=durations)
         return response
 
     @override
@@ -101,35 +258,116 @@ class LoggingSession(Session):
         """
         prepared = super().prepare_request(request)
         try:
-            request_id = prepared.headers.get(X_REQUEST_ID_HEADER, None)
-            correlation_id = prepared.headers.get(X_CORRELATION_ID_HEADER, None)
-            source_system = prepared.headers.get(X_SOURCE_HEADER, None)
-
-            correlation_id_provider = config.get_correlation_id_provider()
-
-            if request_id is None:
-                prepared.headers.update({X_REQUEST_ID_HEADER: str(uuid.uuid4())})
-            if source_system is None and self._source is not None:
-                prepared.headers.update({X_SOURCE_HEADER: self._source})
-            if correlation_id is None and correlation_id_provider is not None:
-                prepared.headers.update({X_CORRELATION_ID_HEADER: correlation_id_provider()})
+            settings = self._resolve_config()
+            prepared.headers.update(
+                missing_observability_headers(
+                    prepared.headers,
+                    self._source,
+                    settings.request_id_provider,
+                    settings.correlation_id_provider,
+                )
+            )
         except Exception as e:
             self._logger.exception("Error preparing observability request headers", exc_info=e)
         finally:
             return prepared
 
-    def _run_logging_request_hooks(self, request: PreparedRequest) -> None:
-        if config.is_request_logging_enabled():
+    def _record_metrics(
+        self,
+        recorder: MetricsRecorder,
+        request: PreparedRequest,
+        response: Response | None,
+        duration_ns: int,
+    ) -> None:
+        try:
+            if response is None:
+                recorder.record(request, None, duration_ns)
+            else:
+                recorder.record(request, response.status_code, duration_ns, getattr(response, "timings", None))
+        except Exception as e:
+            self._logger.exception("Error recording exchange metrics", exc_info=e)
+
+    def _sample_request(self, sampler: Sampler, request: PreparedRequest) -> SamplingDecision | None:
+        try:
+            return sampler.sample_request(request)
+        except Exception as e:
+            self._logger.exception("Error sampling request", exc_info=e)
+            return None
+
+    def _sample_response(self, sampler: Sampler, decision: SamplingDecision, response: Response) -> SamplingDecision:
+        try:
+            return sampler.sample_response(decision, response)
+        except Exception as e:
+            self._logger.exception("Error sampling response", exc_info=e)
+            return decision
+
+    def _run_logging_request_hooks(
+        self,
+        request: PreparedRequest,
+        settings: LoggingConfig | None = None,
+        sampling: SamplingDecision = None,
+    ) -> None:
+        if settings is None:
+            settings = self._resolve_config()
+        if settings.logs_requests:
             try:
-                for hook in config.get_request_logging_hooks():
-                    hook(self._logger, copy.deepcopy(request))
+                snapshot = HttpRequestSnapshot(request, sampling, settings)
+                for hook in settings.request_logging_hooks:
+                    hook(self._logger, snapshot)
             except Exception as e:
                 self._logger.exception("Error applying request logging hooks", exc_info=e)
 
-    def _run_logging_response_hooks(self, response: Response) -> None:
-        if config.is_response_logging_enabled():
+    def _run_logging_error_hooks(
+        self,
+        request: PreparedRequest,
+        settings: LoggingConfig,
+        error: BaseException,
+        sampling: SamplingDecision = None,
+        duration_ns: int = 0,
+    ) -> None:
+        # Only the aggregation mode of the default hooks logs the raised exchanges, see `default_error_logging_hook`.
+        if settings.logs_requests and settings.log_aggregator is not None:
+            try:
+                snapshot = HttpRequestSnapshot(request, sampling, settings)
+                default_error_logging_hook(self._logger, snapshot, error, to_ms(duration_ns))
+            except Exception as e:
+                self._logger.exception("Error applying error logging hooks", exc_info=e)
+
+    def _capture_streamed_response(
+        self,
+        response: Response,
+        settings: LoggingConfig,
+        sampling: SamplingDecision = None,
+        sent_at: int = 0,
+        overhead_ns: int = 0,
+    ) -> None:
+        max_bytes = settings.response_stream_capture_limit if settings.response_body_logging_enabled else 0
+
+        def on_complete(capture: ResponseStreamCapture) -> None:
+            # The total covers the consumption of the stream by the caller.
+            durations = ExchangeDurations(
+                headers_ms=elapsed_ms(response),
+                total_ms=to_ms(time.perf_counter_ns() - sent_at),
+                logging_overhead_ms=to_ms(overhead_ns),
+            )
+            self._run_logging_response_hooks(response, settings, capture, sampling, durations)
+
+        ResponseStreamCapture.install(response, max_bytes, on_complete)
+
+    def _run_logging_response_hooks(
+        self,
+        response: Response,
+        settings: LoggingConfig | None = None,
+        stream_capture: ResponseStreamCapture = None,
+        sampling: SamplingDecision = None,
+        durations: ExchangeDurations = None,
+    ) -> None:
+        if settings is None:
+            settings = self._resolve_config()
+        if settings.logs_responses:
             try:
-                for hook in config.get_response_logging_hooks():
-                    hook(self._logger, copy.deepcopy(response))
+                snapshot = HttpResponseSnapshot(response, stream_capture, sampling, settings, durations)
+                for hook in settings.response_logging_hooks:
+                    hook(self._logger, snapshot)
             except Exception as e:
                 self._logger.exception("Error applying response logging hooks", exc_info=e)
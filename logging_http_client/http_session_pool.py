@@ -0,0 +1,208 @@
+"""
+This module contains the pool of sessions of the clients without a reusable session.
+
+A `requests.Session` isn't thread-safe (e.g. its cookie jar and adapters are shared by all its
+requests), which is why some clients don't use a reusable session. Building a new session per
+request is costly though, as it comes with new connection pools, so every request opens a cold
+connection. A :class:`SessionPool` keeps warm sessions instead: each request checks a session
+out, so no two threads use the same session at once, and checks it back in, keeping its
+connections alive for the next request.
+
+The pool is bounded: once all its sessions are checked out, the requests wait for one to be
+checked back in (up to a timeout), and the time they wait is recorded in the pool stats.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Set
+
+from requests import Session
+from requests.exceptions import Timeout
+
+from logging_http_client.http_fork_safety import reset_after_fork
+
+
+class SessionPoolTimeout(Timeout):
+    """
+    No session of the pool was checked back in within the timeout.
+    """
+
+
+class SessionPool:
+    """
+    A bounded pool of sessions, each session being used by a single thread at a time.
+
+    The sessions are created on demand, and the most recently checked in (i.e. warmest) session
+    is checked out first, so the pool only grows as far as the concurrency requires.
+    """
+
+    max_size: int
+    timeout: float | None
+    _factory: Callable[[], Session]
+
+    _condition: threading.Condition
+    _idle: List[Session]
+    _in_use: Set[Session]
+    _stale: Set[Session]
+    _size: int
+    _closed: bool
+
+    def __init__(self, factory: Callable[[], Session], max_size: int = 10, timeout: float | None = None) -> None:
+        """
+        :param factory: Creates a new session.
+        :param max_size: The maximum number of sessions.
+        :param timeout: The maximum time to wait for a session, in seconds, or None to wait indefinitely.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+
+        self.max_size = max_size
+        self.timeout = timeout
+        self._factory = factory
+
+        self._condition = threading.Condition(threading.Lock())
+        self._idle = []
+        self._in_use = set()
+        # The checked out sessions to close when checked back in, see `clear`.
+        self._stale = set()
+        self._size = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_ns_total = 0
+        self._wait_ns_max = 0
+        reset_after_fork(self)
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """
+        Check a session out, and check it back in when done.
+
+        :return: The session, as a context manager.
+        :raises SessionPoolTimeout: If no session was checked back in within the timeout.
+        :raises RuntimeError: If the pool is closed.
+        """
+        session = self._checkout()
+        try:
+            yield session
+        finally:
+            self._checkin(session)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the pool gauges and counters.
+
+        :return: The size (i.e. the number of sessions), the idle and in use sessions, the checkouts, the checkouts
+            that waited for a session and the ones that timed out, and the total and max wait times in milliseconds.
+        """
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_ms_total": round(self._wait_ns_total / 1e6, 3),
+                "wait_ms_max": round(self._wait_ns_max / 1e6, 3),
+            }
+
+    def clear(self) -> None:
+        """
+        Close the idle sessions, and the checked out ones once they're checked back in.
+
+        The next checkouts create new sessions, e.g. to pick up new shared headers.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._stale |= self._in_use
+            self._size -= len(idle)
+            self._condition.notify(len(idle))
+        for session in idle:
+            session.close()
+
+    def close(self) -> None:
+        """
+        Close the pool, i.e. clear it and refuse any further checkout.
+        """
+        with self._condition:
+            self._closed = True
+            # The waiting threads must raise, rather than wait for a session.
+            self._condition.notify_all()
+        self.clear()
+
+    def _after_fork_in_child(self) -> None:
+        # The checked out sessions belong to threads that don't exist in the child, so they're never checked back in.
+        # The idle ones are kept, their sessions having dropped their inherited connections.
+        self._condition = threading.Condition(threading.Lock())
+        self._size -= len(self._in_use)
+        self._in_use = set()
+        self._stale = set()
+
+    def _checkout(self) -> Session:
+        started_ns = time.perf_counter_ns()
+        deadline_ns = None if self.timeout is None else started_ns + int(self.timeout * 1e9)
+        session = None
+        with self._condition:
+            waited = False
+            while True:
+                if self._closed:
+                    raise RuntimeError("The session pool is closed")
+                if self._idle:
+                    session = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserved now, but created outside of the lock.
+                    self._size += 1
+                    break
+                waited = True
+                if deadline_ns is None:
+                    self._condition.wait()
+                else:
+                    remaining_s = (deadline_ns - time.perf_counter_ns()) / 1e9
+                    if remaining_s <= 0:
+                        self._timeouts += 1
+                        raise SessionPoolTimeout(f"No session was free within {self.timeout}s")
+                    self._condition.wait(remaining_s)
+            if waited:
+                wait_ns = time.perf_counter_ns() - started_ns
+                self._waits += 1
+                self._wait_ns_total += wait_ns
+                self._wait_ns_max = max(self._wait_ns_max, wait_ns)
+
+        if session is None:
+            try:
+                session = self._factory()
+            except BaseException:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+
+        with self._condition:
+            self._in_use.add(session)
+            self._checkouts += 1
+        return session
+
+    def _checkin(self, session: Session) -> None:
+        with self._condition:
+            if session not in self._in_use:
+                # Checked out before a fork, so the pool of the child forgot it, see `_after_fork_in_child`.
+                stale = True
+            else:
+                self._in_use.remove(session)
+                stale = self._closed or session in self._stale
+                if stale:
+                    self._stale.discard(session)
+                    self._size -= 1
+                else:
+                    self._idle.append(session)
+                self._condition.notify()
+        if stale:
+            session.close()
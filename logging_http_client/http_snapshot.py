@@ -0,0 +1,390 @@
+"""
+This module contains the read-only snapshots handed to the logging hooks.
+
+A snapshot is built once per exchange and shared by all the hooks, replacing the
+per-hook deep copies of the live request/response objects. Hooks can read the same
+attributes they would read on a :class:`requests.PreparedRequest` or
+:class:`requests.Response`, but they cannot mutate the live objects through them.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from typing import Any, Iterator, Mapping
+
+from requests import PreparedRequest, Response
+from requests.exceptions import JSONDecodeError
+from requests.structures import CaseInsensitiveDict
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_stream_capture import ResponseStreamCapture
+from logging_http_client.http_timing import ConnectionTimings, ExchangeDurations
+from logging_http_client.logging_http_client_config_globals import LoggingConfig
+from logging_http_client.logging_sampling import SamplingDecision
+
+
+class FrozenHeaders(Mapping[str, Any]):
+    """
+    A read-only, case-insensitive view of HTTP headers.
+
+    The headers are copied once on construction, so later changes to the live
+    headers are not reflected, and the view itself cannot be changed.
+    """
+
+    __slots__ = ("_store",)
+
+    def __init__(self, headers: Mapping[str, Any] | None = None) -> None:
+        store = {}
+        if headers:
+            for key, value in headers.items():
+                store[key.lower()] = (key, value)
+        self._store = store
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store[key.lower()][1]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key.lower() in self._store
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self._store.values())
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __repr__(self) -> str:
+        return str(dict(self.items()))
+
+    def copy(self) -> CaseInsensitiveDict:
+        """
+        Get a mutable copy of the headers.
+
+        :return: A new case-insensitive dictionary with the same headers.
+        """
+        return CaseInsensitiveDict(self)
+
+
+class _Snapshot:
+    """
+    The shared read-only behaviour of the exchange snapshots.
+
+    Attributes that are not explicitly exposed by a snapshot are resolved against a
+    private deep copy of the underlying object. The copy is made lazily, at most once
+    per snapshot, and only when a hook asks for such an attribute.
+    """
+
+    __slots__ = ("_target", "_copy", "_config")
+
+    def __init__(self, target: Any, config: LoggingConfig | None = None) -> None:
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_copy", None)
+        object.__setattr__(self, "_config", config)
+
+    @property
+    def config(self) -> LoggingConfig | None:
+        """
+        The configuration the exchange is logged with, as read once by the session, if any.
+        """
+        return self._config
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self._materialise(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{type(self).__name__}' is read-only, cannot set '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"'{type(self).__name__}' is read-only, cannot delete '{name}'")
+
+    def __copy__(self) -> Any:
+        return copy.copy(self._target)
+
+    def __deepcopy__(self, memo: dict) -> Any:
+        # A deep copy of a snapshot yields a mutable copy of the underlying object.
+        return copy.deepcopy(self._target, memo)
+
+    def _cache(self, name: str, value: Any) -> Any:
+        object.__setattr__(self, name, value)
+        return value
+
+    def _materialise(self) -> Any:
+        if self._copy is None:
+            self._cache("_copy", copy.deepcopy(self._target))
+        return self._copy
+
+
+def exchange_config(target: Any) -> LoggingConfig:
+    """
+    Get the configuration an exchange is logged with, i.e. the one read by the session for
+    the snapshot, or the current one for the live requests/responses (e.g. in custom hooks).
+
+    :param target: A snapshot, or a live request/response.
+    :return: The configuration.
+    """
+    snapshot_config = target.config if isinstance(target, _Snapshot) else None
+    return snapshot_config if snapshot_config is not None else config.get_config()
+
+
+def _readonly_body(body: Any) -> Any:
+    # bytes and str are immutable, so they can be shared as they are.
+    if body is None or isinstance(body, (bytes, str)):
+        return body
+    if isinstance(body, (bytearray, memoryview)):
+        return memoryview(body).toreadonly()
+    # Streamed bodies (files, generators) cannot be read without consuming them.
+    return None
+
+
+class HttpRequestSnapshot(_Snapshot):
+    """
+    A read-only snapshot of a :class:`requests.PreparedRequest` handed to the request logging hooks.
+    """
+
+    __slots__ = ("_headers", "_sampling")
+
+    def __init__(
+        self,
+        request: PreparedRequest,
+        sampling: SamplingDecision | None = None,
+        config: LoggingConfig | None = None,
+    ) -> None:
+        """
+        :param request: The request to snapshot.
+        :param sampling: The sampling decision of the exchange, if a sampler is set.
+        :param config: The configuration the exchange is logged with.
+        """
+        super().__init__(request, config)
+        object.__setattr__(self, "_headers", None)
+        object.__setattr__(self, "_sampling", sampling)
+
+    @property
+    def sampling(self) -> SamplingDecision | None:
+        return self._sampling
+
+    @property
+    def method(self) -> str | None:
+        return self._target.method
+
+    @property
+    def url(self) -> str | None:
+        return self._target.url
+
+    @property
+    def path_url(self) -> str:
+        return self._target.path_url
+
+    @property
+    def headers(self) -> FrozenHeaders:
+        if self._headers is None:
+            return self._cache("_headers", FrozenHeaders(self._target.headers))
+        return self._headers
+
+    @property
+    def body(self) -> bytes | str | memoryview | None:
+        """
+        The request body, shared without copying.
+
+        Mutable buffers are exposed as read-only memory views, and streamed
+        bodies (files or generators) are exposed as ``None``.
+        """
+        return _readonly_body(self._target.body)
+
+    @property
+    def body_view(self) -> memoryview | None:
+        """
+        A read-only memory view of a binary request body, or ``None`` for any other body.
+        """
+        body = self._target.body
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            return memoryview(body).toreadonly()
+        return None
+
+    @property
+    def params(self) -> dict:
+        params = getattr(self._target, "params", None)
+        return dict(params) if params else {}
+
+    def freeze(self) -> HttpRequestSnapshot:
+        """
+        Build the lazily computed views now, so the snapshot can be read from another thread.
+
+        :return: The snapshot itself.
+        """
+        _ = self.headers
+        return self
+
+    def __repr__(self) -> str:
+        return f"<HttpRequestSnapshot [{self.method}]>"
+
+
+class HttpResponseSnapshot(_Snapshot):
+    """
+    A read-only snapshot of a :class:`requests.Response` handed to the response logging hooks.
+    """
+
+    __slots__ = ("_headers", "_request", "_history", "_stream_capture", "_sampling", "_durations")
+
+    def __init__(
+        self,
+        response: Response,
+        stream_capture: ResponseStreamCapture | None = None,
+        sampling: SamplingDecision | None = None,
+        config: LoggingConfig | None = None,
+        durations: ExchangeDurations | None = None,
+    ) -> None:
+        """
+        :param response: The response to snapshot.
+        :param stream_capture: The captured body of a streamed response, which is used instead of its content.
+        :param sampling: The sampling decision of the exchange, if a sampler is set.
+        :param config: The configuration the exchange is logged with.
+        :param durations: The durations of the exchange, as measured by the session.
+        """
+        super().__init__(response, config)
+        object.__setattr__(self, "_stream_capture", stream_capture)
+        object.__setattr__(self, "_sampling", sampling)
+        object.__setattr__(self, "_durations", durations)
+        object.__setattr__(self, "_headers", None)
+        object.__setattr__(self, "_request", None)
+        object.__setattr__(self, "_history", None)
+
+    @property
+    def status_code(self) -> int:
+        return self._target.status_code
+
+    @property
+    def reason(self) -> str | None:
+        return self._target.reason
+
+    @property
+    def url(self) -> str | None:
+        return self._target.url
+
+    @property
+    def encoding(self) -> str | None:
+        return self._target.encoding
+
+    @property
+    def elapsed(self):
+        return self._target.elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self._target.ok
+
+    @property
+    def headers(self) -> FrozenHeaders:
+        if self._headers is None:
+            return self._cache("_headers", FrozenHeaders(self._target.headers))
+        return self._headers
+
+    @property
+    def request(self) -> HttpRequestSnapshot | None:
+        if self._request is None and self._target.request is not None:
+            return self._cache("_request", HttpRequestSnapshot(self._target.request, self._sampling, self._config))
+        return self._request
+
+    @property
+    def history(self) -> tuple[HttpResponseSnapshot, ...]:
+        if self._history is None:
+            return self._cache("_history", tuple(HttpResponseSnapshot(r) for r in self._target.history))
+        return self._history
+
+    @property
+    def sampling(self) -> SamplingDecision | None:
+        return self._sampling
+
+    @property
+    def timings(self) -> ConnectionTimings | None:
+        """
+        The connection phase timings of the response, if it was received by a `TimingHTTPAdapter`.
+        """
+        return getattr(self._target, "timings", None)
+
+    @property
+    def durations(self) -> ExchangeDurations | None:
+        """
+        The durations of the exchange (i.e. time to headers, total and logging overhead), as measured by the session.
+        """
+        return self._durations
+
+    @property
+    def stream_capture(self) -> ResponseStreamCapture | None:
+        """
+        The captured body of a streamed response, if the response was streamed.
+        """
+        return self._stream_capture
+
+    @property
+    def content(self) -> bytes | None:
+        """
+        The response body, or the captured part of it for a streamed response.
+        """
+        if self._stream_capture is not None:
+            return self._stream_capture.body
+        return self._target.content
+
+    @property
+    def body_length(self) -> int | None:
+        """
+        The total size of the response body, without reading it.
+
+        :return: The body length, or None if the body has not been read (yet).
+        """
+        if self._stream_capture is not None:
+            return self._stream_capture.body_length
+        content = getattr(self._target, "_content", None)
+        return len(content) if isinstance(content, bytes) else None
+
+    @property
+    def body_view(self) -> memoryview | None:
+        """
+        A read-only memory view of the response body.
+        """
+        content = self.content
+        return memoryview(content) if content is not None else None
+
+    @property
+    def text(self) -> str:
+        """
+        The response body as text, or the captured part of it for a streamed response.
+        """
+        if self._stream_capture is not None:
+            # The streamed body was consumed by the caller, so it's decoded from its captured bytes.
+            return self._stream_capture.body.decode(self._target.encoding or "utf-8", errors="replace")
+        return self._target.text
+
+    def json(self, **kwargs) -> Any:
+        """
+        The response body decoded from JSON, see :meth:`text`.
+
+        :raises requests.exceptions.JSONDecodeError: If the body isn't valid JSON (e.g. a truncated capture).
+        """
+        if self._stream_capture is not None:
+            try:
+                return json.loads(self.text, **kwargs)
+            except json.JSONDecodeError as e:
+                raise JSONDecodeError(e.msg, e.doc, e.pos)
+        return self._target.json(**kwargs)
+
+    def freeze(self, include_body: bool = False) -> HttpResponseSnapshot:
+        """
+        Build the lazily computed views now, so the snapshot can be read from another thread.
+
+        :param include_body: Whether to also read the response body on the calling thread.
+        :return: The snapshot itself.
+        """
+        _ = self.headers
+        if self.request is not None:
+            self.request.freeze()
+        if include_body:
+            _ = self.content
+        return self
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def __repr__(self) -> str:
+        return f"<HttpResponseSnapshot [{self.status_code}]>"
@@ -0,0 +1,140 @@
+"""
+This module contains the tee used to capture streamed (``stream=True``) response bodies.
+
+Instead of reading the whole body up front, the tee records at most N bytes of the body,
+plus the total byte count, while the caller consumes the stream. Once the stream is exhausted
+or closed, the completion callback is called, which is when the response gets logged.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator
+
+from requests import Response
+
+
+class ResponseStreamCapture:
+    """
+    The part of a streamed response body seen so far.
+    """
+
+    __slots__ = ("max_bytes", "body_length", "_chunks", "_captured", "_on_complete", "_completed")
+
+    max_bytes: int
+    body_length: int
+
+    def __init__(self, max_bytes: int, on_complete: Callable[[ResponseStreamCapture], None]) -> None:
+        """
+        :param max_bytes: The maximum number of body bytes to keep.
+        :param on_complete: Called once, when the stream is exhausted or closed.
+        """
+        self.max_bytes = max_bytes
+        self.body_length = 0
+        self._chunks = []
+        self._captured = 0
+        self._on_complete = on_complete
+        self._completed = False
+
+    @property
+    def body(self) -> bytes:
+        """
+        The first (at most) `max_bytes` bytes of the body.
+        """
+        return b"".join(self._chunks)
+
+    @property
+    def truncated(self) -> bool:
+        """
+        Whether part of the body was not kept.
+        """
+        return self.body_length > self._captured
+
+    @property
+    def completed(self) -> bool:
+        return self._completed
+
+    def record(self, chunk: bytes | memoryview) -> None:
+        size = len(chunk)
+        self.body_length += size
+        room = self.max_bytes - self._captured
+        if room > 0 and size:
+            kept = bytes(chunk[:room])
+            self._chunks.append(kept)
+            self._captured += len(kept)
+
+    def complete(self) -> None:
+        if not self._completed:
+            self._completed = True
+            self._on_complete(self)
+
+    @staticmethod
+    def install(
+        response: Response,
+        max_bytes: int,
+        on_complete: Callable[[ResponseStreamCapture], None],
+    ) -> ResponseStreamCapture | None:
+        """
+        Wrap the raw stream of a response with a capturing tee.
+
+        :param response: The streamed response.
+        :param max_bytes: The maximum number of body bytes to keep.
+        :param on_complete: Called once, when the stream is exhausted or closed.
+        :return: The capture, or None if the response has no raw stream to capture.
+        """
+        raw = response.raw
+        if raw is None:
+            return None
+        if isinstance(raw, _TeeRawStream):
+            return raw.capture
+        capture = ResponseStreamCapture(max_bytes, on_complete)
+        response.raw = _TeeRawStream(raw, capture)
+        return capture
+
+
+class _TeeRawStream:
+    """
+    A proxy of the raw (urllib3) response, recording the body chunks read through it.
+    """
+
+    __slots__ = ("raw", "capture")
+
+    def __init__(self, raw: Any, capture: ResponseStreamCapture) -> None:
+        self.raw = raw
+        self.capture = capture
+
+    def stream(self, *args, **kwargs) -> Iterator[bytes]:
+        for chunk in self.raw.stream(*args, **kwargs):
+            self.capture.record(chunk)
+            yield chunk
+        self.capture.complete()
+
+    def read(self, amt: int | None = None, *args, **kwargs) -> bytes:
+        data = self.raw.read(amt, *args, **kwargs)
+        self.capture.record(data)
+        if amt is None or not data:
+            self.capture.complete()
+        return data
+
+    def readinto(self, buffer) -> int:
+        size = self.raw.readinto(buffer)
+        self.capture.record(memoryview(buffer)[:size])
+        if not size:
+            self.capture.complete()
+        return size
+
+    def close(self) -> None:
+        try:
+            self.raw.close()
+        finally:
+            self.capture.complete()
+
+    def release_conn(self) -> None:
+        try:
+            release_conn = getattr(self.raw, "release_conn", None)
+            if release_conn is not None:
+                release_conn()
+        finally:
+            self.capture.complete()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
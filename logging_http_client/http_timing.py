@@ -0,0 +1,210 @@
+"""
+This module contains the connection phase timings of the exchanges, i.e. where the time of a slow exchange goes.
+
+The :class:`TimingHTTPAdapter` uses urllib3 connections that time their own phases:
+
+- dns: Resolving the host name (only for new connections).
+- connect: Opening the TCP connection (only for new connections).
+- tls: The TLS handshake (only for new HTTPS connections).
+- ttfb: From sending the request to receiving the response headers (i.e. the server think-time included).
+- download: Reading the response body (only for non-streamed responses).
+
+The timings are attached to the responses as `response.timings`, and only cost a few clock reads per
+exchange. The sessions only mount the adapter when the connection timings are enabled.
+
+The :class:`ExchangeDurations` are measured by the sessions themselves, for every logged exchange.
+"""
+
+from __future__ import annotations
+
+import socket
+import time
+from dataclasses import dataclass, replace
+from typing import Any
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.util.connection import allowed_gai_family
+
+# The attribute of the urllib3 responses holding their timings.
+_TIMINGS_ATTRIBUTE = "_logging_http_client_timings"
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionTimings:
+    """
+    The phase timings of an exchange, in milliseconds, where None stands for a phase that didn't happen.
+
+    - dns_ms: Resolving the host name, for a new connection.
+    - connect_ms: Opening the TCP connection, for a new connection.
+    - tls_ms: The TLS handshake, for a new HTTPS connection.
+    - ttfb_ms: From sending the request to receiving the response headers.
+    - download_ms: Reading the response body, for a non-streamed response.
+    - connection_reused: Whether the request was sent over a pooled (i.e. already open) connection.
+    """
+
+    dns_ms: float | None = None
+    connect_ms: float | None = None
+    tls_ms: float | None = None
+    ttfb_ms: float | None = None
+    download_ms: float | None = None
+    connection_reused: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ExchangeDurations:
+    """
+    The durations of an exchange as measured by the session, in milliseconds (with a microsecond precision).
+
+    - headers_ms: From sending the request to receiving the response headers, summed over the redirects (if any).
+    - total_ms: From sending the request to reading the whole body (or to exhausting the stream of a streamed
+      response), the redirects included.
+    - logging_overhead_ms: The time spent by the library sampling the exchange and running its request hooks.
+    - redirects: The number of redirects followed.
+    """
+
+    headers_ms: float
+    total_ms: float
+    logging_overhead_ms: float = 0.0
+    redirects: int = 0
+
+
+class _TimingConnectionMixin:
+    """
+    Times the phases of the urllib3 connections, see :class:`TimingHTTPAdapter`.
+    """
+
+    # The durations (in nanoseconds) of the phases of the last connect call, until a request takes them.
+    _dns_ns: int | None = None
+    _connect_ns: int | None = None
+    _tls_ns: int | None = None
+    # Whether the connection was opened for the request being sent.
+    _opened: bool = False
+    _request_started_at: int = 0
+
+    def _new_conn(self) -> socket.socket:
+        # The host is resolved up front, to time the resolution, and the connection attempted on each address in
+        # turn (like urllib3 does), with the resolved address as the DNS host (the TLS host name being unchanged).
+        host = self._dns_host
+        started_at = time.perf_counter_ns()
+        try:
+            addresses = socket.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # Let urllib3 raise its own resolution error.
+            return super()._new_conn()
+        resolved_at = time.perf_counter_ns()
+
+        error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                except Exception as e:
+                    error = e
+                    continue
+                self._dns_ns = resolved_at - started_at
+                self._connect_ns = time.perf_counter_ns() - resolved_at
+                return sock
+        finally:
+            self._dns_host = host
+        if error is None:
+            return super()._new_conn()
+        raise error
+
+    def connect(self) -> None:
+        self._dns_ns = self._connect_ns = self._tls_ns = None
+        started_at = time.perf_counter_ns()
+        super().connect()
+        if isinstance(self, HTTPSConnection) and self._connect_ns is not None:
+            # Whatever isn't resolving nor connecting is the TLS handshake (and the proxy tunnel, if any).
+            self._tls_ns = max(time.perf_counter_ns() - started_at - self._dns_ns - self._connect_ns, 0)
+        self._opened = True
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        # Plain HTTP connections are opened when sending the request, HTTPS ones beforehand (to validate them).
+        if self.sock is None:
+            self.connect()
+        self._request_started_at = time.perf_counter_ns()
+        super().request(*args, **kwargs)
+
+    def getresponse(self, *args: Any, **kwargs: Any) -> Any:
+        response = super().getresponse(*args, **kwargs)
+        ttfb_ns = time.perf_counter_ns() - self._request_started_at
+        opened, self._opened = self._opened, False
+        setattr(
+            response,
+            _TIMINGS_ATTRIBUTE,
+            ConnectionTimings(
+                dns_ms=to_ms(self._dns_ns) if opened else None,
+                connect_ms=to_ms(self._connect_ns) if opened else None,
+                tls_ms=to_ms(self._tls_ns) if opened else None,
+                ttfb_ms=to_ms(ttfb_ns),
+                connection_reused=not opened,
+            ),
+        )
+        return response
+
+
+class TimingHTTPConnection(_TimingConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimingHTTPSConnection(_TimingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimingHTTPConnection
+
+
+class TimingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimingHTTPSConnection
+
+
+_POOL_CLASSES_BY_SCHEME = {"http": TimingHTTPConnectionPool, "https": TimingHTTPSConnectionPool}
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """
+    A :class:`requests.adapters.HTTPAdapter` attaching the connection phase timings to its responses.
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _POOL_CLASSES_BY_SCHEME
+
+    def proxy_manager_for(self, proxy: str, **proxy_kwargs: Any) -> Any:
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        manager.pool_classes_by_scheme = _POOL_CLASSES_BY_SCHEME
+        return manager
+
+    def send(self, request: PreparedRequest, stream: bool = False, **kwargs: Any) -> Response:
+        response = super().send(request, stream=stream, **kwargs)
+        timings = getattr(response.raw, _TIMINGS_ATTRIBUTE, None)
+        if timings is not None and not stream:
+            # The body is read now (instead of by the session, right after), so its download can be timed.
+            started_at = time.perf_counter_ns()
+            _ = response.content
+            timings = replace(timings, download_ms=to_ms(time.perf_counter_ns() - started_at))
+        response.timings = timings
+        return response
+
+
+def elapsed_ms(response: Any) -> float:
+    """
+    Get the time to the response headers of a response and its redirects, i.e. the sum of their `elapsed`.
+
+    :param response: The :class:`requests.Response`.
+    :return: The duration, in milliseconds.
+    """
+    elapsed = response.elapsed.total_seconds()
+    for redirect in response.history or ():
+        elapsed += redirect.elapsed.total_seconds()
+    return round(elapsed * 1000, 3)
+
+
+def to_ms(duration_ns: int | None) -> float | None:
+    return round(duration_ns / 1_000_000, 3) if duration_ns is not None else None
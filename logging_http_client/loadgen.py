@@ -0,0 +1,395 @@
+"""
+This module contains a load generator built on the logging HTTP clients.
+
+It's run with ``python -m logging_http_client.loadgen``.
+
+The requests (a single URL, or the ones of a request file) are sent in a round-robin by a
+number of workers, i.e. threads (each with its own client) or asyncio tasks (sharing an
+asyncio client), for a fixed duration:
+
+- in closed-loop mode (the default), each worker sends its next request as soon as the previous
+  one completes, i.e. at the maximum throughput of the workers.
+- in open-loop mode (``--rate``), the requests are sent at a fixed rate, each one's latency being
+  measured from the time it was scheduled at, so a slow server isn't hidden by fewer requests
+  being sent (i.e. no coordinated omission).
+
+The latencies are recorded into an HDR-style :class:`LatencyHistogram` per worker, merged at the
+end. The logging of the clients can be turned off, sampled or full, to measure its cost under load.
+
+Usage: ``python -m logging_http_client.loadgen http://localhost:8080/items -c 16 -d 30 --rate 500 --logging sampled``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import logging_http_client
+from logging_http_client.logging_json import BufferedJsonLineHandler
+from logging_http_client.logging_metrics import LatencyHistogram
+from logging_http_client.logging_sampling import RateSampler
+
+# The logging modes, i.e. the client's overrides of the logging configuration.
+LOGGING_MODES = ("off", "sampled", "full")
+# The percentiles of the latency distribution in the report.
+REPORT_PERCENTILES = (50, 75, 90, 95, 99, 99.9, 99.99)
+
+
+@dataclass(frozen=True)
+class RequestTemplate:
+    """
+    A request sent by the load generator.
+    """
+
+    method: str
+    url: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+    body: bytes | None = None
+
+
+@dataclass
+class LoadResult:
+    """
+    The outcome of a load run.
+    """
+
+    duration_s: float
+    histogram: LatencyHistogram
+    statuses: Counter
+    errors: Counter
+
+    @property
+    def requests(self) -> int:
+        return self.histogram.count
+
+    @property
+    def throughput_rps(self) -> float:
+        return self.requests / self.duration_s if self.duration_s else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """
+        The ratio of the requests that raised an exception, or got a 5xx response.
+        """
+        failed = sum(self.errors.values()) + sum(count for status, count in self.statuses.items() if status >= 500)
+        return failed / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "duration_s": round(self.duration_s, 3),
+            "requests": self.requests,
+            "throughput_rps": round(self.throughput_rps, 2),
+            "error_rate": round(self.error_rate, 5),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "errors": dict(self.errors),
+            "latency": self.histogram.to_dict(),
+            "percentiles_ms": {str(p): self.histogram.percentile(p) for p in REPORT_PERCENTILES},
+        }
+
+
+class _Worker:
+    # The recordings of a single worker, so the workers don't share any state but the schedule.
+    __slots__ = ("histogram", "statuses", "errors")
+
+    def __init__(self) -> None:
+        self.histogram = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+
+
+class _Schedule:
+    # The requests to send, and when to send them.
+
+    def __init__(self, templates: Sequence[RequestTemplate], duration_s: float, rate: float | None) -> None:
+        self._templates = templates
+        self._interval_ns = int(1e9 / rate) if rate else 0
+        # Taking the next ticket with `next` is atomic, so the threads don't need a lock.
+        self._tickets = itertools.count()
+        self.started_ns = time.perf_counter_ns()
+        self.deadline_ns = self.started_ns + int(duration_s * 1e9)
+
+    def next(self) -> Tuple[RequestTemplate, int] | None:
+        """
+        Get the next request, and when it's due, or None once the duration is over.
+        """
+        ticket = next(self._tickets)
+        if self._interval_ns:
+            due_ns = self.started_ns + ticket * self._interval_ns
+        else:
+            due_ns = time.perf_counter_ns()
+        if due_ns >= self.deadline_ns:
+            return None
+        return self._templates[ticket % len(self._templates)], due_ns
+
+
+def logging_config_of(mode: str, sample_rate: float = 0.01) -> Dict[str, Any]:
+    """
+    Get the client's overrides of the logging configuration for a logging mode.
+
+    :param mode: The logging mode, i.e. "off", "sampled" or "full".
+    :param sample_rate: The ratio of the exchanges logged in "sampled" mode.
+    :return: The overrides, see `LoggingConfigScope`.
+    """
+    if mode == "off":
+        return {"request_logging_enabled": False, "response_logging_enabled": False}
+    if mode == "sampled":
+        return {"logging_sampler": RateSampler(sample_rate)}
+    if mode == "full":
+        return {}
+    raise ValueError(f"Unsupported logging mode: {mode}, expected one of: {', '.join(LOGGING_MODES)}")
+
+
+def read_request_file(path: str) -> List[RequestTemplate]:
+    """
+    Read the requests of a request file, i.e. a ``[METHOD] URL`` line per request (GET by default).
+
+    The blank lines and the ones starting with a "#" are skipped.
+
+    :param path: The path of the request file.
+    :return: The requests.
+    :raises ValueError: If the file holds no request.
+    """
+    templates = []
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            method, _, url = line.rpartition(" ")
+            templates.append(RequestTemplate(method.strip().upper() or "GET", url))
+    if not templates:
+        raise ValueError(f"No request found in the request file: {path}")
+    return templates
+
+
+def run_threads(
+    templates: Sequence[RequestTemplate],
+    concurrency: int,
+    duration_s: float,
+    rate: float | None = None,
+    logger: logging.Logger = logging.getLogger(),
+    logging_config: Mapping[str, Any] | None = None,
+    timeout: float = 30.0,
+) -> LoadResult:
+    """
+    Generate load with threads, each sending its requests with its own client.
+
+    :param templates: The requests, sent in a round-robin.
+    :param concurrency: The number of threads.
+    :param duration_s: The duration of the run, in seconds.
+    :param rate: The number of requests per second in open-loop mode, or None for closed-loop mode.
+    :param logger: The logger of the clients.
+    :param logging_config: The clients' overrides of the logging configuration, see `logging_config_of`.
+    :param timeout: The timeout of the requests, in seconds.
+    :return: The outcome of the run.
+    """
+    clients = [logging_http_client.create(logger=logger, logging_config=logging_config) for _ in range(concurrency)]
+    workers = [_Worker() for _ in range(concurrency)]
+    schedule = _Schedule(templates, duration_s, rate)
+
+    def run(client: logging_http_client.LoggingHttpClient, worker: _Worker) -> None:
+        while (scheduled := schedule.next()) is not None:
+            template, due_ns = scheduled
+            delay_ns = due_ns - time.perf_counter_ns()
+            if delay_ns > 0:
+                time.sleep(delay_ns / 1e9)
+            try:
+                response = client.request(
+                    template.method, template.url, headers=template.headers, data=template.body, timeout=timeout
+                )
+                worker.statuses[response.status_code] += 1
+                error = response.status_code >= 500
+            except Exception as e:
+                worker.errors[type(e).__name__] += 1
+                error = True
+            worker.histogram.record((time.perf_counter_ns() - due_ns) // 1000, error)
+
+    threads = [
+        threading.Thread(target=run, args=(client, worker), name=f"loadgen-{index}")
+        for index, (client, worker) in enumerate(zip(clients, workers))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for client in clients:
+        client.close()
+    return _result_of(workers, schedule)
+
+
+async def run_tasks(
+    templates: Sequence[RequestTemplate],
+    concurrency: int,
+    duration_s: float,
+    rate: float | None = None,
+    logger: logging.Logger = logging.getLogger(),
+    logging_config: Mapping[str, Any] | None = None,
+    timeout: float = 30.0,
+) -> LoadResult:
+    """
+    Generate load with asyncio tasks, sharing an asyncio client (which requires the ``async`` extra).
+
+    :param templates: The requests, sent in a round-robin.
+    :param concurrency: The number of tasks, which is also the maximum number of connections.
+    :param duration_s: The duration of the run, in seconds.
+    :param rate: The number of requests per second in open-loop mode, or None for closed-loop mode.
+    :param logger: The logger of the client.
+    :param logging_config: The client's overrides of the logging configuration, see `logging_config_of`.
+    :param timeout: The timeout of the requests, in seconds.
+    :return: The outcome of the run.
+    """
+    import httpx
+
+    workers = [_Worker() for _ in range(concurrency)]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    client = logging_http_client.create_async(
+        logger=logger, logging_config=logging_config, limits=limits, timeout=timeout
+    )
+    schedule = _Schedule(templates, duration_s, rate)
+
+    async def run(worker: _Worker) -> None:
+        while (scheduled := schedule.next()) is not None:
+            template, due_ns = scheduled
+            delay_ns = due_ns - time.perf_counter_ns()
+            if delay_ns > 0:
+                await asyncio.sleep(delay_ns / 1e9)
+            try:
+                response = await client.request(
+                    template.method, template.url, headers=template.headers, content=template.body
+                )
+                worker.statuses[response.status_code] += 1
+                error = response.status_code >= 500
+            except Exception as e:
+                worker.errors[type(e).__name__] += 1
+                error = True
+            worker.histogram.record((time.perf_counter_ns() - due_ns) // 1000, error)
+
+    async with client:
+        await asyncio.gather(*(run(worker) for worker in workers))
+    return _result_of(workers, schedule)
+
+
+def format_report(result: LoadResult, mode: str) -> str:
+    """
+    Format the outcome of a run as a human-readable report.
+
+    :param result: The outcome of the run.
+    :param mode: The logging mode of the run.
+    :return: The report.
+    """
+    histogram = result.histogram
+    lines = [
+        f"Requests:    {result.requests} in {result.duration_s:.2f}s (logging: {mode})",
+        f"Throughput:  {result.throughput_rps:.2f} req/s",
+        f"Error rate:  {result.error_rate:.3%}",
+        "Statuses:    " + (", ".join(f"{s}: {c}" for s, c in sorted(result.statuses.items())) or "-"),
+        "Errors:      " + (", ".join(f"{e}: {c}" for e, c in result.errors.most_common()) or "-"),
+        "",
+        "Latency (ms):",
+        f"  {'min':>7} {histogram.to_dict()['min_ms']:>10.3f}",
+        f"  {'mean':>7} {histogram.mean_ms:>10.3f}",
+    ]
+    lines += [f"  {f'p{p:g}':>7} {histogram.percentile(p):>10.3f}" for p in REPORT_PERCENTILES]
+    lines.append(f"  {'max':>7} {histogram.max_us / 1000:>10.3f}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m logging_http_client.loadgen",
+        description="Generate HTTP load with the logging HTTP client, and report its throughput and latencies.",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("url", nargs="?", help="The URL to send the requests to.")
+    target.add_argument("-f", "--request-file", help="A file holding a '[METHOD] URL' line per request.")
+    parser.add_argument("-X", "--method", help="The method of the requests to the URL (GET by default).")
+    parser.add_argument("-H", "--header", action="append", default=[], help="A 'Name: value' header, repeatable.")
+    parser.add_argument("--data", help="The body of the requests.")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="The number of threads or tasks.")
+    parser.add_argument("--mode", choices=("threads", "asyncio"), default="threads")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="The duration of the run, in seconds.")
+    parser.add_argument("-r", "--rate", type=float, help="The requests per second (open-loop), max if omitted.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="The timeout of the requests, in seconds.")
+    parser.add_argument("--logging", choices=LOGGING_MODES, default="full", dest="logging_mode")
+    parser.add_argument("--sample-rate", type=_ratio, default=0.01, help="The ratio of the exchanges logged.")
+    parser.add_argument("--log-file", default=os.devnull, help="The file to write the log records to, as JSON.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.concurrency <= 0:
+        parser.error("--concurrency must be positive")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+    if args.mode == "asyncio":
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            parser.error("--mode asyncio requires httpx, i.e. pip install 'logging-http-client[async]'")
+
+    if args.request_file:
+        if args.method is not None or args.header or args.data is not None:
+            parser.error("-X/--method, -H/--header and --data only apply to the URL, not to the --request-file")
+        templates = read_request_file(args.request_file)
+    else:
+        headers = {}
+        for header in args.header:
+            name, separator, value = header.partition(":")
+            if not separator or not name.strip():
+                parser.error(f"invalid header {header!r}, expected 'Name: value'")
+            headers[name.strip()] = value.strip()
+        body = args.data.encode() if args.data is not None else None
+        templates = [RequestTemplate((args.method or "GET").upper(), args.url, headers, body)]
+
+    with open(args.log_file, "w") as log_file:
+        logger = logging.getLogger("logging_http_client.loadgen")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = BufferedJsonLineHandler(log_file)
+        logger.addHandler(handler)
+        logging_config = logging_config_of(args.logging_mode, args.sample_rate)
+        try:
+            options = dict(logger=logger, logging_config=logging_config, timeout=args.timeout)
+            if args.mode == "asyncio":
+                result = asyncio.run(run_tasks(templates, args.concurrency, args.duration, args.rate, **options))
+            else:
+                result = run_threads(templates, args.concurrency, args.duration, args.rate, **options)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+    if args.json:
+        print(json.dumps({"logging": args.logging_mode, **result.to_dict()}, indent=2))
+    else:
+        print(format_report(result, args.logging_mode))
+    return 0
+
+
+def _ratio(value: str) -> float:
+    ratio = float(value)
+    if not 0.0 <= ratio <= 1.0:
+        raise argparse.ArgumentTypeError(f"must be between 0.0 and 1.0, got: {value}")
+    return ratio
+
+
+def _result_of(workers: Sequence[_Worker], schedule: _Schedule) -> LoadResult:
+    histogram, statuses, errors = LatencyHistogram(), Counter(), Counter()
+    for worker in workers:
+        histogram.merge(worker.histogram)
+        statuses.update(worker.statuses)
+        errors.update(worker.errors)
+    duration_s = (time.perf_counter_ns() - schedule.started_ns) / 1e9
+    return LoadResult(duration_s, histogram, statuses, errors)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
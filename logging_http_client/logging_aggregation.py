@@ -0,0 +1,290 @@
+"""
+This module contains the aggregation mode of the default logging hooks, collapsing the repeated exchanges.
+
+Health checks and polling loops log thousands of near-identical records. In aggregation mode, the
+default hooks hand the exchanges to a :class:`LogAggregator` instead of the logger, which merges
+the exchanges sharing a (host, method, route, status) key within a time window into a single
+AGGREGATE record, with their count, min/avg/max durations and byte totals. The fields that vary
+(e.g. the request ids) are dropped, but for the first request id of each window, kept as a sample.
+The exchanges that raised (e.g. connection errors or timeouts) are aggregated under the status 0
+(omitted from the records, as any zero value) and the type of their exception.
+
+The REQUEST record of an aggregated exchange is deferred until its outcome is known, as only then
+can the aggregator tell whether it takes the exchange. The number of keys is bounded: once it's
+reached, the exchanges of any new key are logged as usual (REQUEST and RESPONSE records) until the
+next flush. The windows are flushed by a background timer thread, and at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from typing import Callable, Dict, Tuple
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response
+
+from logging_http_client.http_body_policy import body_length
+from logging_http_client.http_fork_safety import reset_after_fork
+from logging_http_client.http_headers import X_REQUEST_ID_HEADER
+from logging_http_client.http_log_record import HttpAggregateLogRecord
+from logging_http_client.http_route import RouteNormalizer
+from logging_http_client.http_snapshot import HttpResponseSnapshot, exchange_config
+
+# The status of the exchanges that raised, i.e. that got no response.
+ERROR_STATUS = 0
+
+# The key of an aggregate, i.e. its logger, level, host, method, route, status code and exception type.
+_AggregateKey = Tuple[logging.Logger, int, str, str, str, int, str]
+
+
+class _Aggregate:
+    # The exchanges of a key, within the current window.
+    __slots__ = (
+        "started_at",
+        "count",
+        "total_ms",
+        "min_ms",
+        "max_ms",
+        "request_bytes",
+        "response_bytes",
+        "sample_request_id",
+    )
+
+    def __init__(self, sample_request_id: str | None) -> None:
+        self.started_at = time.monotonic()
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.sample_request_id = sample_request_id
+
+
+class LogAggregator:
+    """
+    Merges the repeated exchanges logged by the default hooks into periodic AGGREGATE records.
+    """
+
+    window_s: float
+    max_keys: int
+    _predicate: Callable[[PreparedRequest], bool] | None
+
+    _lock: threading.Lock
+    _aggregates: Dict[_AggregateKey, _Aggregate]
+    _worker: threading.Thread | None
+    _stopped: threading.Event
+
+    def __init__(
+        self,
+        window_s: float = 10.0,
+        max_keys: int = 1024,
+        predicate: Callable[[PreparedRequest], bool] | None = None,
+    ) -> None:
+        """
+        :param window_s: The duration of the aggregation windows, in seconds.
+        :param max_keys: The maximum number of keys aggregated within a window.
+        :param predicate: Decides which requests are aggregated (e.g. the health checks), defaults to all of them.
+        """
+        if window_s <= 0:
+            raise ValueError("window_s must be positive")
+        if max_keys <= 0:
+            raise ValueError("max_keys must be a positive integer")
+
+        self.window_s = window_s
+        self.max_keys = max_keys
+        self._predicate = predicate
+
+        self._lock = threading.Lock()
+        self._aggregates = {}
+        self._worker = None
+        self._stopped = threading.Event()
+
+        self._aggregated_count = 0
+        self._overflow_count = 0
+        self._summary_count = 0
+        reset_after_fork(self)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the aggregator counters.
+
+        :return: The number of keys of the current window, and the aggregated, overflow and summary record counts.
+        """
+        return {
+            "keys": len(self._aggregates),
+            "aggregated": self._aggregated_count,
+            "overflow": self._overflow_count,
+            "summaries": self._summary_count,
+        }
+
+    def accepts(self, request: PreparedRequest) -> bool:
+        """
+        Whether the exchange of a request is to be aggregated, i.e. its REQUEST record is deferred until its outcome.
+
+        :param request: The request.
+        :return: True if the exchange is to be aggregated.
+        """
+        return self._predicate is None or bool(self._predicate(request))
+
+    def add(self, logger: logging.Logger, level: int, response: Response) -> bool:
+        """
+        Add an exchange to the current window.
+
+        :param logger: The logger to emit the summary record with.
+        :param level: The logging level of the summary record.
+        :param response: The response of the exchange.
+        :return: False if the exchange isn't aggregated (i.e. it must be logged as usual), True otherwise.
+        """
+        request = response.request
+        if request is None or self._stopped.is_set() or not self.accepts(request):
+            return False
+        if not logger.isEnabledFor(level):
+            return True
+
+        snapshot = response if isinstance(response, HttpResponseSnapshot) else HttpResponseSnapshot(response)
+        durations = snapshot.durations
+        duration_ms = durations.total_ms if durations is not None else response.elapsed.total_seconds() * 1000
+        route_normalizer = exchange_config(response).route_normalizer
+        return self._add(
+            logger, level, request, route_normalizer, response.status_code, "", duration_ms, snapshot.body_length or 0
+        )
+
+    def add_error(
+        self, logger: logging.Logger, level: int, request: PreparedRequest, error: BaseException, duration_ms: float
+    ) -> bool:
+        """
+        Add an exchange that raised (e.g. a connection error or a timeout) to the current window.
+
+        :param logger: The logger to emit the summary record with.
+        :param level: The logging level of the summary record.
+        :param request: The request of the exchange.
+        :param error: The exception the exchange raised.
+        :param duration_ms: The duration of the exchange, up to the exception, in milliseconds.
+        :return: False if the exchange isn't aggregated (i.e. it must be logged as usual), True otherwise.
+        """
+        if self._stopped.is_set() or not self.accepts(request):
+            return False
+        if not logger.isEnabledFor(level):
+            return True
+
+        route_normalizer = exchange_config(request).route_normalizer
+        return self._add(logger, level, request, route_normalizer, ERROR_STATUS, type(error).__name__, duration_ms, 0)
+
+    def _add(
+        self,
+        logger: logging.Logger,
+        level: int,
+        request: PreparedRequest,
+        route_normalizer: RouteNormalizer | None,
+        status: int,
+        error: str,
+        duration_ms: float,
+        response_bytes: int,
+    ) -> bool:
+        host, route = _host_and_route(request, route_normalizer)
+        key = (logger, level, host, request.method, route, status, error)
+        request_bytes = body_length(request.body) or 0
+
+        with self._lock:
+            aggregate = self._aggregates.get(key)
+            if aggregate is None:
+                if len(self._aggregates) >= self.max_keys:
+                    self._overflow_count += 1
+                    return False
+                aggregate = self._aggregates[key] = _Aggregate(request.headers.get(X_REQUEST_ID_HEADER))
+            aggregate.count += 1
+            aggregate.total_ms += duration_ms
+            if duration_ms < aggregate.min_ms:
+                aggregate.min_ms = duration_ms
+            if duration_ms > aggregate.max_ms:
+                aggregate.max_ms = duration_ms
+            aggregate.request_bytes += request_bytes
+            aggregate.response_bytes += response_bytes
+            self._aggregated_count += 1
+
+        if self._worker is None:
+            self._start()
+        return True
+
+    def flush(self) -> int:
+        """
+        Emit the summary records of the current window, and start a new one.
+
+        :return: The number of summary records emitted.
+        """
+        with self._lock:
+            aggregates, self._aggregates = self._aggregates, {}
+
+        now = time.monotonic()
+        for (logger, level, host, method, route, status, error), aggregate in aggregates.items():
+            record = HttpAggregateLogRecord(
+                aggregate_host=host,
+                aggregate_method=method,
+                aggregate_route=route,
+                aggregate_status=status,
+                aggregate_error=error,
+                aggregate_count=aggregate.count,
+                aggregate_window_ms=int((now - aggregate.started_at) * 1000),
+                aggregate_duration_min_ms=round(aggregate.min_ms, 3),
+                aggregate_duration_avg_ms=round(aggregate.total_ms / aggregate.count, 3),
+                aggregate_duration_max_ms=round(aggregate.max_ms, 3),
+                aggregate_request_bytes=aggregate.request_bytes,
+                aggregate_response_bytes=aggregate.response_bytes,
+                aggregate_sample_request_id=aggregate.sample_request_id,
+            )
+            try:
+                logger.log(level, "AGGREGATE", extra=record.to_extra())
+            except Exception as e:
+                logger.exception("Error emitting aggregated HTTP log record", exc_info=e)
+        with self._lock:
+            self._summary_count += len(aggregates)
+        return len(aggregates)
+
+    def shutdown(self) -> None:
+        """
+        Stop the timer thread, and flush the current window.
+
+        The exchanges added after the shutdown are logged as usual (REQUEST and RESPONSE records).
+        """
+        self._stopped.set()
+        atexit.unregister(self.shutdown)
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(self.window_s)
+        self.flush()
+
+    def _after_fork_in_child(self) -> None:
+        # The timer isn't running in the child, and the current window is the parent's to flush.
+        stopped = self._stopped.is_set()
+        self._lock = threading.Lock()
+        self._aggregates = {}
+        self._worker = None
+        self._stopped = threading.Event()
+        if stopped:
+            self._stopped.set()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._worker is not None or self._stopped.is_set():
+                return
+            self._worker = threading.Thread(target=self._run, name="logging-http-client-aggregator", daemon=True)
+            self._worker.start()
+        atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.window_s):
+            self.flush()
+
+
+def _host_and_route(request: PreparedRequest, normalizer: RouteNormalizer | None) -> Tuple[str, str]:
+    if normalizer is not None:
+        try:
+            return normalizer.normalize(request.url or "")
+        except ValueError:
+            pass
+    parts = urlsplit(request.url or "")
+    return parts.netloc, parts.path or "/"
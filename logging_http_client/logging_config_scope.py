@@ -0,0 +1,99 @@
+"""
+This module contains the per-client configuration scopes.
+
+A scope holds a client's own overrides of the global configuration (e.g. body logging for a
+low-volume upstream only), and inherits every other field from it. The overrides are checked
+once, when the scope is built, and the resolved :class:`LoggingConfig` is cached against the
+global snapshot it was resolved from, so an exchange only pays for an identity check, unless
+the global configuration has changed since the previous exchange.
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields, replace
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_request_id import uuid4_request_id
+from logging_http_client.logging_http_client_config_globals import LoggingConfig
+
+# The fields that can be overridden, i.e. all of them but the version and the derived decisions.
+_OVERRIDABLE_FIELDS = frozenset(field.name for field in fields(LoggingConfig) if field.init) - {"version"}
+# The fields holding sequences, stored as tuples like the setters of the global configuration do.
+_SEQUENCE_FIELDS = frozenset(
+    {
+        "request_log_record_obscurers",
+        "response_log_record_obscurers",
+        "request_logging_hooks",
+        "response_logging_hooks",
+    }
+)
+
+
+class LoggingConfigScope:
+    """
+    The configuration of a client, i.e. the global configuration with some of its fields overridden.
+
+    The fields are named after the ones of :class:`LoggingConfig`, e.g.
+    ``LoggingConfigScope(response_body_logging_enabled=True, response_logging_hooks=[my_hook])``.
+    """
+
+    __slots__ = ("_overrides", "_resolved")
+
+    _overrides: Mapping[str, Any]
+    _resolved: Tuple[LoggingConfig | None, LoggingConfig | None]
+
+    def __init__(self, **overrides: Any) -> None:
+        """
+        :param overrides: The fields of the global configuration to override.
+        :raises TypeError: If a field is unknown, or cannot be overridden.
+        """
+        unsupported = set(overrides) - _OVERRIDABLE_FIELDS
+        if unsupported:
+            raise TypeError(f"Unsupported configuration overrides: {', '.join(sorted(unsupported))}")
+
+        normalised = {}
+        for name, value in overrides.items():
+            if name in _SEQUENCE_FIELDS:
+                value = tuple(value or ())
+            elif name == "request_id_provider" and value is None:
+                value = uuid4_request_id
+            normalised[name] = value
+        self._overrides = MappingProxyType(normalised)
+        self._resolved = (None, None)
+
+    @classmethod
+    def of(cls, scope: LoggingConfigScope | Mapping[str, Any] | None) -> LoggingConfigScope | None:
+        """
+        Get the scope of a client's `logging_config` argument.
+
+        :param scope: A scope, the overrides of a new scope, or None for the global configuration.
+        :return: The scope, or None.
+        """
+        if scope is None or isinstance(scope, LoggingConfigScope):
+            return scope
+        return cls(**scope)
+
+    @property
+    def overrides(self) -> Mapping[str, Any]:
+        """
+        The overridden fields, as a read-only mapping.
+        """
+        return self._overrides
+
+    def resolve(self) -> LoggingConfig:
+        """
+        Get the configuration of the scope, i.e. the current global configuration with the overrides applied.
+
+        :return: The configuration.
+        """
+        base = config.get_config()
+        resolved = self._resolved
+        if resolved[0] is not base:
+            # The (base, resolved) pair is swapped in at once, so concurrent readers always see a consistent pair.
+            resolved = self._resolved = (base, replace(base, **self._overrides))
+        return resolved[1]
+
+    def __repr__(self) -> str:
+        return f"LoggingConfigScope({', '.join(f'{k}={v!r}' for k, v in self._overrides.items())})"
@@ -0,0 +1,152 @@
+"""
+This module contains the process-wide default client behind the module-level request helpers.
+
+The helpers (i.e. `logging_http_client.get`, `post`, `request`, ...) used to build a new client,
+and so a new session with new connection pools, on every call. They now share a lazily created
+client, which keeps its connections alive across calls. As a session isn't thread-safe, the client
+pools its sessions (see :class:`~logging_http_client.http_session_pool.SessionPool`), each call
+checking one out. Unlike a regular reusable session, the sessions do NOT persist cookies across
+calls, to keep the behaviour of the stateless `requests` helpers the library is a drop-in
+replacement for.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from http.cookiejar import Cookie, DefaultCookiePolicy
+
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE
+
+from logging_http_client.http_session import LoggingSession
+from logging_http_client.logging_http_client_class import LoggingHttpClient
+
+# The maximum number of sessions of the default client, i.e. of concurrent calls not waiting for a session.
+DEFAULT_SESSION_POOL_SIZE = 32
+
+_lock = threading.Lock()
+_default_client: LoggingHttpClient | None = None
+
+_pool_connections: int = DEFAULT_POOLSIZE
+_pool_maxsize: int = DEFAULT_POOLSIZE
+_pool_block: bool = DEFAULT_POOLBLOCK
+_session_pool_size: int = DEFAULT_SESSION_POOL_SIZE
+_session_pool_timeout: float | None = None
+
+
+class _NoPersistedCookiesPolicy(DefaultCookiePolicy):
+    """
+    A cookie policy that refuses to store the cookies set by responses in the session jar.
+
+    The cookies are still carried through the redirects of a single call, as requests
+    collects those in a per-request jar.
+    """
+
+    def set_ok(self, cookie: Cookie, request) -> bool:
+        return False
+
+
+class _DefaultClient(LoggingHttpClient):
+    """
+    The default client, whose pooled sessions don't persist cookies, and have connection pools of the configured size.
+    """
+
+    def __init__(self, pool_connections: int, pool_maxsize: int, pool_block: bool, **kwargs) -> None:
+        self._pool_kwargs = {
+            "pool_connections": pool_connections,
+            "pool_maxsize": pool_maxsize,
+            "pool_block": pool_block,
+        }
+        super().__init__(logger=logging.getLogger(), **kwargs)
+
+    def _new_session(self) -> LoggingSession:
+        session = super()._new_session()
+        session.cookies.set_policy(_NoPersistedCookiesPolicy())
+        for prefix in ("https://", "http://"):
+            # The adapter type mounted by the session is kept, e.g. a `TimingHTTPAdapter`.
+            adapter_type = type(session.get_adapter(prefix))
+            session.mount(prefix, adapter_type(**self._pool_kwargs))
+        return session
+
+
+def get_default_client() -> LoggingHttpClient:
+    """
+    Get the process-wide default client, creating it on first use.
+
+    :return: The default client.
+    """
+    client = _default_client
+    if client is None:
+        with _lock:
+            client = _default_client
+            if client is None:
+                client = _create_default_client()
+    return client
+
+
+def configure_default_client(
+    pool_connections: int = DEFAULT_POOLSIZE,
+    pool_maxsize: int = DEFAULT_POOLSIZE,
+    pool_block: bool = DEFAULT_POOLBLOCK,
+    session_pool_size: int = DEFAULT_SESSION_POOL_SIZE,
+    session_pool_timeout: float | None = None,
+) -> None:
+    """
+    Configure the connection pools of the default client used by the module-level request helpers.
+
+    The current default client (if any) is closed, and a new one is created on the next call.
+
+    :param pool_connections: The number of per-host connection pools to cache, per session.
+    :param pool_maxsize: The maximum number of connections to keep alive per host, per session.
+    :param pool_block: Whether to wait for a free connection when a host pool is exhausted, instead of opening
+        a new (not kept alive) one.
+    :param session_pool_size: The maximum number of sessions, i.e. of concurrent calls. The calls beyond it wait
+        for a session to be free.
+    :param session_pool_timeout: The maximum time to wait for a free session, in seconds, or None to wait indefinitely.
+    """
+    global _pool_connections, _pool_maxsize, _pool_block, _session_pool_size, _session_pool_timeout
+    if session_pool_size <= 0:
+        raise ValueError("session_pool_size must be a positive integer")
+    with _lock:
+        _pool_connections = pool_connections
+        _pool_maxsize = pool_maxsize
+        _pool_block = pool_block
+        _session_pool_size = session_pool_size
+        _session_pool_timeout = session_pool_timeout
+    reset_default_client()
+
+
+def reset_default_client() -> None:
+    """
+    Close the default client, so a new one is created on the next call.
+    """
+    global _default_client
+    with _lock:
+        client, _default_client = _default_client, None
+    if client is not None:
+        client.close()
+
+
+def _create_default_client() -> LoggingHttpClient:
+    global _default_client
+
+    _default_client = _DefaultClient(
+        _pool_connections,
+        _pool_maxsize,
+        _pool_block,
+        session_pool_size=_session_pool_size,
+        session_pool_timeout=_session_pool_timeout,
+    )
+    return _default_client
+
+
+def _forget_default_client_after_fork() -> None:
+    # The child must not reuse (nor close) the connections it inherited from its parent.
+    global _lock, _default_client
+    _lock = threading.Lock()
+    _default_client = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_default_client_after_fork)
@@ -4,21 +4,99 @@ import logging
 
 from requests import PreparedRequest, Response
 
-import logging_http_client.logging_http_client_config_globals as config
 from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.http_snapshot import HttpRequestSnapshot, HttpResponseSnapshot, exchange_config
+from logging_http_client.logging_http_client_config_globals import LoggingConfig
 
 
 def default_request_logging_hook(logger: logging.Logger, request: PreparedRequest) -> None:
-    logger.log(
-        level=config.get_default_hooks_logging_level(),
-        msg="REQUEST",
-        extra=HttpLogRecord.from_request(request),
-    )
+    config = exchange_config(request)
+    if _defers_request(config, request):
+        # The REQUEST record waits for the outcome, which tells whether the exchange is aggregated.
+        return
+    _log_request(logger, config, request)
 
 
 def default_response_logging_hook(logger: logging.Logger, response: Response) -> None:
+    config = exchange_config(response)
+    if response.request is not None and _defers_request(config, response.request):
+        if config.log_aggregator.add(logger, config.default_hooks_logging_level, response):
+            return
+        # NOT aggregated (e.g. too many keys), so the exchange is logged as usual.
+        _log_request(logger, config, response.request)
+
+    limiter = config.log_rate_limiter
+    if limiter is not None and not limiter.allow(logger, config.default_hooks_logging_level, response.request):
+        return
+
+    pipeline = config.log_emission_pipeline
+    if pipeline is not None:
+        snapshot = (
+            response if isinstance(response, HttpResponseSnapshot) else HttpResponseSnapshot(response, config=config)
+        )
+        pipeline.submit(
+            logger,
+            config.default_hooks_logging_level,
+            "RESPONSE",
+            HttpLogRecord.from_response,
+            snapshot.freeze(include_body=config.response_body_logging_enabled),
+        )
+        return
+
     logger.log(
-        level=config.get_default_hooks_logging_level(),
+        level=config.default_hooks_logging_level,
         msg="RESPONSE",
         extra=HttpLogRecord.from_response(response),
     )
+
+
+def default_error_logging_hook(
+    logger: logging.Logger, request: PreparedRequest, error: BaseException, duration_ms: float
+) -> None:
+    """
+    Log an exchange that raised (i.e. got no response), once its request hooks were applied.
+
+    Only the exchanges whose REQUEST record was deferred by the aggregation mode are concerned: they're
+    aggregated under the error, or have their REQUEST record logged as usual.
+    """
+    config = exchange_config(request)
+    if not _defers_request(config, request):
+        return
+    if not config.log_aggregator.add_error(logger, config.default_hooks_logging_level, request, error, duration_ms):
+        _log_request(logger, config, request)
+
+
+def _defers_request(config: LoggingConfig, request: PreparedRequest) -> bool:
+    # The deferred REQUEST records are released by the default response hook (or the error one) only, so they're NOT
+    # deferred when it doesn't run, e.g. replaced by a custom response hook.
+    aggregator = config.log_aggregator
+    return (
+        aggregator is not None
+        and config.logs_responses
+        and default_response_logging_hook in config.response_logging_hooks
+        and aggregator.accepts(request)
+    )
+
+
+def _log_request(logger: logging.Logger, config: LoggingConfig, request: PreparedRequest) -> None:
+    limiter = config.log_rate_limiter
+    if limiter is not None and not limiter.allow(logger, config.default_hooks_logging_level, request):
+        return
+
+    pipeline = config.log_emission_pipeline
+    if pipeline is not None:
+        snapshot = request if isinstance(request, HttpRequestSnapshot) else HttpRequestSnapshot(request, config=config)
+        pipeline.submit(
+            logger,
+            config.default_hooks_logging_level,
+            "REQUEST",
+            HttpLogRecord.from_request,
+            snapshot.freeze(),
+        )
+        return
+
+    logger.log(
+        level=config.default_hooks_logging_level,
+        msg="REQUEST",
+        extra=HttpLogRecord.from_request(request),
+    )
@@ -0,0 +1,272 @@
+"""
+This module contains the asynchronous log emission pipeline used by the default logging hooks.
+
+When the pipeline is enabled, the thread that made the request only captures the exchange
+snapshot and puts it on a bounded queue. A single worker thread then builds the log record
+(running the obscurers and `to_dict`) and calls the logger, so slow logging handlers no longer
+add to the HTTP latency.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict
+
+from logging_http_client.http_fork_safety import reset_after_fork
+
+RecordFactoryType = Callable[[Any], Dict[str, Any]]
+
+_STOP = object()
+
+
+class OverflowPolicy(str, Enum):
+    """
+    What to do with a log record when the pipeline queue is full.
+
+    - DROP: Discard the record and count it as dropped.
+    - BLOCK: Wait for room in the queue (up to the block timeout, if any), then drop the record.
+    - SPILL: Emit the record synchronously on the calling thread, like the pipeline was disabled.
+    """
+
+    DROP = "drop"
+    BLOCK = "block"
+    SPILL = "spill"
+
+
+class LogEmissionPipeline:
+    """
+    A bounded queue of pending HTTP log records, drained by a single background worker thread.
+    """
+
+    _queue: queue.Queue
+    _overflow_policy: OverflowPolicy
+    _block_timeout: float | None
+
+    _lock: threading.Lock
+    _submitted: threading.Condition
+    _submitting: int
+    _worker: threading.Thread | None
+    _closed: bool
+
+    def __init__(
+        self,
+        max_queue_size: int = 10_000,
+        overflow_policy: OverflowPolicy | str = OverflowPolicy.DROP,
+        block_timeout: float | None = None,
+    ) -> None:
+        """
+        :param max_queue_size: The maximum number of records waiting to be emitted.
+        :param overflow_policy: What to do with a record when the queue is full.
+        :param block_timeout: The maximum seconds to wait for room with the BLOCK policy (None waits forever).
+        """
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be a positive integer")
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._overflow_policy = OverflowPolicy(overflow_policy)
+        self._block_timeout = block_timeout
+
+        self._lock = threading.Lock()
+        self._submitted = threading.Condition(self._lock)
+        self._submitting = 0
+        self._worker = None
+        self._closed = False
+
+        self._emitted_count = 0
+        self._dropped_count = 0
+        self._spilled_count = 0
+        self._failed_count = 0
+        reset_after_fork(self)
+
+    @property
+    def emitted_count(self) -> int:
+        """
+        The number of records emitted, both by the worker and spilled on the calling threads.
+        """
+        return self._emitted_count
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        The number of records discarded because the queue was full.
+        """
+        return self._dropped_count
+
+    @property
+    def spilled_count(self) -> int:
+        """
+        The number of records emitted on the calling thread because the queue was full.
+        """
+        return self._spilled_count
+
+    @property
+    def failed_count(self) -> int:
+        """
+        The number of records that raised an exception while being built or logged.
+        """
+        return self._failed_count
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the pipeline counters.
+
+        :return: The queued, emitted, dropped, spilled and failed record counts.
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "emitted": self._emitted_count,
+            "dropped": self._dropped_count,
+            "spilled": self._spilled_count,
+            "failed": self._failed_count,
+        }
+
+    def submit(
+        self,
+        logger: logging.Logger,
+        level: int,
+        msg: str,
+        record_factory: RecordFactoryType,
+        exchange: Any,
+    ) -> bool:
+        """
+        Queue a record to be built and logged on the worker thread.
+
+        The worker will call ``logger.log(level, msg, extra=record_factory(exchange))``, so the
+        exchange MUST NOT be changed by the calling thread after it has been submitted.
+
+        :param logger: The logger to emit the record with.
+        :param level: The logging level of the record.
+        :param msg: The log message.
+        :param record_factory: Builds the `extra` of the record from the exchange.
+        :param exchange: The captured exchange data, e.g. a frozen `HttpRequestSnapshot`.
+        :return: False if the record was dropped, True otherwise.
+        """
+        if not logger.isEnabledFor(level):
+            return True
+
+        item = (logger, level, msg, record_factory, exchange)
+
+        # The records being submitted are waited for by `shutdown`, so they're queued before the final drain.
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._submitting += 1
+        if closed:
+            self._emit(item)
+            return True
+
+        try:
+            if self._worker is None:
+                self._start()
+            if self._overflow_policy is OverflowPolicy.BLOCK:
+                self._queue.put(item, timeout=self._block_timeout)
+            else:
+                self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            if self._overflow_policy is OverflowPolicy.SPILL:
+                with self._lock:
+                    self._spilled_count += 1
+                self._emit(item)
+                return True
+            with self._lock:
+                self._dropped_count += 1
+            return False
+        finally:
+            with self._lock:
+                self._submitting -= 1
+                if not self._submitting:
+                    self._submitted.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait until all the queued records have been emitted.
+
+        :param timeout: The maximum seconds to wait (None waits forever).
+        :return: True if the queue was drained, False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float | None = 5.0) -> bool:
+        """
+        Flush the queued records and stop the worker thread.
+
+        Records submitted after the shutdown are emitted synchronously on the calling thread, while
+        the ones being submitted when it starts are queued, then drained with the others.
+
+        :param timeout: The maximum seconds to wait for the queue to drain (None waits forever).
+        :return: True if the queue was drained, False if the timeout expired first.
+        """
+        with self._lock:
+            if self._closed:
+                return True
+            self._closed = True
+            self._submitted.wait_for(lambda: not self._submitting, timeout)
+            worker = self._worker
+
+        atexit.unregister(self.shutdown)
+
+        if worker is None:
+            return True
+
+        drained = self.flush(timeout)
+        if drained:
+            self._queue.put(_STOP)
+            worker.join(timeout)
+        return drained
+
+    def _after_fork_in_child(self) -> None:
+        # The worker isn't running in the child, and the queued records are the parent's to emit.
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._submitted = threading.Condition(self._lock)
+        self._submitting = 0
+        self._worker = None
+        self._emitted_count = self._dropped_count = self._spilled_count = self._failed_count = 0
+
+    def _start(self) -> None:
+        with self._lock:
+            # A submission in progress starts the worker even if the pipeline is closing, see `shutdown`.
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(
+                target=self._run,
+                name="logging-http-client-emitter",
+                daemon=True,
+            )
+            self._worker.start()
+        atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._emit(item)
+            finally:
+                self._queue.task_done()
+
+    def _emit(self, item: tuple) -> None:
+        logger, level, msg, record_factory, exchange = item
+        try:
+            logger.log(level, msg, extra=record_factory(exchange))
+        except Exception as e:
+            with self._lock:
+                self._failed_count += 1
+            logger.exception("Error emitting queued HTTP log record", exc_info=e)
+        else:
+            with self._lock:
+                self._emitted_count += 1
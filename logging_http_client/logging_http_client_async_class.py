@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Executor
+from typing import Any, Mapping
+
+import httpx
+
+from logging_http_client.http_async_session import AsyncLoggingSession
+from logging_http_client.http_headers import with_source_header
+from logging_http_client.logging_config_scope import LoggingConfigScope
+
+
+class AsyncLoggingHttpClient:
+    """
+    An asyncio client that allows logging of HTTP requests and responses, with a single reusable session.
+
+    It mirrors :class:`logging_http_client.LoggingHttpClient`, but on top of :class:`httpx.AsyncClient`,
+    so many requests can be in flight concurrently on a single event loop.
+    """
+
+    _source: str | None
+    _logger: logging.Logger
+    _shared_headers: Mapping[str, str | bytes]
+
+    _session: AsyncLoggingSession
+
+    def __init__(
+        self,
+        source: str = None,
+        logger: logging.Logger = logging.getLogger(),
+        shared_headers: Mapping[str, str | bytes] = None,
+        hook_executor: Executor = None,
+        logging_config: LoggingConfigScope | Mapping[str, Any] = None,
+        **kwargs,
+    ) -> None:
+        """
+        :param source: The source of the request. This is used to identify the source/system of the request.
+        :param logger: The logger to use for logging requests and responses.
+        :param shared_headers: The headers to include with every request.
+        :param hook_executor: The executor running the (synchronous) logging hooks, defaults to the loop's one.
+        :param logging_config: The client's overrides of the global configuration, see `LoggingConfigScope`.
+        :param kwargs: Additional arguments to pass to :class:`httpx.AsyncClient` (e.g. `limits` or `timeout`).
+        """
+        self._source = source
+        self._logger = logger
+        self._shared_headers = shared_headers if shared_headers is not None else {}
+        self._session = self._decorate_session(
+            AsyncLoggingSession(source, logger, hook_executor, LoggingConfigScope.of(logging_config), **kwargs)
+        )
+
+    def __getattr__(self, name: str):
+        """
+        Dynamically get an attribute from the session.
+
+        :param name: The name of the attribute to get.
+        :return: The attribute.
+        :raises AttributeError: If the attribute does not exist.
+        """
+        if not name.startswith("_") and hasattr(httpx.AsyncClient, name):
+            return getattr(self._session, name)
+        else:
+            raise AttributeError(f"Unsupported attribute: '{name}'")
+
+    async def __aenter__(self) -> AsyncLoggingHttpClient:
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self._session.__aexit__(*args)
+
+    @property
+    def session(self) -> AsyncLoggingSession:
+        """
+        Get the session that is used to send requests.
+
+        :return: The session.
+        """
+        return self._session
+
+    @property
+    def shared_headers(self) -> Mapping[str, str | bytes]:
+        """
+        Get the shared headers that are sent with every request.
+
+        :return: The shared headers.
+        """
+        return self._shared_headers
+
+    @shared_headers.setter
+    def shared_headers(self, headers: Mapping[str, str | bytes] | None) -> None:
+        """
+        Set the shared headers that are sent with every request.
+
+        :param headers: The shared headers to set.
+        """
+        self._shared_headers = headers if headers is not None else {}
+        self._session.headers.update(self._shared_headers)
+
+    @shared_headers.deleter
+    def shared_headers(self) -> None:
+        """
+        Delete the shared headers that are sent with every request.
+        """
+        self._shared_headers = {}
+
+    def _decorate_session(self, session: AsyncLoggingSession) -> AsyncLoggingSession:
+        """
+        Decorate the session with the shared headers and source.
+
+        :param session: The session to decorate.
+        :return: The decorated session.
+        """
+        if self._source is not None:
+            session.headers.update(with_source_header(self._source))
+        if self._shared_headers:
+            session.headers.update(self._shared_headers)
+        return session
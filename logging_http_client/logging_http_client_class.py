@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import logging
-from typing import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Mapping
 
 from requests import Session
+from requests.adapters import BaseAdapter
 
+from logging_http_client.http_batch import BatchResult, RequestSpec, check_max_concurrency, run_batch
 from logging_http_client.http_headers import with_source_header
 from logging_http_client.http_session import LoggingSession
+from logging_http_client.http_session_pool import SessionPool
+from logging_http_client.logging_config_scope import LoggingConfigScope
+
+# The session methods sending a request, which check a session of the pool out (for the duration of the call).
+_POOLED_METHODS = frozenset({"request", "get", "options", "head", "post", "put", "patch", "delete", "send"})
 
 
 class LoggingHttpClient:
@@ -18,8 +25,11 @@ class LoggingHttpClient:
     _reusable_session: bool
     _logger: logging.Logger
     _shared_headers: Mapping[str, str | bytes]
+    _config_scope: LoggingConfigScope | None
 
     _session: LoggingSession | None
+    _session_pool: SessionPool | None
+    _pool_adapters: Dict[str, BaseAdapter]
 
     def __init__(
         self,
@@ -27,25 +37,52 @@ class LoggingHttpClient:
         reusable_session: bool = False,
         logger: logging.Logger = logging.getLogger(),
         shared_headers: Mapping[str, str | bytes] = None,
+        logging_config: LoggingConfigScope | Mapping[str, Any] = None,
+        session_pool_size: int | None = None,
+        session_pool_timeout: float | None = None,
     ) -> None:
+        """
+        :param source: The source of the requests.
+        :param reusable_session: Whether to use a reusable session for all requests.
+        :param logger: The logger to use for logging requests and responses.
+        :param shared_headers: The headers to include with every request.
+        :param logging_config: The client's overrides of the global configuration, see `LoggingConfigScope`.
+        :param session_pool_size: The maximum number of pooled sessions, see `SessionPool`. When set, each request
+            checks a session of the pool out instead of using a reusable (or new) session.
+        :param session_pool_timeout: The maximum time to wait for a pooled session, in seconds.
+        """
         self._source = source
-        self._reusable_session = reusable_session
+        self._reusable_session = reusable_session and session_pool_size is None
         self._logger = logger
         self._shared_headers = shared_headers if shared_headers is not None else {}
+        self._config_scope = LoggingConfigScope.of(logging_config)
 
+        self._session = None
+        self._session_pool = None
+        self._pool_adapters = {}
         if self._reusable_session:
-            reusable = LoggingSession(source, logger)
+            reusable = LoggingSession(source, logger, self._config_scope)
             self._session = self._decorate_session(reusable)
+        if session_pool_size is not None:
+            self._session_pool = SessionPool(self._new_session, session_pool_size, session_pool_timeout)
 
     def __getattr__(self, name: str):
         """
         Dynamically get an attribute from the session.
 
+        NOTE:
+            With a session pool, the methods sending a request (e.g. `get` or `send`) use a pooled session, and
+            the adapters mounted with `mount` are mounted on every pooled session.
+
         :param name: The name of the attribute to get.
         :return: The attribute.
         :raises AttributeError: If the attribute does not exist.
         """
         if name in Session.__dict__:
+            if self._session_pool is not None and name in _POOLED_METHODS:
+                return self._pooled(name)
+            if self._session_pool is not None and name == "mount":
+                return self._mount_pooled
             return getattr(self.session, name)
         else:
             raise AttributeError(f"Unsupported attribute: '{name}'")
@@ -54,8 +91,16 @@ class LoggingHttpClient:
         """
         Destructor to ensure the session is closed when the client is garbage collected.
         """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the reusable session, or the session pool, of the client.
+        """
         if self._session is not None:
             self._session.close()
+        if self._session_pool is not None:
+            self._session_pool.close()
 
     @property
     def session(self) -> LoggingSession:
@@ -67,13 +112,34 @@ class LoggingHttpClient:
 
         Otherwise, a new session will be created for each request.
 
+        NOTE:
+            With a session pool, the requests sent with the client's methods (e.g. `client.get`) use the
+            pooled sessions, but this property still creates a new session, as it can't be checked back in.
+
         :return: The session.
         """
         if self._reusable_session:
             return self._session
         else:
-            disposable = LoggingSession(self._source, self._logger)
-            return self._decorate_session(disposable)
+            return self._new_session()
+
+    @property
+    def session_pool(self) -> SessionPool | None:
+        """
+        Get the session pool of the client, e.g. to read its stats.
+
+        :return: The session pool, or None if the client doesn't pool its sessions.
+        """
+        return self._session_pool
+
+    @property
+    def logging_config(self) -> LoggingConfigScope | None:
+        """
+        Get the configuration scope of the client, i.e. its overrides of the global configuration.
+
+        :return: The configuration scope, or None if the client uses the global configuration.
+        """
+        return self._config_scope
 
     @property
     def shared_headers(self) -> Mapping[str, str | bytes]:
@@ -92,8 +158,10 @@ class LoggingHttpClient:
         :param headers: The shared headers to set.
         """
         self._shared_headers = headers if headers is not None else {}
-        if self._reusable_session is not None:
+        if self._session is not None:
             self._session.headers.update(self._shared_headers)
+        if self._session_pool is not None:
+            self._session_pool.clear()
 
     @shared_headers.deleter
     def shared_headers(self) -> None:
@@ -101,8 +169,84 @@ class LoggingHttpClient:
         Delete the shared headers that are sent with every request.
         """
         self._shared_headers = {}
-        if self._reusable_session is not None:
+        if self._session is not None:
             self._session.headers.update(self._shared_headers)
+        if self._session_pool is not None:
+            self._session_pool.clear()
+
+    def map(
+        self,
+        specs: Iterable[RequestSpec | str],
+        max_concurrency: int = 10,
+        as_completed: bool = False,
+    ) -> Iterator[BatchResult]:
+        """
+        Send a batch of requests concurrently, over a single session.
+
+        NOTE:
+            At most `max_concurrency` requests are in flight at any time. When the connection
+            pools of the session are smaller, the batch uses adapters of its own, whose pools
+            keep as many connections alive per host (and which are closed once it's done). Each
+            exchange is logged as usual, and a "BATCH" summary record (i.e. the batch size,
+            errors and latency percentiles) is logged once the batch is done.
+
+            Failed requests do NOT stop the batch: their exception is held by their result.
+
+        :param specs: The requests to send, as request specs or URLs (for GET requests).
+        :param max_concurrency: The maximum number of requests in flight.
+        :param as_completed: Whether to yield the results as they complete, instead of in the batch order.
+        :return: The results of the requests, as a generator.
+        :raises ValueError: If `max_concurrency` isn't at least 1 (on the call, rather than on the first iteration).
+        """
+        check_max_concurrency(max_concurrency)
+        return self._map(specs, max_concurrency, as_completed)
+
+    def gather(self, specs: Iterable[RequestSpec | str], max_concurrency: int = 10) -> List[BatchResult]:
+        """
+        Send a batch of requests concurrently, and wait for all of them, see :meth:`map`.
+
+        :param specs: The requests to send, as request specs or URLs (for GET requests).
+        :param max_concurrency: The maximum number of requests in flight.
+        :return: The results of the requests, in the batch order.
+        """
+        return list(self.map(specs, max_concurrency=max_concurrency))
+
+    def _map(
+        self,
+        specs: Iterable[RequestSpec | str],
+        max_concurrency: int,
+        as_completed: bool,
+    ) -> Iterator[BatchResult]:
+        if self._session_pool is not None:
+            with self._session_pool.session() as session:
+                yield from run_batch(session, specs, max_concurrency, as_completed, self._logger)
+            return
+
+        session = self.session
+        try:
+            yield from run_batch(session, specs, max_concurrency, as_completed, self._logger)
+        finally:
+            if not self._reusable_session:
+                session.close()
+
+    def _new_session(self) -> LoggingSession:
+        session = self._decorate_session(LoggingSession(self._source, self._logger, self._config_scope))
+        for prefix, adapter in self._pool_adapters.items():
+            session.mount(prefix, adapter)
+        return session
+
+    def _pooled(self, name: str):
+        # A session method, called on a session checked out for the duration of the call.
+        def call(*args, **kwargs):
+            with self._session_pool.session() as session:
+                return getattr(session, name)(*args, **kwargs)
+
+        return call
+
+    def _mount_pooled(self, prefix: str, adapter: BaseAdapter) -> None:
+        # Mounted on the sessions created from now on, the current ones being replaced once checked back in.
+        self._pool_adapters[prefix] = adapter
+        self._session_pool.clear()
 
     def _decorate_session(self, session: LoggingSession) -> LoggingSession:
         """
@@ -11,9 +11,18 @@ from typing import Callable, List, Optional
 from requests import Response, PreparedRequest
 
 import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_body_policy import BodyCapturePolicy
 from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.http_route import RouteNormalizer
+from logging_http_client.logging_http_client_config_globals import LoggingConfig
+from logging_http_client.logging_aggregation import LogAggregator
+from logging_http_client.logging_metrics import MetricsRecorder
+from logging_http_client.logging_rate_limit import LogRateLimiter
+from logging_http_client.logging_emission_pipeline import LogEmissionPipeline, OverflowPolicy
+from logging_http_client.logging_sampling import Sampler
 
 CorrelationIdProviderType = Optional[Callable[[], str]]
+RequestIdProviderType = Optional[Callable[[], str]]
 
 ResponseHookType = Callable[[logging.Logger, Response], None]
 RequestHookType = Callable[[logging.Logger, PreparedRequest], None]
@@ -35,6 +44,21 @@ def set_correlation_id_provider(provider: CorrelationIdProviderType) -> None:
     config.set_correlation_id_provider(provider)
 
 
+def set_request_id_provider(provider: RequestIdProviderType) -> None:
+    """
+    Set a provider for the request id, i.e. the `x-request-id` header of the requests that don't set it.
+
+    The provider should be a callable that returns a string, which is called once per request. Set it
+    to None to restore the default provider, which generates random (version 4) UUIDs.
+
+    NOTE:
+        The `logging_http_client.http_request_id` module provides faster, time-ordered, providers:
+          - `UlidRequestIdGenerator()`: ULIDs, drawing their randomness from a buffered pool.
+          - `CounterRequestIdGenerator()`: A random per-process prefix followed by a counter.
+    """
+    config.set_request_id_provider(provider)
+
+
 def set_request_log_record_obscurers(obscurers: List[RequestLogRecordObscurerType]) -> None:
     """
     Sets obscurers for all requests logged.
@@ -80,7 +104,8 @@ def set_request_logging_hooks(hooks: List[RequestHookType]) -> None:
     Set custom hooks for logging all requests.
 
     The hooks will be called in the order they are provided.
-    Each hook will receive an IMMUTABLE request object.
+    Each hook will receive an IMMUTABLE request object, a `HttpRequestSnapshot`
+    that is shared by all the hooks of the same request.
     """
     config.set_request_logging_hooks(hooks)
 
@@ -90,7 +115,8 @@ def set_response_logging_hooks(hooks: List[ResponseHookType]) -> None:
     Set custom hooks for logging all responses.
 
     The hooks will be called in the order they are provided.
-    Each hook will receive an IMMUTABLE response object.
+    Each hook will receive an IMMUTABLE response object, a `HttpResponseSnapshot`
+    that is shared by all the hooks of the same response.
     """
     config.set_response_logging_hooks(hooks)
 
@@ -123,6 +149,52 @@ def enable_response_body_logging(enable: bool = True) -> None:
     config.set_response_body_logging_enabled(enable)
 
 
+def enable_connection_timings(enable: bool = True) -> None:
+    """
+    Enable or disable the connection phase timings (i.e. DNS, connect, TLS, TTFB and download durations).
+
+    NOTE:
+      - The timings are measured by a `TimingHTTPAdapter`, mounted by the sessions created AFTER enabling them.
+      - They're logged in the response log records, and recorded by the metrics recorder (if any).
+    """
+    config.set_connection_timings_enabled(enable)
+
+
+def set_request_body_capture_policy(policy: BodyCapturePolicy = BodyCapturePolicy()) -> None:
+    """
+    Set the policy deciding how much of the request bodies is logged, when request body logging is enabled.
+
+    The policy can cap the logged body size (keeping its head and tail around a truncation marker),
+    and skip the bodies of denied (or not allowed) content types without decoding them, the default
+    policy logging every body whole. The `request_body_length` is recorded regardless of the policy.
+    """
+    config.set_request_body_capture_policy(policy)
+
+
+def set_response_body_capture_policy(policy: BodyCapturePolicy = BodyCapturePolicy()) -> None:
+    """
+    Set the policy deciding how much of the response bodies is logged, when response body logging is enabled.
+
+    The policy can cap the logged body size (keeping its head and tail around a truncation marker),
+    and skip the bodies of denied (or not allowed) content types without decoding them, the default
+    policy logging every body whole. The `response_body_length` is recorded regardless of the policy.
+    """
+    config.set_response_body_capture_policy(policy)
+
+
+def set_response_stream_capture_limit(max_bytes: int = 64 * 1024) -> None:
+    """
+    Set the maximum number of bytes captured from a streamed (i.e. `stream=True`) response body.
+
+    Streamed responses are logged once the stream has been exhausted or closed, and only the
+    first `max_bytes` of their body are kept for the response body logging (the total body
+    length is always recorded). Defaults to 64 KiB.
+    """
+    if max_bytes < 0:
+        raise ValueError("max_bytes must not be negative")
+    config.set_response_stream_capture_limit(max_bytes)
+
+
 def set_default_hooks_logging_level(level: int = 20) -> None:
     """
     Set the logging level for the logger.
@@ -137,6 +209,173 @@ def set_default_hooks_logging_level(level: int = 20) -> None:
     config.set_default_hooks_logging_level(level)
 
 
+def set_logging_sampler(sampler: Optional[Sampler]) -> None:
+    """
+    Set a sampler deciding which exchanges are logged, or None to log every exchange.
+
+    NOTE:
+      - Exchanges that are not sampled skip the logging hooks (and so the log record construction)
+        entirely, unless a tail rule of the sampler keeps them once their outcome is known.
+      - The `sampling_rate` and `sampling_reason` of the decision are attached to the `HttpLogRecord`,
+        so counts can be re-weighted downstream (i.e. each record stands for 1 / rate exchanges).
+    """
+    config.set_logging_sampler(sampler)
+
+
+def set_metrics_recorder(recorder: Optional[MetricsRecorder]) -> None:
+    """
+    Set a metrics recorder, recording the latency and outcome of every exchange, or None to disable the metrics.
+
+    NOTE:
+      - The exchanges are recorded whether they are logged (or sampled) or not, once per exchange
+        (i.e. its redirects included), see `MetricsRecorder.snapshot` and `MetricsRecorder.reset`.
+    """
+    config.set_metrics_recorder(recorder)
+
+
+def set_route_normalizer(normalizer: Optional[RouteNormalizer]) -> None:
+    """
+    Set a route normalizer, adding the route template of the URLs to the log records, or None to disable it.
+
+    NOTE:
+      - The route is logged as the `request_route` of both the request and response log records.
+      - The same normalizer can be used by the metrics and the sampling, see `RouteNormalizer`.
+    """
+    config.set_route_normalizer(normalizer)
+
+
+def get_logging_config() -> LoggingConfig:
+    """
+    Get the current configuration, as an immutable snapshot.
+
+    NOTE:
+      - Every setter builds a new snapshot (with an incremented `version`), so a snapshot never changes.
+      - The sessions read the snapshot once per exchange, so all the hooks of an exchange
+        see the same configuration, even when another thread changes it concurrently.
+    """
+    config.install_default_hooks()
+    return config.get_config()
+
+
+def enable_async_logging(
+    max_queue_size: int = 10_000,
+    overflow_policy: OverflowPolicy | str = OverflowPolicy.DROP,
+    block_timeout: Optional[float] = None,
+) -> LogEmissionPipeline:
+    """
+    Enable the asynchronous emission of the DEFAULT logging hooks records.
+
+    The request thread will only capture the exchange and queue it, while a background worker
+    thread builds the log records (running the obscurers) and logs them. As such, your obscurers
+    and logging handlers MUST be thread-safe when this mode is enabled.
+
+    NOTE:
+      - Any previously enabled pipeline is flushed and shut down first.
+      - When the queue is full, the overflow policy decides whether the record is dropped (DROP),
+        waited for up to the block timeout before being dropped (BLOCK), or emitted synchronously
+        on the request thread (SPILL).
+      - The queued records are flushed at interpreter exit.
+
+    :return: The pipeline, which exposes the dropped/spilled/failed counters and a flush method.
+    """
+    disable_async_logging()
+    pipeline = LogEmissionPipeline(max_queue_size, overflow_policy, block_timeout)
+    config.set_log_emission_pipeline(pipeline)
+    return pipeline
+
+
+def disable_async_logging(flush_timeout: Optional[float] = 5.0) -> None:
+    """
+    Disable the asynchronous emission of the DEFAULT logging hooks records.
+
+    The queued records are flushed (waiting up to the flush timeout) before returning.
+    """
+    pipeline = config.get_log_emission_pipeline()
+    config.set_log_emission_pipeline(None)
+    if pipeline is not None:
+        pipeline.shutdown(flush_timeout)
+
+
+def enable_log_aggregation(
+    window_s: float = 10.0,
+    max_keys: int = 1024,
+    predicate: Optional[Callable[[PreparedRequest], bool]] = None,
+) -> LogAggregator:
+    """
+    Enable the aggregation of the exchanges logged by the DEFAULT logging hooks.
+
+    The exchanges sharing a (host, method, route, status) key within a window are merged into a single
+    AGGREGATE record, with their count, min/avg/max durations and byte totals, instead of their REQUEST
+    and RESPONSE records.
+
+    NOTE:
+      - Any previously enabled aggregator is flushed and shut down first.
+      - The predicate decides which requests are aggregated (e.g. the health checks), defaults to all of them.
+      - The routes come from the route normalizer, if any (see `set_route_normalizer`), or are the URL paths.
+      - The exchanges that raised (e.g. timeouts) are aggregated under the type of their exception.
+      - Once `max_keys` keys are aggregated within a window, the exchanges of the new keys are logged as usual.
+      - The default response hook does the aggregation: without it, the exchanges are logged as usual.
+      - The windows are flushed by a background timer thread, and at interpreter exit.
+
+    :return: The aggregator, which exposes its counters and a flush method.
+    """
+    disable_log_aggregation()
+    aggregator = LogAggregator(window_s, max_keys, predicate)
+    config.set_log_aggregator(aggregator)
+    return aggregator
+
+
+def disable_log_aggregation() -> None:
+    """
+    Disable the aggregation of the exchanges logged by the DEFAULT logging hooks.
+
+    The current window is flushed before returning.
+    """
+    aggregator = config.get_log_aggregator()
+    config.set_log_aggregator(None)
+    if aggregator is not None:
+        aggregator.shutdown()
+
+
+def enable_log_rate_limit(
+    rate: float,
+    burst: Optional[float] = None,
+    key: Optional[Callable[[PreparedRequest], str]] = None,
+    summary_interval_s: float = 60.0,
+    max_keys: int = 10_000,
+) -> LogRateLimiter:
+    """
+    Enable the rate limiting of the records of the DEFAULT logging hooks, per destination host (or any key).
+
+    Each key has a token bucket refilled at `rate` records per second, holding up to `burst` records. The
+    records over the limit are counted instead of being emitted, and a SUPPRESSED summary record (with the
+    key and count of the suppressed records) is logged every `summary_interval_s` seconds for each key.
+
+    NOTE:
+      - Any previously enabled rate limiter is shut down (logging its summaries) first.
+      - The REQUEST and RESPONSE records take a token each, while the AGGREGATE records take none.
+      - The check takes no lock, so a few extra records may get through under heavy contention.
+
+    :return: The rate limiter.
+    """
+    disable_log_rate_limit()
+    limiter = LogRateLimiter(rate, burst, key, summary_interval_s, max_keys)
+    config.set_log_rate_limiter(limiter)
+    return limiter
+
+
+def disable_log_rate_limit() -> None:
+    """
+    Disable the rate limiting of the records of the DEFAULT logging hooks.
+
+    The summaries of the records suppressed so far are logged before returning.
+    """
+    limiter = config.get_log_rate_limiter()
+    config.set_log_rate_limiter(None)
+    if limiter is not None:
+        limiter.shutdown()
+
+
 # DEPRECATED ###########################################################################################################
 
 
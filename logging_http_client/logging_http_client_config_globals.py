@@ -3,139 +3,342 @@ This module contains the global configuration for the logging_http_client.
 
 We separate the configuration globals and getters from the main configuration module to
 avoid circular imports when using the configuration getters within the implementation code.
+
+The configuration is held in a single immutable (and versioned) :class:`LoggingConfig`. The
+setters build a new one (copy-on-write) and swap it in, so the sessions read the whole
+configuration at once per exchange with `get_config`, without locks, and never see a
+partially applied change (e.g. a hooks list replaced while it's being iterated).
 """
 
+from __future__ import annotations
+
 import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Tuple
+
+from logging_http_client.http_body_policy import BodyCapturePolicy
+from logging_http_client.http_request_id import uuid4_request_id
+
+
+@dataclass(frozen=True, slots=True)
+class LoggingConfig:
+    """
+    An immutable snapshot of the whole configuration, along with the decisions derived from it.
+
+    The `version` is incremented by every change, so derived state can be cached against it.
+    """
+
+    version: int = 0
+    correlation_id_provider: Callable[[], str] | None = None
+    request_id_provider: Callable[[], str] = uuid4_request_id
+    request_log_record_obscurers: Tuple[Callable, ...] = ()
+    response_log_record_obscurers: Tuple[Callable, ...] = ()
+    request_logging_hooks: Tuple[Callable, ...] = ()
+    response_logging_hooks: Tuple[Callable, ...] = ()
+    request_logging_enabled: bool = True
+    response_logging_enabled: bool = True
+    request_body_logging_enabled: bool = False
+    response_body_logging_enabled: bool = False
+    request_body_capture_policy: BodyCapturePolicy = BodyCapturePolicy()
+    response_body_capture_policy: BodyCapturePolicy = BodyCapturePolicy()
+    response_stream_capture_limit: int = 64 * 1024
+    default_hooks_logging_level: int = logging.INFO
+    log_emission_pipeline: Any = None
+    log_aggregator: Any = None
+    log_rate_limiter: Any = None
+    logging_sampler: Any = None
+    metrics_recorder: Any = None
+    connection_timings_enabled: bool = False
+    route_normalizer: Any = None
+
+    # Derived decisions ---------------------------------------------------------
+    # Whether the request hooks are run, i.e. request logging is enabled and there's at least one hook.
+    logs_requests: bool = field(init=False)
+    # Whether the response hooks are run, i.e. response logging is enabled and there's at least one hook.
+    logs_responses: bool = field(init=False)
+    # Whether nothing at all is logged, so the exchanges can skip the logging (and sampling) entirely.
+    logs_nothing: bool = field(init=False)
+    # Whether nothing at all is observed (i.e. logged or recorded), so the exchanges can skip everything.
+    observes_nothing: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        logs_requests = self.request_logging_enabled and bool(self.request_logging_hooks)
+        logs_responses = self.response_logging_enabled and bool(self.response_logging_hooks)
+        object.__setattr__(self, "logs_requests", logs_requests)
+        object.__setattr__(self, "logs_responses", logs_responses)
+        object.__setattr__(self, "logs_nothing", not (logs_requests or logs_responses))
+        object.__setattr__(self, "observes_nothing", self.logs_nothing and self.metrics_recorder is None)
+
+
+_config = LoggingConfig()
+# Serializes the writers only, the readers never lock.
+_config_lock = threading.Lock()
+# The hooks fields whose default hooks are yet to be installed, see `install_default_hooks`.
+_pending_default_hooks = {"request_logging_hooks", "response_logging_hooks"}
+
+
+def get_config() -> LoggingConfig:
+    return _config
+
+
+def _update_config(**changes) -> None:
+    global _config
+    with _config_lock:
+        _config = replace(_config, version=_config.version + 1, **changes)
+
+
+def _reset_config_lock_after_fork() -> None:
+    # A lock held by another thread when forking would never be released in the child.
+    global _config_lock
+    _config_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_config_lock_after_fork)
+
+
+def install_default_hooks() -> None:
+    """
+    Install the default logging hooks, on the hooks fields that weren't set yet.
+
+    It's called by the first session created (and the configuration readers), rather than when
+    importing the package, so the hooks (and the log records machinery) are only imported when needed.
+    """
+    global _config
+    if not _pending_default_hooks:
+        return
+
+    from logging_http_client.logging_default_hooks import default_request_logging_hook, default_response_logging_hook
+
+    defaults = {
+        "request_logging_hooks": (default_request_logging_hook,),
+        "response_logging_hooks": (default_response_logging_hook,),
+    }
+    with _config_lock:
+        changes = {name: defaults[name] for name in _pending_default_hooks}
+        _pending_default_hooks.clear()
+        if changes:
+            _config = replace(_config, version=_config.version + 1, **changes)
 
-# Correlation ID Provider =====================================================
 
-_correlation_id_provider = None
+# Correlation ID Provider =====================================================
 
 
 def get_correlation_id_provider():
-    global _correlation_id_provider
-    return _correlation_id_provider
+    return _config.correlation_id_provider
 
 
 def set_correlation_id_provider(value):
-    global _correlation_id_provider
-    _correlation_id_provider = value
+    _update_config(correlation_id_provider=value)
 
 
-# Request/Response Log Record Obscurers ======================================
+# Request ID Provider =========================================================
 
-_request_log_record_obscurers: list = []
-_response_log_record_obscurers: list = []
+
+def get_request_id_provider():
+    return _config.request_id_provider
+
+
+def set_request_id_provider(value):
+    _update_config(request_id_provider=value if value is not None else uuid4_request_id)
+
+
+# Request/Response Log Record Obscurers ======================================
 
 
 def get_request_log_record_obscurers():
-    global _request_log_record_obscurers
-    return _request_log_record_obscurers
+    return list(_config.request_log_record_obscurers)
 
 
 def get_response_log_record_obscurers():
-    global _response_log_record_obscurers
-    return _response_log_record_obscurers
+    return list(_config.response_log_record_obscurers)
 
 
 def set_request_log_record_obscurers(value):
-    global _request_log_record_obscurers
-    _request_log_record_obscurers = value
+    _update_config(request_log_record_obscurers=tuple(value or ()))
 
 
 def set_response_log_record_obscurers(value):
-    global _response_log_record_obscurers
-    _response_log_record_obscurers = value
+    _update_config(response_log_record_obscurers=tuple(value or ()))
 
 
 # Request/Response Hooks =====================================================
 
-_request_logging_hooks: list = []
-_response_logging_hooks: list = []
-
 
 def get_request_logging_hooks():
-    global _request_logging_hooks
-    return _request_logging_hooks
+    install_default_hooks()
+    return list(_config.request_logging_hooks)
 
 
 def get_response_logging_hooks():
-    global _response_logging_hooks
-    return _response_logging_hooks
+    install_default_hooks()
+    return list(_config.response_logging_hooks)
 
 
 def set_request_logging_hooks(value):
-    global _request_logging_hooks
-    _request_logging_hooks = value
+    # Discarded first, so the default hooks can't be installed over these ones.
+    _pending_default_hooks.discard("request_logging_hooks")
+    _update_config(request_logging_hooks=tuple(value or ()))
 
 
 def set_response_logging_hooks(value):
-    global _response_logging_hooks
-    _response_logging_hooks = value
+    _pending_default_hooks.discard("response_logging_hooks")
+    _update_config(response_logging_hooks=tuple(value or ()))
 
 
 # Request/Response Logging Toggle =============================================
 
-_request_logging_enabled: bool = True
-_response_logging_enabled: bool = True
-
 
 def is_request_logging_enabled() -> bool:
-    global _request_logging_enabled
-    return _request_logging_enabled
+    return _config.request_logging_enabled
 
 
 def is_response_logging_enabled() -> bool:
-    global _response_logging_enabled
-    return _response_logging_enabled
+    return _config.response_logging_enabled
 
 
 def set_request_logging_enabled(value: bool):
-    global _request_logging_enabled
-    _request_logging_enabled = value
+    _update_config(request_logging_enabled=value)
 
 
 def set_response_logging_enabled(value: bool):
-    global _response_logging_enabled
-    _response_logging_enabled = value
+    _update_config(response_logging_enabled=value)
 
 
 # Request/Response Body Logging Toggle ========================================
 
-_request_body_logging_enabled: bool = False
-_response_body_logging_enabled: bool = False
-
 
 def is_request_body_logging_enabled() -> bool:
-    global _request_body_logging_enabled
-    return _request_body_logging_enabled
+    return _config.request_body_logging_enabled
 
 
 def is_response_body_logging_enabled() -> bool:
-    global _response_body_logging_enabled
-    return _response_body_logging_enabled
+    return _config.response_body_logging_enabled
 
 
 def set_request_body_logging_enabled(value: bool):
-    global _request_body_logging_enabled
-    _request_body_logging_enabled = value
+    _update_config(request_body_logging_enabled=value)
 
 
 def set_response_body_logging_enabled(value: bool):
-    global _response_body_logging_enabled
-    _response_body_logging_enabled = value
+    _update_config(response_body_logging_enabled=value)
 
 
-# Default Hooks Logging Level =============================================
+# Request/Response Body Capture Policy ========================================
+
+
+def get_request_body_capture_policy() -> BodyCapturePolicy:
+    return _config.request_body_capture_policy
+
+
+def get_response_body_capture_policy() -> BodyCapturePolicy:
+    return _config.response_body_capture_policy
 
-_default_hooks_logging_level: int = logging.INFO
+
+def set_request_body_capture_policy(value: BodyCapturePolicy):
+    _update_config(request_body_capture_policy=value)
+
+
+def set_response_body_capture_policy(value: BodyCapturePolicy):
+    _update_config(response_body_capture_policy=value)
+
+
+# Response Stream Capture Limit ===============================================
+
+
+def get_response_stream_capture_limit() -> int:
+    return _config.response_stream_capture_limit
+
+
+def set_response_stream_capture_limit(value: int):
+    _update_config(response_stream_capture_limit=value)
+
+
+# Default Hooks Logging Level =============================================
 
 
 def set_default_hooks_logging_level(value: int):
-    global _default_hooks_logging_level
-    _default_hooks_logging_level = value
+    _update_config(default_hooks_logging_level=value)
 
 
 def get_default_hooks_logging_level():
-    global _default_hooks_logging_level
-    return _default_hooks_logging_level
+    return _config.default_hooks_logging_level
+
+
+# Log Emission Pipeline =====================================================
+
+
+def get_log_emission_pipeline():
+    return _config.log_emission_pipeline
+
+
+def set_log_emission_pipeline(value):
+    _update_config(log_emission_pipeline=value)
+
+
+# Log Aggregator ==============================================================
+
+
+def get_log_aggregator():
+    return _config.log_aggregator
+
+
+def set_log_aggregator(value):
+    _update_config(log_aggregator=value)
+
+
+# Log Rate Limiter ============================================================
+
+
+def get_log_rate_limiter():
+    return _config.log_rate_limiter
+
+
+def set_log_rate_limiter(value):
+    _update_config(log_rate_limiter=value)
+
+
+# Logging Sampler =============================================================
+
+
+def get_logging_sampler():
+    return _config.logging_sampler
+
+
+def set_logging_sampler(value):
+    _update_config(logging_sampler=value)
+
+
+# Metrics Recorder ============================================================
+
+
+def get_metrics_recorder():
+    return _config.metrics_recorder
+
+
+def set_metrics_recorder(value):
+    _update_config(metrics_recorder=value)
+
+
+# Connection Timings Toggle ===================================================
+
+
+def is_connection_timings_enabled() -> bool:
+    return _config.connection_timings_enabled
+
+
+def set_connection_timings_enabled(value: bool):
+    _update_config(connection_timings_enabled=value)
+
+
+# Route Normalizer ============================================================
+
+
+def get_route_normalizer():
+    return _config.route_normalizer
+
+
+def set_route_normalizer(value):
+    _update_config(route_normalizer=value)
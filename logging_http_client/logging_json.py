@@ -0,0 +1,197 @@
+"""
+This module contains a formatter/handler pair writing the HTTP log records as JSON lines.
+
+Unlike generic JSON formatters, which walk every attribute of the `LogRecord`, the formatter
+only serializes a few known attributes and the pre-built `http` mapping of the record, once
+per record (the line is cached on the record, so it's shared by the handlers), with a reused
+encoder. The handler buffers the lines and writes them in bulk. When the `orjson` library is
+installed (i.e. the ``json`` extra), it's used instead of the standard `json` module.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import time
+from json.encoder import c_make_encoder, encode_basestring
+from typing import Any, Callable, Dict, List, TextIO
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# The attribute of the `LogRecord` caching its JSON line (along with the key of its HTTP log record).
+_JSON_LINE_ATTRIBUTE = "_http_json_line"
+
+
+class HttpJsonFormatter(logging.Formatter):
+    """
+    Formats the log records as JSON lines, e.g.
+    ``{"timestamp":"2024-10-17T09:30:00.123Z","level":"INFO","logger":"app","message":"RESPONSE","http":{...}}``.
+    """
+
+    _key: str
+    _http_prefix: str
+    _orjson: bool
+    _encode: Callable[[Any], str]
+    _second: int
+    _second_prefix: str
+
+    def __init__(self, key: str = "http", use_orjson: bool = True) -> None:
+        """
+        :param key: The attribute of the log records holding the HTTP log record, i.e. the key of `to_extra`.
+        :param use_orjson: Whether to use the orjson library, when it's installed.
+        """
+        super().__init__()
+        self._key = key
+        self._http_prefix = f",{json.dumps(key)}:"
+        self._orjson = use_orjson and orjson is not None
+        self._encode = _make_encoder()
+        self._second = -1
+        self._second_prefix = ""
+
+    def format(self, record: logging.LogRecord) -> str:
+        cached = record.__dict__.get(_JSON_LINE_ATTRIBUTE)
+        if cached is not None and cached[0] == self._key:
+            return cached[1]
+
+        if self._orjson:
+            document = {
+                "timestamp": self._timestamp(record.created),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+            http = record.__dict__.get(self._key)
+            if http is not None:
+                document[self._key] = http
+            if record.exc_info:
+                document["exception"] = self.formatException(record.exc_info)
+            line = _orjson_dumps(document)
+        else:
+            # The line is assembled around the encoded HTTP log record, rather than encoding a new document.
+            parts = [
+                '{"timestamp":"',
+                self._timestamp(record.created),
+                '","level":',
+                encode_basestring(record.levelname),
+                ',"logger":',
+                encode_basestring(record.name),
+                ',"message":',
+                encode_basestring(record.getMessage()),
+            ]
+            http = record.__dict__.get(self._key)
+            if http is not None:
+                parts += (self._http_prefix, self._encode(http))
+            if record.exc_info:
+                parts += (',"exception":', encode_basestring(self.formatException(record.exc_info)))
+            parts.append("}")
+            line = "".join(parts)
+
+        record.__dict__[_JSON_LINE_ATTRIBUTE] = (self._key, line)
+        return line
+
+    def _timestamp(self, created: float) -> str:
+        # The formatted date and time is reused within the same second.
+        second = int(created)
+        if second != self._second:
+            self._second_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = second
+        return f"{self._second_prefix}.{int((created - second) * 1000):03d}Z"
+
+
+class BufferedJsonLineHandler(logging.Handler):
+    """
+    Writes the formatted log records to a stream in bulk.
+
+    The lines are buffered, and written (with a single write call) once `capacity` lines are
+    buffered, once `flush_interval` seconds passed since the last write, when a record at or
+    above the `flush_level` is handled, or when the handler is flushed or closed.
+    """
+
+    stream: TextIO
+    capacity: int
+    flush_interval: float
+    flush_level: int
+
+    _buffer: List[str]
+    _last_write: float
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        capacity: int = 256,
+        flush_interval: float = 1.0,
+        flush_level: int = logging.ERROR,
+        formatter: logging.Formatter | None = None,
+    ) -> None:
+        """
+        :param stream: The stream to write to, defaults to `sys.stderr`.
+        :param capacity: The maximum number of buffered lines.
+        :param flush_interval: The maximum time (in seconds) a line stays buffered, checked as records are handled.
+        :param flush_level: The level of the records written immediately, along with the buffered lines.
+        :param formatter: The formatter of the records, defaults to a `HttpJsonFormatter`.
+        """
+        super().__init__()
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.stream = stream if stream is not None else sys.stderr
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.setFormatter(formatter if formatter is not None else HttpJsonFormatter())
+        self._buffer = []
+        self._last_write = time.monotonic()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+            # `handle` already holds the handler lock.
+            self._buffer.append(line)
+            if (
+                len(self._buffer) >= self.capacity
+                or record.levelno >= self.flush_level
+                or time.monotonic() - self._last_write >= self.flush_interval
+            ):
+                self._write()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        with self.lock:
+            self._write()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            super().close()
+
+    def _write(self) -> None:
+        self._last_write = time.monotonic()
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        lines.append("")
+        self.stream.write("\n".join(lines))
+        if hasattr(self.stream, "flush"):
+            self.stream.flush()
+
+
+def _make_encoder() -> Callable[[Any], str]:
+    # The (C) encoder is built once and reused, rather than once per call as `json.dumps` does.
+    # NOTE: It doesn't check for circular references, which end up raising a RecursionError.
+    if c_make_encoder is None:  # pragma: no cover
+        return json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str).encode
+    iterencode = c_make_encoder(None, str, encode_basestring, None, ":", ",", False, False, True)
+
+    def encode(value: Any) -> str:
+        return "".join(iterencode(value, 0))
+
+    return encode
+
+
+def _orjson_dumps(document: Dict[str, Any]) -> str:
+    return orjson.dumps(document, default=str).decode("utf-8")
@@ -0,0 +1,314 @@
+"""
+This module contains the opt-in in-process metrics, i.e. latency histograms and counters of the exchanges.
+
+The exchanges are grouped into series keyed by host, method, route and status class, each
+series holding a fixed-size log-linear (HDR-style) latency histogram along with its counts.
+
+Recording is O(1) and lock-free: each thread records into its own shard of the series, and
+the shards are only merged when reading a snapshot. Resetting bumps an epoch, so the stale
+shards are ignored by the readers and cleared by their own thread on its next record. The
+shards of the finished threads are merged into a single one, by the readers and by the next
+thread registering its shard, so the memory is bounded by the live threads.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest
+
+from logging_http_client.http_timing import ConnectionTimings
+
+# The number of bits of the sub-buckets, i.e. each power of two is split into 32 buckets (~3% relative error).
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+# The largest recorded latency, in microseconds (~71 minutes), larger ones are clamped.
+_MAX_VALUE = (1 << 32) - 1
+_BUCKETS = ((_MAX_VALUE.bit_length() - _SUB_BUCKET_BITS - 1) << _SUB_BUCKET_BITS) + 2 * _SUB_BUCKETS
+
+# The status class of the exchanges that raised an exception.
+ERROR_STATUS_CLASS = "error"
+# The route of the series recorded once the maximum number of series is reached.
+OTHER_ROUTE = "<other>"
+# The connection phases recorded along with the series, see `logging_http_client.http_timing`.
+PHASES = ("dns", "connect", "tls", "ttfb", "download")
+
+
+class SeriesKey(NamedTuple):
+    """
+    The key of a series of exchanges.
+
+    - host: The host (and port) of the request URL.
+    - method: The HTTP method of the request.
+    - route: The route of the request, e.g. its path or a route template.
+    - status_class: The status class of the response (e.g. "2xx"), or "error" if an exception was raised.
+    """
+
+    host: str
+    method: str
+    route: str
+    status_class: str
+
+
+class LatencyHistogram:
+    """
+    A fixed-size log-linear latency histogram, recording microseconds with a ~3% relative error.
+
+    NOTE:
+        A histogram is NOT thread-safe, it's meant to be recorded into by a single thread.
+    """
+
+    __slots__ = ("counts", "count", "errors", "total_us", "min_us", "max_us")
+
+    counts: List[int]
+    count: int
+    errors: int
+    total_us: int
+    min_us: int
+    max_us: int
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.errors = 0
+        self.total_us = 0
+        self.min_us = _MAX_VALUE
+        self.max_us = 0
+
+    def record(self, value_us: int, error: bool = False) -> None:
+        """
+        Record a latency.
+
+        :param value_us: The latency, in microseconds.
+        :param error: Whether the exchange failed.
+        """
+        value_us = min(max(int(value_us), 0), _MAX_VALUE)
+        shift = max(value_us.bit_length() - _SUB_BUCKET_BITS - 1, 0)
+        self.counts[(shift << _SUB_BUCKET_BITS) + (value_us >> shift)] += 1
+        self.count += 1
+        self.errors += error
+        self.total_us += value_us
+        if value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: LatencyHistogram) -> LatencyHistogram:
+        """
+        Add the recorded latencies of another histogram to this one.
+
+        :param other: The other histogram.
+        :return: This histogram.
+        """
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.errors += other.errors
+        self.total_us += other.total_us
+        self.min_us = min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Get a latency percentile, i.e. the middle of the bucket holding it, bounded by the recorded min and max.
+
+        :param percentile: The percentile, between 0 and 100.
+        :return: The latency, in milliseconds (0 if nothing was recorded).
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(round(percentile / 100 * self.count), 1)
+        if rank >= self.count:
+            return round(self.max_us / 1000, 3)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                lowest, highest = _bucket_range(index)
+                value = min(max((lowest + highest) / 2, self.min_us), self.max_us)
+                return round(value / 1000, 3)
+        return round(self.max_us / 1000, 3)
+
+    @property
+    def mean_ms(self) -> float:
+        return round(self.total_us / self.count / 1000, 3) if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Summarize the histogram, e.g. to log or export it.
+
+        :return: The counts, and the min, mean, max, p50, p90, p99 and p999 latencies in milliseconds.
+        """
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "min_ms": round(self.min_us / 1000, 3) if self.count else 0.0,
+            "mean_ms": self.mean_ms,
+            "max_ms": round(self.max_us / 1000, 3),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "p999_ms": self.percentile(99.9),
+        }
+
+
+class _Shard:
+    # The series (and their connection phases) recorded by a single thread, during a single epoch.
+    __slots__ = ("thread", "epoch", "series", "phases")
+
+    def __init__(self, thread: threading.Thread, epoch: int) -> None:
+        self.thread = weakref.ref(thread)
+        self.epoch = epoch
+        self.series: Dict[SeriesKey, LatencyHistogram] = {}
+        self.phases: Dict[Tuple[SeriesKey, str], LatencyHistogram] = {}
+
+
+class MetricsRecorder:
+    """
+    Records the latency and outcome of the exchanges, into per-thread shards merged on read.
+    """
+
+    _route: Callable[[PreparedRequest], str]
+    _max_series: int
+
+    def __init__(self, route: Callable[[PreparedRequest], str] | None = None, max_series: int = 1024) -> None:
+        """
+        :param route: Gets the route of a request, defaults to its URL path. It SHOULD have a low cardinality,
+            e.g. a route template (``/users/{id}``) rather than the path itself.
+        :param max_series: The maximum number of series per thread, the exchanges of any further route
+            being recorded under the "<other>" route.
+        """
+        self._route = route if route is not None else _path_route
+        self._max_series = max_series
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[_Shard] = []
+        # The series of the finished threads.
+        self._retired = _Shard(threading.current_thread(), 0)
+        self._epoch = 0
+
+    def record(
+        self,
+        request: PreparedRequest,
+        status_code: int | None,
+        duration_ns: int,
+        timings: ConnectionTimings | None = None,
+    ) -> None:
+        """
+        Record an exchange.
+
+        :param request: The request of the exchange.
+        :param status_code: The status code of the response, or None if an exception was raised.
+        :param duration_ns: The duration of the exchange, in nanoseconds.
+        :param timings: The connection phase timings of the exchange, if any.
+        """
+        shard = self._shard()
+        if status_code is None:
+            status_class, error = ERROR_STATUS_CLASS, True
+        else:
+            status_class, error = f"{status_code // 100}xx", status_code >= 500
+
+        key = SeriesKey(urlsplit(request.url).netloc, request.method, self._route(request), status_class)
+        histogram = shard.series.get(key)
+        if histogram is None:
+            if len(shard.series) >= self._max_series:
+                key = key._replace(route=OTHER_ROUTE)
+                histogram = shard.series.get(key)
+            if histogram is None:
+                histogram = shard.series[key] = LatencyHistogram()
+        histogram.record(duration_ns // 1000, error)
+
+        if timings is not None:
+            phases = shard.phases
+            for phase in PHASES:
+                value_ms = getattr(timings, f"{phase}_ms")
+                if value_ms is not None:
+                    phase_histogram = phases.get((key, phase))
+                    if phase_histogram is None:
+                        phase_histogram = phases[(key, phase)] = LatencyHistogram()
+                    phase_histogram.record(value_ms * 1000)
+
+    def snapshot(self) -> Dict[SeriesKey, LatencyHistogram]:
+        """
+        Get the series recorded since the last reset, merged across the threads.
+
+        :return: The merged histograms by series key.
+        """
+        return self._merge("series")
+
+    def phase_snapshot(self) -> Dict[Tuple[SeriesKey, str], LatencyHistogram]:
+        """
+        Get the connection phase timings recorded since the last reset, merged across the threads.
+
+        NOTE:
+            The phases are only recorded for the exchanges sent with a `TimingHTTPAdapter`, i.e. when the
+            connection timings are enabled. The dns, connect and tls phases are only recorded for the new
+            connections, so their counts are the number of connections opened.
+
+        :return: The merged histograms by series key and phase (i.e. "dns", "connect", "tls", "ttfb" or "download").
+        """
+        return self._merge("phases")
+
+    def reset(self) -> None:
+        """
+        Drop the series recorded so far.
+        """
+        with self._lock:
+            self._epoch += 1
+            self._retired = _Shard(threading.current_thread(), self._epoch)
+            self._retire_dead_shards()
+
+    def _merge(self, attribute: str) -> Dict[Any, LatencyHistogram]:
+        merged: Dict[Any, LatencyHistogram] = {}
+        with self._lock:
+            self._retire_dead_shards()
+            epoch = self._epoch
+            shards = [self._retired] + [shard for shard in self._shards if shard.epoch == epoch]
+            for shard in shards:
+                # Copying a dict is atomic, so the owner thread can keep on adding series meanwhile.
+                for key, histogram in getattr(shard, attribute).copy().items():
+                    merged.setdefault(key, LatencyHistogram()).merge(histogram)
+        return merged
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # Only the first record of a thread takes the lock, which retires the shards of the finished threads
+            # too, so the short-lived threads (e.g. of the batches) don't pile up shards when nothing is read.
+            shard = self._local.shard = _Shard(threading.current_thread(), self._epoch)
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append(shard)
+        elif shard.epoch != self._epoch:
+            shard.series = {}
+            shard.phases = {}
+            shard.epoch = self._epoch
+        return shard
+
+    def _retire_dead_shards(self) -> None:
+        # The shards of the finished threads are merged once, so they don't pile up.
+        alive: List[_Shard] = []
+        for shard in self._shards:
+            thread = shard.thread()
+            if thread is not None and thread.is_alive():
+                alive.append(shard)
+            elif shard.epoch == self._epoch:
+                for key, histogram in shard.series.items():
+                    self._retired.series.setdefault(key, LatencyHistogram()).merge(histogram)
+                for key, histogram in shard.phases.items():
+                    self._retired.phases.setdefault(key, LatencyHistogram()).merge(histogram)
+        self._shards = alive
+
+
+def _path_route(request: PreparedRequest) -> str:
+    return urlsplit(request.url).path or "/"
+
+
+def _bucket_range(index: int) -> Tuple[int, int]:
+    # The lowest and highest values (in microseconds) of a bucket.
+    shift = max((index >> _SUB_BUCKET_BITS) - 1, 0)
+    lowest = (index - (shift << _SUB_BUCKET_BITS)) << shift
+    return lowest, lowest + (1 << shift) - 1
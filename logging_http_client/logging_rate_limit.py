@@ -0,0 +1,185 @@
+"""
+This module contains the rate limiting of the default logging hooks records, protecting the log pipeline.
+
+During an upstream incident, retry storms make the hooks emit tens of thousands of records a
+second, saturating the log shipper (and slowing the requests down too). A :class:`LogRateLimiter`
+keeps a token bucket per key (the destination host by default): the records over the limit are
+counted instead of being emitted, and a SUPPRESSED summary record is logged periodically for each
+key that had records suppressed.
+
+The buckets are updated without any lock, so a few extra records may get through when several
+threads log for the same key at once (and a few suppressed records may be missed by a summary).
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest
+
+from logging_http_client.http_fork_safety import reset_after_fork
+from logging_http_client.http_log_record import HttpSuppressedLogRecord
+
+# The key of the records once the maximum number of keys is reached.
+OTHER_KEY = "<other>"
+
+
+class _Bucket:
+    # The token bucket of a key, along with its suppressed records counter.
+    __slots__ = ("tokens", "updated_at", "suppressed", "logger", "level")
+
+    def __init__(self, tokens: float) -> None:
+        self.tokens = tokens
+        self.updated_at = time.monotonic()
+        # Counting with `next` is atomic, unlike `+= 1`.
+        self.suppressed = itertools.count()
+        self.logger: logging.Logger | None = None
+        self.level = logging.INFO
+
+
+class LogRateLimiter:
+    """
+    Limits the rate of the records of the default logging hooks, per destination host (or any key).
+    """
+
+    rate: float
+    burst: float
+    summary_interval_s: float
+    max_keys: int
+    _key: Callable[[PreparedRequest], str]
+
+    _buckets: Dict[str, _Bucket]
+    _lock: threading.Lock
+    _worker: threading.Thread | None
+    _stopped: threading.Event
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        key: Callable[[PreparedRequest], str] | None = None,
+        summary_interval_s: float = 60.0,
+        max_keys: int = 10_000,
+    ) -> None:
+        """
+        :param rate: The number of records per second allowed per key.
+        :param burst: The number of records allowed at once per key, defaults to the rate (and at least 1).
+        :param key: Gets the key of a request, defaults to its destination host (and port).
+        :param summary_interval_s: The interval between the summaries of the suppressed records, in seconds.
+        :param max_keys: The maximum number of keys, the records of any further key sharing the "<other>" bucket.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if summary_interval_s <= 0:
+            raise ValueError("summary_interval_s must be positive")
+
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(self.rate, 1.0)
+        self.summary_interval_s = summary_interval_s
+        self.max_keys = max_keys
+        self._key = key if key is not None else _host_key
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stopped = threading.Event()
+        reset_after_fork(self)
+
+    def allow(self, logger: logging.Logger, level: int, request: PreparedRequest) -> bool:
+        """
+        Take a token for a record, or count it as suppressed.
+
+        :param logger: The logger of the record, which the summary of its key is logged with.
+        :param level: The logging level of the record.
+        :param request: The request of the record.
+        :return: True if the record can be emitted, False if it's suppressed.
+        """
+        if not logger.isEnabledFor(level):
+            # The record won't be emitted anyway.
+            return True
+
+        key = self._key(request)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                key = OTHER_KEY
+            # `setdefault` is atomic, so concurrent threads share the same bucket.
+            bucket = self._buckets.setdefault(key, _Bucket(self.burst))
+
+        now = time.monotonic()
+        tokens = min(self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate)
+        bucket.updated_at = now
+        if tokens >= 1.0:
+            bucket.tokens = tokens - 1.0
+            return True
+
+        bucket.tokens = tokens
+        bucket.logger, bucket.level = logger, level
+        next(bucket.suppressed)
+        if self._worker is None:
+            self._start()
+        return False
+
+    def flush(self) -> int:
+        """
+        Log the summaries of the records suppressed since the last summary.
+
+        :return: The number of summaries logged.
+        """
+        summaries = 0
+        for key, bucket in list(self._buckets.items()):
+            suppressed, bucket.suppressed = bucket.suppressed, itertools.count()
+            # The next value of a counter is the number of records it counted.
+            count = next(suppressed)
+            if not count or bucket.logger is None:
+                continue
+            record = HttpSuppressedLogRecord(suppressed_key=key, suppressed_count=count)
+            try:
+                bucket.logger.log(bucket.level, "SUPPRESSED", extra=record.to_extra())
+            except Exception as e:
+                bucket.logger.exception("Error logging suppressed HTTP log records summary", exc_info=e)
+            summaries += 1
+        return summaries
+
+    def shutdown(self) -> None:
+        """
+        Stop the summary thread, and log the summaries of the records suppressed so far.
+        """
+        self._stopped.set()
+        atexit.unregister(self.shutdown)
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(self.summary_interval_s)
+        self.flush()
+
+    def _after_fork_in_child(self) -> None:
+        # The summary thread isn't running in the child, and the suppressed records are the parent's to summarize.
+        stopped = self._stopped.is_set()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stopped = threading.Event()
+        if stopped:
+            self._stopped.set()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._worker is not None or self._stopped.is_set():
+                return
+            self._worker = threading.Thread(target=self._run, name="logging-http-client-rate-limit", daemon=True)
+            self._worker.start()
+        atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.summary_interval_s):
+            self.flush()
+
+
+def _host_key(request: PreparedRequest) -> str:
+    return urlsplit(request.url or "").netloc
@@ -0,0 +1,182 @@
+"""
+This module contains the declarative redaction rules, compiled into a single-pass log record obscurer.
+
+Instead of chaining obscurer callables that each walk the whole log record, the rules (i.e. header
+names, query param names, JSON body field paths and regex patterns) are compiled once into a
+:class:`Redactor`: the header and param names into lowercase sets, the patterns into a single
+combined regex, and the JSON field paths into a tree walked once per body. The redactor is an
+obscurer itself, so it plugs into `set_request_log_record_obscurers`/`set_response_log_record_obscurers`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Pattern, Tuple
+
+from logging_http_client.http_log_record import HttpLogRecord
+
+DEFAULT_REPLACEMENT = "****"
+
+# The key of a JSON path tree node whose field is redacted.
+_LEAF = ""
+# The JSON path segment matching any key of an object, or any item of an array.
+_WILDCARD = "*"
+
+
+@dataclass(frozen=True)
+class RedactionRules:
+    """
+    What to redact from the log records.
+
+    :param headers: The (case-insensitive) names of the request/response headers to redact, e.g. ``("authorization",)``.
+    :param query_params: The (case-insensitive) names of the query params to redact, e.g. ``("api_key",)``.
+    :param json_fields: The paths of the JSON body fields to redact, as dot-separated keys where ``*`` matches any
+        key or array item, e.g. ``("password", "user.ssn", "cards.*.number")``.
+    :param patterns: The regex patterns to redact from the URLs and bodies, e.g. ``(r"\\d{16}",)``.
+    :param replacement: The value replacing the redacted data.
+    """
+
+    headers: Tuple[str, ...] = ()
+    query_params: Tuple[str, ...] = ()
+    json_fields: Tuple[str, ...] = ()
+    patterns: Tuple[str, ...] = ()
+    replacement: str = DEFAULT_REPLACEMENT
+
+    def compile(self) -> Redactor:
+        """
+        Compile the rules into a redactor, i.e. a log record obscurer.
+
+        :return: The redactor.
+        """
+        return Redactor(self)
+
+
+class Redactor:
+    """
+    The compiled redaction rules, applied to a log record in a single pass.
+
+    It's a log record obscurer, i.e. a callable taking a `HttpLogRecord` and returning it redacted.
+    """
+
+    __slots__ = ("rules", "_headers", "_query_params", "_json_paths", "_json_fields", "_url_pattern", "_pattern")
+
+    rules: RedactionRules
+
+    def __init__(self, rules: RedactionRules) -> None:
+        """
+        :param rules: The redaction rules to compile.
+        """
+        self.rules = rules
+        self._headers = frozenset(name.lower() for name in rules.headers)
+        self._query_params = frozenset(name.lower() for name in rules.query_params)
+        self._json_paths = _compile_json_paths(rules.json_fields)
+        self._json_fields = _compile_json_fields(rules.json_fields)
+        self._url_pattern = _compile_url_pattern(rules.query_params)
+        self._pattern = re.compile("|".join(f"(?:{pattern})" for pattern in rules.patterns)) if rules.patterns else None
+
+    def __call__(self, record: HttpLogRecord) -> HttpLogRecord:
+        if self._headers:
+            if record.request_headers:
+                record.request_headers = self._redact_mapping(record.request_headers, self._headers)
+            if record.response_headers:
+                record.response_headers = self._redact_mapping(record.response_headers, self._headers)
+
+        if self._query_params and record.request_query_params:
+            record.request_query_params = self._redact_mapping(record.request_query_params, self._query_params)
+
+        if record.request_url:
+            record.request_url = self._redact_url(record.request_url)
+
+        if record.request_body:
+            record.request_body = self._redact_body(record.request_body)
+        if record.response_body:
+            record.response_body = self._redact_body(record.response_body)
+
+        return record
+
+    def _redact_mapping(self, mapping: Dict[str, Any], names: frozenset) -> Dict[str, Any]:
+        for key in mapping:
+            if key.lower() in names:
+                # Only copy the mapping when there's something to redact.
+                replacement = self.rules.replacement
+                return {k: replacement if k.lower() in names else v for k, v in mapping.items()}
+        return mapping
+
+    def _redact_url(self, url: str) -> str:
+        if self._url_pattern is not None and "?" in url:
+            url = self._url_pattern.sub(lambda match: match.group(1) + self.rules.replacement, url)
+        if self._pattern is not None:
+            url = self._pattern.sub(self.rules.replacement, url)
+        return url
+
+    def _redact_body(self, body: str) -> str:
+        if self._json_paths and body.lstrip()[:1] in ("{", "["):
+            body = self._redact_json(body)
+        if self._pattern is not None:
+            body = self._pattern.sub(self.rules.replacement, body)
+        return body
+
+    def _redact_json(self, body: str) -> str:
+        if self._json_fields is not None and self._json_fields.search(body) is None:
+            # None of the redacted field names is in the body, so there's no need to parse it.
+            return body
+        try:
+            document = json.loads(body)
+        except ValueError:
+            # The body isn't valid JSON (e.g. it's been truncated), so redact the fields by name instead.
+            if self._json_fields is None:
+                return body
+            return self._json_fields.sub(lambda match: match.group(1) + json.dumps(self.rules.replacement), body)
+        if _redact_json_paths(document, self._json_paths, self.rules.replacement):
+            return json.dumps(document)
+        return body
+
+
+def _compile_json_paths(paths: Tuple[str, ...]) -> Dict[str, Any]:
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for segment in path.split("."):
+            node = node.setdefault(segment, {})
+        node[_LEAF] = True
+    return tree
+
+
+def _compile_json_fields(paths: Tuple[str, ...]) -> Pattern | None:
+    # Matches the fields by their (last) name, followed by their string, number or literal value.
+    names = {path.rsplit(".", 1)[-1] for path in paths}
+    if not names or _WILDCARD in names:
+        return None
+    alternatives = "|".join(re.escape(json.dumps(name)) for name in sorted(names))
+    return re.compile(rf'((?:{alternatives})\s*:\s*)(?:"(?:[^"\\]|\\.)*"?|[^\s,}}\]]+)')
+
+
+def _compile_url_pattern(names: Tuple[str, ...]) -> Pattern | None:
+    if not names:
+        return None
+    alternatives = "|".join(re.escape(name) for name in names)
+    return re.compile(rf"([?&](?:{alternatives})=)[^&#]*", re.IGNORECASE)
+
+
+def _redact_json_paths(document: Any, tree: Dict[str, Any], replacement: str) -> bool:
+    redacted = False
+    if isinstance(document, dict):
+        items = document.items()
+    elif isinstance(document, list):
+        items = enumerate(document)
+    else:
+        return False
+
+    wildcard = tree.get(_WILDCARD)
+    for key, value in list(items):
+        for node in (tree.get(key if isinstance(key, str) else str(key)), wildcard):
+            if node is None:
+                continue
+            if _LEAF in node:
+                document[key] = replacement
+                redacted = True
+                break
+            redacted |= _redact_json_paths(value, node, replacement)
+    return redacted
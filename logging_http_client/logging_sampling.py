@@ -0,0 +1,270 @@
+"""
+This module contains the samplers deciding which exchanges get logged.
+
+A sampler makes a head decision before the request is sent. Exchanges that are not sampled
+skip the log record construction completely, unless a tail rule keeps them once their outcome
+is known (e.g. errors, slow responses or exceptions). The decision and the sampling rate are
+attached to the emitted records, so counts can be re-weighted downstream (i.e. 1 / rate).
+
+The rate of a record is the probability its exchange had to be logged, given its outcome: the
+exchanges kept by a tail rule had a rate of 1.0, whether the head sampler sampled them or not. As
+such, with tail rules, the request records wait for the outcome, so all the records of an exchange
+carry its final decision.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, replace
+from fnmatch import fnmatchcase
+from typing import Mapping, Tuple
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response
+
+from logging_http_client.http_route import RouteNormalizer
+
+HEAD = "head"
+ERROR = "error"
+SLOW = "slow"
+EXCEPTION = "exception"
+
+
+@dataclass(frozen=True)
+class SamplingDecision:
+    """
+    Whether an exchange is logged, at which rate, and for which reason.
+
+    - sampled: Whether the exchange is logged.
+    - rate: The probability the exchange had to be logged, given its outcome (i.e. 1.0 once kept by a tail rule).
+    - reason: Why it's logged, i.e. "head" for the head decision, or the tail rule that kept it.
+    """
+
+    sampled: bool
+    rate: float
+    reason: str = HEAD
+
+    def kept_by(self, reason: str) -> SamplingDecision:
+        """
+        Get the decision of an exchange kept by a tail rule, sampled up front or not.
+
+        A tail rule keeps every matching exchange, so the rate is 1.0: each of them stands for itself.
+
+        :param reason: The tail rule that kept the exchange.
+        :return: The new decision.
+        """
+        return replace(self, sampled=True, rate=1.0, reason=reason)
+
+
+class Sampler:
+    """
+    The base class of the samplers, which logs every exchange.
+
+    Subclasses override `rate_for` for head sampling, and `keep_response`/`keep_exception` for tail sampling.
+    """
+
+    @property
+    def has_tail_rules(self) -> bool:
+        """
+        Whether the sampler can keep an exchange once its outcome is known, i.e. overrides the tail sampling.
+
+        With tail rules, the request records of the sampled exchanges are logged once the outcome is known (along
+        with the response), so they carry the final decision.
+        """
+        cls = type(self)
+        return (
+            cls.keep_response is not Sampler.keep_response
+            or cls.keep_exception is not Sampler.keep_exception
+            or cls.sample_response is not Sampler.sample_response
+        )
+
+    def rate_for(self, request: PreparedRequest) -> float:
+        """
+        Get the head sampling rate of a request.
+
+        :param request: The request about to be sent.
+        :return: The probability of the exchange to be logged, between 0.0 and 1.0.
+        """
+        return 1.0
+
+    def sample_request(self, request: PreparedRequest) -> SamplingDecision:
+        """
+        Make the head decision, before the request is sent.
+
+        :param request: The request about to be sent.
+        :return: The sampling decision.
+        """
+        rate = self.rate_for(request)
+        return SamplingDecision(rate >= 1.0 or random.random() < rate, rate)
+
+    def keep_response(self, decision: SamplingDecision, response: Response) -> str | None:
+        """
+        Apply the tail rules, once the response is received.
+
+        :param decision: The head decision.
+        :param response: The response received.
+        :return: The name of the tail rule keeping the exchange, or None.
+        """
+        return None
+
+    def keep_exception(self, decision: SamplingDecision, exception: BaseException) -> bool:
+        """
+        Apply the tail rules, when sending the request raised an exception.
+
+        :param decision: The head decision.
+        :param exception: The exception raised.
+        :return: True to keep the exchange.
+        """
+        return False
+
+    def sample_response(self, decision: SamplingDecision, response: Response) -> SamplingDecision:
+        """
+        Make the final decision of an exchange, once the response is received.
+
+        :param decision: The head decision.
+        :param response: The response received.
+        :return: The final sampling decision.
+        """
+        reason = self.keep_response(decision, response)
+        return decision.kept_by(reason) if reason is not None else decision
+
+
+class RateSampler(Sampler):
+    """
+    Logs a fixed percentage of the exchanges.
+    """
+
+    rate: float
+
+    def __init__(self, rate: float) -> None:
+        """
+        :param rate: The probability of an exchange to be logged, between 0.0 and 1.0.
+        """
+        self.rate = _checked_rate(rate)
+
+    def rate_for(self, request: PreparedRequest) -> float:
+        return self.rate
+
+
+class RouteRateSampler(Sampler):
+    """
+    Logs a percentage of the exchanges that depends on their destination.
+
+    The rates are keyed by host (e.g. ``"api.example.com"``), or by host and path glob
+    patterns (e.g. ``"api.example.com/health*"`` or ``"*.example.com/users/*"``). Host keys
+    are matched first, then the patterns in the order they are given. The hosts are matched
+    case-insensitively, and the paths case-sensitively (as they are by the servers).
+
+    With a route normalizer, the patterns are matched against the route templates instead
+    of the paths (e.g. ``"api.example.com/users/{id}"``), and the parsed URLs are cached.
+    """
+
+    default_rate: float
+    _host_rates: Mapping[str, float]
+    _pattern_rates: Tuple[Tuple[str, float], ...]
+    _normalizer: RouteNormalizer | None
+
+    def __init__(
+        self,
+        rates: Mapping[str, float],
+        default_rate: float = 1.0,
+        normalizer: RouteNormalizer | None = None,
+    ) -> None:
+        """
+        :param rates: The sampling rates, keyed by host or by host and path pattern.
+        :param default_rate: The sampling rate of the exchanges not matching any key.
+        :param normalizer: The route normalizer of the URLs, if any.
+        """
+        self.default_rate = _checked_rate(default_rate)
+        self._normalizer = normalizer
+        self._host_rates = {}
+        pattern_rates = []
+        for key, rate in rates.items():
+            if "/" in key or any(c in key for c in "*?["):
+                pattern_rates.append((_host_lowered(key), _checked_rate(rate)))
+            else:
+                self._host_rates[key.lower()] = _checked_rate(rate)
+        self._pattern_rates = tuple(pattern_rates)
+
+    def rate_for(self, request: PreparedRequest) -> float:
+        if self._normalizer is not None:
+            host, path = self._normalizer.normalize(request.url or "")
+        else:
+            parts = urlsplit(request.url or "")
+            host, path = parts.netloc, parts.path or "/"
+        host = host.lower()
+
+        rate = self._host_rates.get(host)
+        if rate is not None:
+            return rate
+
+        if self._pattern_rates:
+            target = host + path
+            for pattern, rate in self._pattern_rates:
+                if fnmatchcase(target, pattern):
+                    return rate
+
+        return self.default_rate
+
+
+class TailSampler(Sampler):
+    """
+    Wraps a head sampler with tail rules that always keep errors, slow responses and exceptions.
+
+    The requests are logged once the outcome is known (i.e. after the response is received)
+    alongside their response, so the records of an exchange kept by a tail rule all have a rate
+    of 1.0, whether the head sampler sampled it or not.
+    """
+
+    head: Sampler
+    error_status: int | None
+    slow_threshold_ms: float | None
+    keep_exceptions: bool
+
+    def __init__(
+        self,
+        head: Sampler,
+        error_status: int | None = 500,
+        slow_threshold_ms: float | None = None,
+        keep_exceptions: bool = True,
+    ) -> None:
+        """
+        :param head: The sampler making the head decision.
+        :param error_status: Keep the responses with a status code at or above this one (None disables it).
+        :param slow_threshold_ms: Keep the responses slower than this many milliseconds (None disables it).
+        :param keep_exceptions: Keep the exchanges that raised an exception.
+        """
+        self.head = head
+        self.error_status = error_status
+        self.slow_threshold_ms = slow_threshold_ms
+        self.keep_exceptions = keep_exceptions
+
+    def rate_for(self, request: PreparedRequest) -> float:
+        return self.head.rate_for(request)
+
+    def sample_request(self, request: PreparedRequest) -> SamplingDecision:
+        return self.head.sample_request(request)
+
+    def keep_response(self, decision: SamplingDecision, response: Response) -> str | None:
+        if self.error_status is not None and response.status_code >= self.error_status:
+            return ERROR
+        if self.slow_threshold_ms is not None:
+            elapsed = getattr(response, "elapsed", None)
+            if elapsed is not None and elapsed.total_seconds() * 1000 >= self.slow_threshold_ms:
+                return SLOW
+        return self.head.keep_response(decision, response)
+
+    def keep_exception(self, decision: SamplingDecision, exception: BaseException) -> bool:
+        return self.keep_exceptions or self.head.keep_exception(decision, exception)
+
+
+def _checked_rate(rate: float) -> float:
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"Sampling rate must be between 0.0 and 1.0, got: {rate}")
+    return float(rate)
+
+
+def _host_lowered(pattern: str) -> str:
+    # The host part of a pattern is lowercased, like the hosts it's matched against, but its path is kept as is.
+    host, slash, path = pattern.partition("/")
+    return host.lower() + slash + path
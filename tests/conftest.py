@@ -1,9 +1,14 @@
 import logging
 
 import pytest
+from requests import ConnectionError, PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
 
+import logging_http_client
 import logging_http_client_config
-from logging_default_hooks import default_response_logging_hook, default_request_logging_hook
+from http_body_policy import BodyCapturePolicy
+from logging_http_client.logging_default_hooks import default_response_logging_hook, default_request_logging_hook
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -35,6 +40,7 @@ def reset_library_globals_after_each_test():
     test, I need to clean them up after each test to avoid memory leaks or undesired side effects.
     """
     logging_http_client_config.set_correlation_id_provider(None)
+    logging_http_client_config.set_request_id_provider(None)
 
     logging_http_client_config.set_request_log_record_obscurers([])
     logging_http_client_config.set_response_log_record_obscurers([])
@@ -49,3 +55,75 @@ def reset_library_globals_after_each_test():
 
     logging_http_client_config.enable_request_body_logging(False)
     logging_http_client_config.enable_response_body_logging(False)
+
+    logging_http_client_config.set_request_body_capture_policy(BodyCapturePolicy())
+    logging_http_client_config.set_response_body_capture_policy(BodyCapturePolicy())
+    logging_http_client_config.set_response_stream_capture_limit(64 * 1024)
+
+    logging_http_client_config.disable_async_logging()
+    logging_http_client_config.disable_log_aggregation()
+    logging_http_client_config.disable_log_rate_limit()
+
+    logging_http_client_config.set_logging_sampler(None)
+
+    logging_http_client_config.set_metrics_recorder(None)
+    logging_http_client_config.enable_connection_timings(False)
+    logging_http_client_config.set_route_normalizer(None)
+
+
+class CannedAdapter(BaseAdapter):
+    """
+    Answers every request with a canned response, or raises the given exception.
+
+    The "status" query param overrides the status, "/redirect" is redirected to "/", and the connections to "/down"
+    are refused.
+    """
+
+    def __init__(self, status=200, body=b"", headers=None, exception=None):
+        super().__init__()
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.exception = exception
+
+    def send(self, request: PreparedRequest, **kwargs):
+        if self.exception is not None:
+            raise self.exception
+        if request.path_url.startswith("/down"):
+            raise ConnectionError("refused", request=request)
+        response = Response()
+        response.status_code = int(request.url.split("status=")[1]) if "status=" in request.url else self.status
+        response._content = self.body
+        response.headers = CaseInsensitiveDict({"Content-Length": str(len(self.body)), **self.headers})
+        if request.path_url.startswith("/redirect"):
+            response.status_code = 302
+            response.headers["Location"] = "http://example.com/"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def given_adapter():
+    """
+    Fixture to create the adapters answering the requests without a network, e.g. ``given_adapter(status=500)``.
+    """
+    return CannedAdapter
+
+
+@pytest.fixture
+def given_client(given_adapter):
+    """
+    Fixture to create the clients logging to the "test" logger, whose "http://" requests are answered by the given
+    adapter (a 200 by default), e.g. ``given_client(given_adapter(body=b"ok"), logging_config={...})``.
+    """
+
+    def create(adapter: BaseAdapter = None, **kwargs):
+        client = logging_http_client.create(logger=logging.getLogger("test"), **kwargs)
+        client.session.mount("http://", adapter or given_adapter())
+        return client
+
+    return create
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import threading
+
+import httpx
+import pytest
+
+import logging_http_client
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client import AsyncLoggingHttpClient, RateSampler, TailSampler
+from logging_http_client.http_snapshot import HttpRequestSnapshot, HttpResponseSnapshot
+
+
+async def chunks():
+    for chunk in (b"hello ", b"streamed ", b"world"):
+        yield chunk
+
+
+def echo_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/stream":
+        return httpx.Response(200, headers={"content-type": "text/plain"}, content=chunks())
+    if request.url.path == "/redirect":
+        return httpx.Response(302, headers={"location": "/ok"})
+    if request.url.path == "/fail":
+        return httpx.Response(503, text="unavailable")
+    return httpx.Response(200, json={"received": dict(request.headers)})
+
+
+def given_client(**kwargs) -> AsyncLoggingHttpClient:
+    kwargs.setdefault("logger", logging.getLogger("test"))
+    return logging_http_client.create_async(transport=httpx.MockTransport(echo_handler), **kwargs)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def recording_hooks():
+    requests, responses = [], []
+    config.set_request_logging_hooks([lambda logger, request: requests.append(request)])
+    config.set_response_logging_hooks([lambda logger, response: responses.append(response)])
+    return requests, responses
+
+
+def test_create_async_returns_an_async_client():
+    assert isinstance(given_client(), AsyncLoggingHttpClient)
+
+
+def test_async_client_injects_the_observability_headers():
+    config.set_correlation_id_provider(lambda: "correlation-001")
+
+    async def scenario():
+        async with given_client(source="test-system") as client:
+            return await client.get("http://example.com/ok")
+
+    received = run(scenario()).json()["received"]
+
+    assert received["x-source"] == "test-system"
+    assert received["x-correlation-id"] == "correlation-001"
+    assert received["x-request-id"]
+
+
+def test_async_client_keeps_the_given_observability_headers():
+    async def scenario():
+        async with given_client(source="test-system") as client:
+            return await client.get("http://example.com/ok", headers={"x-request-id": "req-001", "x-source": "other"})
+
+    received = run(scenario()).json()["received"]
+
+    assert received["x-request-id"] == "req-001"
+    assert received["x-source"] == "other"
+
+
+def test_async_client_sends_the_shared_headers():
+    async def scenario():
+        async with given_client(shared_headers={"x-foo": "bar"}) as client:
+            return await client.get("http://example.com/ok")
+
+    assert run(scenario()).json()["received"]["x-foo"] == "bar"
+
+
+def test_async_client_applies_the_logging_hooks_to_snapshots():
+    requests, responses = recording_hooks()
+
+    async def scenario():
+        async with given_client() as client:
+            await client.post("http://example.com/ok", content=b"hello")
+
+    run(scenario())
+
+    assert len(requests) == 1 and isinstance(requests[0], HttpRequestSnapshot)
+    assert requests[0].method == "POST"
+    assert requests[0].body == b"hello"
+    assert len(responses) == 1 and isinstance(responses[0], HttpResponseSnapshot)
+    assert responses[0].status_code == 200
+    assert responses[0].json()["received"]["x-request-id"] == requests[0].headers["x-request-id"]
+
+
+def test_async_client_logs_every_redirect_hop():
+    requests, responses = recording_hooks()
+
+    async def scenario():
+        async with given_client() as client:
+            return await client.get("http://example.com/redirect", follow_redirects=True)
+
+    run(scenario())
+
+    assert [r.path_url for r in requests] == ["/redirect", "/ok"]
+    assert [r.status_code for r in responses] == [302, 200]
+
+
+def test_async_client_logs_records_with_the_default_hooks(caplog):
+    caplog.set_level(logging.INFO, logger="test")
+    config.set_request_log_record_obscurers([lambda record: setattr(record, "request_method", "HIDDEN") or record])
+
+    async def scenario():
+        async with given_client() as client:
+            await client.get("http://example.com/ok")
+
+    run(scenario())
+
+    request_record, response_record = caplog.records
+    assert request_record.msg == "REQUEST"
+    assert request_record.http["request_method"] == "HIDDEN"
+    assert response_record.msg == "RESPONSE"
+    assert response_record.http["response_status"] == 200
+    assert response_record.http["request_id"] == request_record.http["request_id"]
+
+
+def test_async_client_runs_sync_hooks_off_the_event_loop_and_awaits_async_hooks():
+    threads = []
+
+    async def async_hook(logger, request):
+        threads.append(("async", threading.current_thread()))
+
+    config.set_request_logging_hooks(
+        [lambda logger, request: threads.append(("sync", threading.current_thread())), async_hook]
+    )
+
+    async def scenario():
+        async with given_client() as client:
+            await client.get("http://example.com/ok")
+
+    run(scenario())
+
+    (sync_kind, sync_thread), (async_kind, async_thread) = threads
+    assert (sync_kind, async_kind) == ("sync", "async")
+    assert sync_thread is not threading.current_thread()
+    assert async_thread is threading.current_thread()
+
+
+def test_async_client_does_not_fail_requests_on_hook_errors():
+    def failing_hook(logger, response):
+        raise ValueError("boom")
+
+    config.set_response_logging_hooks([failing_hook])
+
+    async def scenario():
+        async with given_client() as client:
+            return await client.get("http://example.com/ok")
+
+    assert run(scenario()).status_code == 200
+
+
+def test_async_client_applies_the_tail_sampling_rules():
+    requests, responses = recording_hooks()
+    config.set_logging_sampler(TailSampler(RateSampler(0.0), error_status=500))
+
+    async def scenario():
+        async with given_client() as client:
+            await client.get("http://example.com/ok")
+            await client.get("http://example.com/fail")
+
+    run(scenario())
+
+    assert [r.path_url for r in requests] == ["/fail"]
+    assert [(r.status_code, r.sampling.reason) for r in responses] == [(503, "error")]
+
+
+def test_async_client_logs_the_records_of_sampled_errors_with_the_tail_decision(mocker):
+    mocker.patch("logging_http_client.logging_sampling.random.random", return_value=0.1)
+    requests, responses = recording_hooks()
+    config.set_logging_sampler(TailSampler(RateSampler(0.5), error_status=500))
+
+    async def scenario():
+        async with given_client() as client:
+            await client.get("http://example.com/ok")
+            await client.get("http://example.com/fail")
+
+    run(scenario())
+
+    assert [(r.sampling.rate, r.sampling.reason) for r in requests] == [(0.5, "head"), (1.0, "error")]
+    assert [r.sampling for r in requests] == [r.sampling for r in responses]
+
+
+def test_async_client_logs_the_request_of_kept_exceptions():
+    requests, _ = recording_hooks()
+    config.set_logging_sampler(TailSampler(RateSampler(0.0)))
+
+    def failing_handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def scenario():
+        async with logging_http_client.create_async(transport=httpx.MockTransport(failing_handler)) as client:
+            await client.get("http://example.com/ok")
+
+    with pytest.raises(httpx.ConnectError):
+        run(scenario())
+
+    assert [r.sampling.reason for r in requests] == ["exception"]
+
+
+def test_async_client_logs_streamed_responses_once_the_stream_is_consumed():
+    config.set_response_body_logging_enabled(True)
+    _, responses = recording_hooks()
+
+    async def scenario():
+        async with given_client() as client:
+            async with client.stream("GET", "http://example.com/stream") as response:
+                assert responses == []
+                return b"".join([chunk async for chunk in response.aiter_bytes()])
+
+    assert run(scenario()) == b"hello streamed world"
+
+    assert len(responses) == 1
+    assert responses[0].body_length == 20
+    assert responses[0].text == "hello streamed world"
+
+
+def test_async_client_logs_streamed_responses_closed_before_the_end():
+    config.set_response_body_logging_enabled(True)
+    config.set_response_stream_capture_limit(5)
+    _, responses = recording_hooks()
+
+    async def scenario():
+        async with given_client() as client:
+            async with client.stream("GET", "http://example.com/stream") as response:
+                async for _ in response.aiter_raw():
+                    break
+
+    run(scenario())
+
+    assert len(responses) == 1
+    assert responses[0].body_length == 6
+    assert responses[0].text == "hello"
+
+
+def test_async_client_supports_many_concurrent_requests():
+    _, responses = recording_hooks()
+
+    async def scenario():
+        async with given_client() as client:
+            return await asyncio.gather(*(client.get(f"http://example.com/ok?i={i}") for i in range(500)))
+
+    results = run(scenario())
+
+    assert all(r.status_code == 200 for r in results)
+    assert len(responses) == 500
+
+
+def test_async_client_rejects_unsupported_attributes():
+    with pytest.raises(AttributeError):
+        given_client().unsupported
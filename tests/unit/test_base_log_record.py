@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import Dict, List
 
-from logging_http_client.http_log_record import BaseLogRecord
+from logging_http_client.http_log_record import BaseLogRecord, HttpLogRecord
 
 
 def test_to_dict_should_not_omit_any_present_fields():
@@ -47,6 +47,61 @@ def test_to_dict_should_omit_zero_float_field():
     assert record.to_dict().get("float_field") is None
 
 
+def test_to_dict_should_omit_false_field():
+    record = TestLogRecordWithPopulatedFields(none_field=False)
+    assert "none_field" not in record.to_dict()
+
+
+def test_to_dict_should_not_copy_nested_fields():
+    record = TestLogRecordWithPopulatedFields()
+    assert record.to_dict()["dict_field"] is record.dict_field
+
+
+def test_to_extra_should_nest_the_dict_under_the_key():
+    record = TestLogRecordWithPopulatedFields(list_field=[])
+
+    assert record.to_extra() == {"http": record.to_dict()}
+    assert record.to_extra("custom") == {"custom": record.to_dict()}
+
+
+def test_to_dict_should_convert_nested_dataclasses():
+    record = TestLogRecordWithPopulatedFields(
+        none_field=NestedRecord("a"),
+        dict_field={"nested": NestedRecord("b")},
+        list_field=[NestedRecord("c"), 1],
+    )
+
+    serialized = record.to_dict()
+
+    assert serialized["none_field"] == {"name": "a"}
+    assert serialized["dict_field"] == {"nested": {"name": "b"}}
+    assert serialized["list_field"] == [{"name": "c"}, 1]
+    assert isinstance(record.dict_field["nested"], NestedRecord)
+
+
+def test_http_log_record_keeps_its_fields_in_slots():
+    record = HttpLogRecord(request_method="GET")
+    record.request_method = "POST"
+
+    assert "request_method" in HttpLogRecord.__slots__
+    assert record.__dict__ == {}
+    assert record.to_dict() == {"request_method": "POST"}
+
+
+def test_http_log_record_accepts_undeclared_attributes():
+    record = HttpLogRecord(request_method="GET")
+
+    record.undeclared_field = "value"
+
+    assert record.undeclared_field == "value"
+    assert record.to_dict() == {"request_method": "GET"}
+
+
+@dataclass
+class NestedRecord:
+    name: str
+
+
 @dataclass
 class TestLogRecordWithEmptyFields(BaseLogRecord):
     int_field: int = 0
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+
+import pytest
+from requests import ConnectionError, PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import logging_http_client
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client import LoggingHttpClient, RequestSpec
+from logging_http_client.http_batch import batch_adapters, _percentile
+
+
+class DelayAdapter(HTTPAdapter):
+    """
+    Answers every request after the delay (in seconds) given by its "delay" query param,
+    with the status given by its "status" query param, and tracks the requests in flight.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def send(self, request: PreparedRequest, **kwargs):
+        params = dict(p.split("=") for p in request.url.split("?", 1)[1].split("&")) if "?" in request.url else {}
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(float(params.get("delay", 0)))
+            if "fail" in params:
+                raise ConnectionError("refused")
+            response = Response()
+            response.status_code = int(params.get("status", 200))
+            response._content = b""
+            response.headers = CaseInsensitiveDict()
+            response.request = request
+            response.url = request.url
+            return response
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def given_client(adapter, reusable_session=True):
+    client = logging_http_client.create(logger=logging.getLogger("test"), reusable_session=reusable_session)
+    client.session.mount("http://", adapter)
+    return client
+
+
+def test_gather_returns_the_results_in_the_batch_order():
+    client = given_client(DelayAdapter())
+    specs = [f"http://example.com/{i}?delay={0.02 * (5 - i)}" for i in range(5)]
+
+    results = client.gather(specs, max_concurrency=5)
+
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.response.url for r in results] == specs
+    assert all(r.ok for r in results)
+
+
+def test_map_yields_the_results_as_they_complete():
+    client = given_client(DelayAdapter())
+    specs = ["http://example.com/slow?delay=0.2", "http://example.com/fast?delay=0"]
+
+    results = list(client.map(specs, max_concurrency=2, as_completed=True))
+
+    assert [r.index for r in results] == [1, 0]
+
+
+def test_map_bounds_the_requests_in_flight():
+    adapter = DelayAdapter()
+    client = given_client(adapter)
+
+    results = client.gather([f"http://example.com/{i}?delay=0.01" for i in range(20)], max_concurrency=4)
+
+    assert len(results) == 20
+    assert 1 < adapter.max_in_flight <= 4
+
+
+def test_map_sends_the_request_specs():
+    requests = []
+    config.set_request_logging_hooks([lambda _, request: requests.append(request)])
+    client = given_client(DelayAdapter())
+
+    client.gather([RequestSpec("POST", "http://example.com/items", {"json": {"id": 1}})])
+
+    assert requests[0].method == "POST"
+    assert requests[0].body == b'{"id": 1}'
+
+
+def test_map_holds_the_exceptions_in_the_results():
+    client = given_client(DelayAdapter())
+
+    ok, failed = client.gather(["http://example.com/ok", "http://example.com/ko?fail=1"])
+
+    assert ok.ok and ok.result() is ok.response
+    assert not failed.ok and failed.response is None
+    with pytest.raises(ConnectionError):
+        failed.result()
+
+
+def test_map_logs_every_exchange_and_a_batch_summary(caplog):
+    caplog.set_level(logging.INFO, logger="test")
+    client = given_client(DelayAdapter())
+
+    client.gather(
+        ["http://example.com/1", "http://example.com/2?status=503", "http://example.com/3?fail=1"],
+        max_concurrency=1,
+    )
+
+    messages = [r.msg for r in caplog.records]
+    assert messages.count("REQUEST") == 3
+    assert messages.count("RESPONSE") == 2
+    summary = caplog.records[-1]
+    assert summary.msg == "BATCH"
+    assert summary.http["batch_size"] == 3
+    assert summary.http["batch_errors"] == 2
+    assert summary.http["batch_max_concurrency"] == 1
+
+
+def test_map_closes_disposable_sessions(mocker):
+    client = logging_http_client.create(reusable_session=False)
+    session = client.session
+    session.mount("http://", DelayAdapter())
+    mocker.patch.object(LoggingHttpClient, "session", new_callable=mocker.PropertyMock, return_value=session)
+    close = mocker.spy(session, "close")
+
+    results = client.gather(["http://example.com/1"])
+
+    assert results[0].ok
+    close.assert_called_once()
+
+
+def test_map_rejects_unsupported_specs():
+    with pytest.raises(TypeError):
+        given_client(DelayAdapter()).gather([42])
+
+
+def test_map_rejects_non_positive_concurrency_on_the_call():
+    with pytest.raises(ValueError):
+        given_client(DelayAdapter()).map(["http://example.com"], max_concurrency=0)
+
+
+def test_batch_adapters_have_pools_matching_the_concurrency():
+    client = logging_http_client.create()
+    adapter = client.session.get_adapter("https://example.com")
+
+    replacements = batch_adapters(client.session, 64)
+
+    assert replacements[adapter] is not adapter
+    assert replacements[adapter].poolmanager.connection_pool_kw["maxsize"] == 64
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 10
+    assert batch_adapters(client.session, 8) == {}
+
+
+def test_map_leaves_the_mounted_adapters_to_the_other_threads():
+    adapter = DelayAdapter()
+    client = given_client(adapter)
+    original_manager = adapter.poolmanager
+    senders = []
+    send_response = adapter.send
+
+    def send(request, **kwargs):
+        senders.append(client.session.get_adapter(request.url))
+        return send_response(request, **kwargs)
+
+    adapter.send = send
+
+    results = client.gather([f"http://example.com/{i}" for i in range(3)], max_concurrency=16)
+
+    assert all(r.ok for r in results)
+    # The batch requests were sent with a copy of the adapter, with pools of its own.
+    assert senders and all(sender is not adapter for sender in senders)
+    assert client.session.get_adapter("http://example.com") is adapter
+    assert adapter.poolmanager is original_manager
+    assert adapter._pool_maxsize == 10
+
+
+def test_map_closes_the_batch_adapters_once_done(mocker):
+    client = given_client(DelayAdapter())
+    close = mocker.patch.object(DelayAdapter, "close")
+
+    client.gather(["http://example.com/1"], max_concurrency=16)
+
+    close.assert_called_once()
+
+
+def test_percentile_uses_the_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert _percentile(values, 50) == 50.0
+    assert _percentile(values, 99) == 99.0
+    assert _percentile([], 99) == 0.0
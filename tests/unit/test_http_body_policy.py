@@ -0,0 +1,206 @@
+from datetime import timedelta
+
+import pytest
+from requests import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+
+from logging_http_client.http_body_policy import BINARY_CONTENT_TYPES, BodyCapturePolicy, body_length
+from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.logging_http_client_config import (
+    enable_request_body_logging,
+    enable_response_body_logging,
+    set_request_body_capture_policy,
+    set_response_body_capture_policy,
+)
+
+
+def given_request(body, content_type="application/json"):
+    request = PreparedRequest()
+    request.method = "POST"
+    request.url = "http://example.com/api"
+    request.headers = CaseInsensitiveDict({"Content-Type": content_type})
+    request.body = body
+    return request
+
+
+def given_response(content, content_type="application/json"):
+    response = Response()
+    response.status_code = 200
+    response._content = content
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+    response.request = given_request(None)
+    response.elapsed = timedelta(microseconds=0)
+    return response
+
+
+# Tests for content type policies ===========================================================================
+
+
+@pytest.mark.parametrize(
+    "content_type, expected",
+    [
+        ("application/json", True),
+        ("text/plain; charset=utf-8", True),
+        (None, True),
+        ("image/png", False),
+        ("IMAGE/PNG", False),
+        ("application/octet-stream", False),
+    ],
+)
+def test_binary_content_types_are_skipped_once_denied(content_type, expected):
+    assert BodyCapturePolicy(denied_content_types=BINARY_CONTENT_TYPES).is_capturable(content_type) == expected
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "image/png", "application/octet-stream", None])
+def test_default_policy_logs_every_content_type(content_type):
+    assert BodyCapturePolicy().is_capturable(content_type)
+
+
+def test_default_policy_never_truncates():
+    captured = BodyCapturePolicy().capture(b"x" * 1_000_000)
+    assert captured.truncated == 0 and len(captured.text) == 1_000_000
+
+
+def test_allowed_content_types_restrict_the_captured_bodies():
+    policy = BodyCapturePolicy(allowed_content_types=("application/json", "text/*"))
+
+    assert policy.is_capturable("application/json; charset=utf-8")
+    assert policy.is_capturable("text/html")
+    assert not policy.is_capturable("application/xml")
+    assert not policy.is_capturable(None)
+
+
+def test_denied_content_types_win_over_allowed_ones():
+    policy = BodyCapturePolicy(allowed_content_types=("text/*",), denied_content_types=("text/csv",))
+
+    assert policy.is_capturable("text/plain")
+    assert not policy.is_capturable("text/csv")
+
+
+# Tests for truncation ======================================================================================
+
+
+def test_body_within_the_limit_is_not_truncated():
+    captured = BodyCapturePolicy(max_bytes=10).capture(b"0123456789")
+    assert captured == ("0123456789", 10, 0)
+
+
+def test_body_over_the_limit_keeps_head_and_tail():
+    captured = BodyCapturePolicy(max_bytes=6, tail_bytes=2).capture(b"0123456789")
+
+    assert captured.text == "0123...[truncated 4 bytes]...89"
+    assert captured.length == 10
+    assert captured.truncated == 4
+
+
+def test_partially_captured_body_keeps_only_its_head():
+    captured = BodyCapturePolicy(max_bytes=4, tail_bytes=2).capture(b"012345", total_length=100)
+
+    assert captured.text == "0123...[truncated 96 bytes]..."
+    assert captured.length == 100
+
+
+def test_text_bodies_are_measured_and_truncated_in_bytes():
+    captured = BodyCapturePolicy(max_bytes=5, tail_bytes=1).capture("ééééh")
+
+    assert captured.length == 9
+    assert captured.truncated == 4
+    assert captured.text == "éé...[truncated 4 bytes]...h"
+
+
+def test_text_bodies_are_encoded_with_their_declared_charset():
+    captured = BodyCapturePolicy().capture("café", "text/plain; charset=ISO-8859-1")
+    assert captured == ("café", 4, 0)
+
+
+def test_unlimited_policy_never_truncates():
+    captured = BodyCapturePolicy(max_bytes=None).capture(b"x" * 100_000)
+    assert captured.truncated == 0
+
+
+# Tests for decoding ========================================================================================
+
+
+def test_body_is_decoded_with_its_declared_charset():
+    captured = BodyCapturePolicy().capture("café".encode("latin-1"), "text/plain; charset=ISO-8859-1")
+    assert captured.text == "café"
+
+
+def test_unknown_charset_falls_back_to_the_default_charset():
+    captured = BodyCapturePolicy().capture("café".encode(), "text/plain; charset=not-a-charset")
+    assert captured.text == "café"
+
+
+def test_binary_body_never_raises():
+    captured = BodyCapturePolicy().capture(b"\xff\xfe\x00\x81")
+    assert captured.length == 4
+
+
+def test_truncating_inside_a_multibyte_character_never_raises():
+    captured = BodyCapturePolicy(max_bytes=3, tail_bytes=0).capture("ééé".encode())
+    assert captured.text.startswith("é")
+
+
+def test_body_length_of_streamed_bodies_is_unknown():
+    assert body_length(iter([b"chunk"])) is None
+    assert body_length(b"chunk") == 5
+
+
+def test_body_length_of_text_bodies_is_in_bytes():
+    assert body_length("chunk") == 5
+    assert body_length("café") == 5
+
+
+# Tests for the log records =================================================================================
+
+
+def test_request_body_length_is_recorded_even_when_body_logging_is_disabled():
+    result = HttpLogRecord.from_request(given_request(b"0123456789"))["http"]
+
+    assert result["request_body_length"] == 10
+    assert "request_body" not in result
+
+
+def test_request_body_is_truncated_by_the_request_policy():
+    enable_request_body_logging()
+    set_request_body_capture_policy(BodyCapturePolicy(max_bytes=4, tail_bytes=2))
+
+    result = HttpLogRecord.from_request(given_request(b"0123456789"))["http"]
+
+    assert result["request_body"] == "01...[truncated 6 bytes]...89"
+
+
+def test_denied_request_body_is_not_logged_but_its_length_is():
+    enable_request_body_logging()
+    set_request_body_capture_policy(BodyCapturePolicy(denied_content_types=BINARY_CONTENT_TYPES))
+
+    result = HttpLogRecord.from_request(given_request(b"\x89PNG", content_type="image/png"))["http"]
+
+    assert result["request_body_length"] == 4
+    assert "request_body" not in result
+
+
+def test_response_body_length_is_recorded_even_when_body_logging_is_disabled():
+    result = HttpLogRecord.from_response(given_response(b"0123456789"))["http"]
+
+    assert result["response_body_length"] == 10
+    assert "response_body" not in result
+
+
+def test_response_body_is_truncated_by_the_response_policy():
+    enable_response_body_logging()
+    set_response_body_capture_policy(BodyCapturePolicy(max_bytes=4, tail_bytes=2))
+
+    result = HttpLogRecord.from_response(given_response(b"0123456789"))["http"]
+
+    assert result["response_body"] == "01...[truncated 6 bytes]...89"
+
+
+def test_denied_response_body_is_not_logged_but_its_length_is():
+    enable_response_body_logging()
+    set_response_body_capture_policy(BodyCapturePolicy(denied_content_types=BINARY_CONTENT_TYPES))
+
+    result = HttpLogRecord.from_response(given_response(b"PK\x03\x04", content_type="application/zip"))["http"]
+
+    assert result["response_body_length"] == 4
+    assert "response_body" not in result
@@ -0,0 +1,162 @@
+import gc
+import json
+import logging
+import os
+import threading
+import warnings
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from requests import Session
+
+import logging_http_client
+from logging_http_client import CounterRequestIdGenerator, LogEmissionPipeline, SessionPool, UlidRequestIdGenerator
+from logging_http_client import http_fork_safety
+
+
+class PortHandler(BaseHTTPRequestHandler):
+    """
+    Answers with the client port of the connection.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = str(self.client_address[1]).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("localhost", 0), PortHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def in_child_process(fn):
+    # Runs the function in a forked child, and returns its (JSON) result.
+    read_end, write_end = os.pipe()
+    with warnings.catch_warnings():
+        # Forking a multi-threaded process is deprecated, as the locks held by the other threads are inherited.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.write(write_end, json.dumps(fn()).encode())
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        result = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    return json.loads(result)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork")
+def test_children_open_their_own_connections(server_url):
+    client = logging_http_client.create()
+    parent_port = client.get(f"{server_url}/port").text
+
+    child_ports = in_child_process(lambda: [client.get(f"{server_url}/port").text for _ in range(2)])
+
+    assert child_ports[0] != parent_port
+    assert child_ports[0] == child_ports[1]
+    assert client.get(f"{server_url}/port").text == parent_port
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork")
+def test_pooled_sessions_open_their_own_connections(server_url):
+    client = logging_http_client.create(session_pool_size=2)
+    parent_port = client.get(f"{server_url}/port").text
+
+    child_port = in_child_process(lambda: client.get(f"{server_url}/port").text)
+
+    assert child_port != parent_port
+    assert client.get(f"{server_url}/port").text == parent_port
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork")
+def test_request_id_generators_are_reseeded_in_children():
+    ulid, counter = UlidRequestIdGenerator(), CounterRequestIdGenerator()
+    ulid(), counter()
+
+    child_ids = in_child_process(lambda: [ulid(), counter()])
+
+    # The random part of the ULIDs, and the prefix of the counter IDs.
+    assert child_ids[0][10:] != ulid()[10:]
+    assert child_ids[1].split("-")[0] != counter().split("-")[0]
+
+
+def test_session_pool_forgets_the_sessions_checked_out_when_forking(mocker):
+    pool = SessionPool(Session, max_size=2)
+    with pool.session(), pool.session():
+        pass
+
+    with pool.session() as session:
+        close = mocker.patch.object(session, "close")
+        pool._after_fork_in_child()
+        assert pool.stats()["in_use"] == 0 and pool.stats()["size"] == 1
+
+    close.assert_called_once()
+    assert pool.stats()["size"] == 1 and pool.stats()["idle"] == 1
+
+
+def test_pipeline_restarts_its_worker_in_children(caplog):
+    pipeline = LogEmissionPipeline()
+    pipeline.submit(logging.getLogger("test"), 40, "REQUEST", lambda _: {}, None)
+    pipeline.flush(timeout=1)
+
+    pipeline._after_fork_in_child()
+
+    assert pipeline._worker is None
+    assert pipeline.stats() == {"queued": 0, "emitted": 0, "dropped": 0, "spilled": 0, "failed": 0}
+    pipeline.submit(logging.getLogger("test"), 40, "REQUEST", lambda _: {}, None)
+    assert pipeline.flush(timeout=1)
+    assert pipeline.stats()["emitted"] == 1
+    pipeline.shutdown()
+
+
+def test_a_failing_reset_does_not_stop_the_others(mocker):
+    class Resettable:
+        def __init__(self, fails):
+            self.fails, self.reset = fails, False
+
+        def _after_fork_in_child(self):
+            self.reset = True
+            if self.fails:
+                raise RuntimeError("boom")
+
+    mocker.patch.object(http_fork_safety, "_instances", weakref.WeakSet())
+    instances = [Resettable(fails=True), Resettable(fails=False)]
+    for instance in instances:
+        http_fork_safety.reset_after_fork(instance)
+
+    http_fork_safety._after_fork_in_child()
+
+    assert all(instance.reset for instance in instances)
+
+
+def test_instances_are_not_kept_alive(mocker):
+    mocker.patch.object(http_fork_safety, "_instances", weakref.WeakSet())
+
+    generator = UlidRequestIdGenerator()
+    assert len(http_fork_safety._instances) == 1
+    del generator
+    gc.collect()
+
+    assert len(http_fork_safety._instances) == 0
@@ -1,6 +1,6 @@
 import time
 
-from logging_http_client.http_headers import with_source_header
+from logging_http_client.http_headers import missing_observability_headers, with_source_header
 
 
 def test_with_source_header():
@@ -12,3 +12,24 @@ def test_with_source_header():
 
     # Then
     assert {"x-source": source} == result
+
+
+def test_missing_observability_headers_adds_the_missing_headers():
+    # When
+    result = missing_observability_headers({}, "test-source", lambda: "req-001", lambda: "correlation-001")
+
+    # Then
+    assert result["x-source"] == "test-source"
+    assert result["x-correlation-id"] == "correlation-001"
+    assert result["x-request-id"] == "req-001"
+
+
+def test_missing_observability_headers_keeps_the_existing_headers():
+    # Given
+    headers = {"x-request-id": "req-001", "x-source": "other", "x-correlation-id": "correlation-002"}
+
+    # When
+    result = missing_observability_headers(headers, "test-source", lambda: "req-002", lambda: "correlation-001")
+
+    # Then
+    assert {} == result
@@ -1,8 +1,13 @@
+from datetime import timedelta
+
 import pytest
 from requests import PreparedRequest, Response
 from requests.structures import CaseInsensitiveDict
 
 from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.http_snapshot import HttpResponseSnapshot
+from logging_http_client.http_timing import ExchangeDurations
+from logging_http_client.logging_http_client_config import enable_request_body_logging, enable_response_body_logging
 
 
 def given_request(
@@ -31,7 +36,7 @@ def given_response(
     response = Response()
     response.status_code = status_code
     response._content = content
-    response.elapsed = type("Elapsed", (object,), {"microseconds": elapsed_microseconds})()
+    response.elapsed = timedelta(microseconds=elapsed_microseconds)
     response.headers = CaseInsensitiveDict(headers or {})
     response.request = request or given_request()
     return response
@@ -40,31 +45,27 @@ def given_response(
 # from_request ====================================================================================
 
 
-def test_from_request_processor_with_body_logging_disabled(mocker):
+def test_from_request_processor_with_body_logging_disabled():
     request = given_request(body="This should not be logged")
 
-    mocker.patch(
-        "logging_http_client.logging_http_client_config_globals.is_request_body_logging_enabled", return_value=False
-    )
+    enable_request_body_logging(False)
 
     result = HttpLogRecord.from_request(request)["http"]
     assert "request_body" not in result
 
 
-def test_from_request_with_request_body_logging_enabled(mocker):
+def test_from_request_with_request_body_logging_enabled():
     request = given_request(
         body="This should be logged",
     )
 
-    mocker.patch(
-        "logging_http_client.logging_http_client_config_globals.is_request_body_logging_enabled", return_value=True
-    )
+    enable_request_body_logging(True)
 
     result = HttpLogRecord.from_request(request)["http"]
     assert result["request_body"] == "This should be logged"
 
 
-def test_from_request_with_complete_request(mocker):
+def test_from_request_with_complete_request():
     request = given_request(
         method="POST",
         url="http://example.com/api",
@@ -73,9 +74,7 @@ def test_from_request_with_complete_request(mocker):
         params={"param1": "value1"},
     )
 
-    mocker.patch(
-        "logging_http_client.logging_http_client_config_globals.is_request_body_logging_enabled", return_value=True
-    )
+    enable_request_body_logging(True)
 
     result = HttpLogRecord.from_request(request)["http"]
     expected = {
@@ -85,6 +84,7 @@ def test_from_request_with_complete_request(mocker):
         "request_url": "http://example.com/api",
         "request_headers": {"X-Request-Id": "req-005", "X-Source": "Test"},
         "request_body": "This should be logged",
+        "request_body_length": 21,
         "request_query_params": {"param1": "value1"},
     }
     assert result == expected
@@ -93,31 +93,25 @@ def test_from_request_with_complete_request(mocker):
 # Tests for from_response ===================================================================================
 
 
-def test_from_response_with_body_logging_disabled(mocker):
+def test_from_response_with_body_logging_disabled():
     response = given_response(content=b"This should not be logged")
 
-    mocker.patch(
-        "logging_http_client.logging_http_client_config_globals.is_response_body_logging_enabled",
-        return_value=False,
-    )
+    enable_response_body_logging(False)
 
     result = HttpLogRecord.from_response(response)["http"]
     assert "response_body" not in result
 
 
-def test_from_response_with_body_logging_enabled(mocker):
+def test_from_response_with_body_logging_enabled():
     response = given_response(content=b"This should be logged")
 
-    mocker.patch(
-        "logging_http_client.logging_http_client_config_globals.is_response_body_logging_enabled",
-        return_value=True,
-    )
+    enable_response_body_logging(True)
 
     result = HttpLogRecord.from_response(response)["http"]
     assert result["response_body"] == "This should be logged"
 
 
-def test_from_response_with_complete_response(mocker):
+def test_from_response_with_complete_response():
     request = given_request(
         method="POST",
         url="http://example.com/api",
@@ -133,10 +127,7 @@ def test_from_response_with_complete_response(mocker):
         elapsed_microseconds=125000,  # 125 ms
     )
 
-    mocker.patch(
-        "logging_http_client.logging_http_client_config_globals.is_response_body_logging_enabled",
-        return_value=True,
-    )
+    enable_response_body_logging(True)
 
     result = HttpLogRecord.from_response(response)["http"]
     expected = {
@@ -145,7 +136,9 @@ def test_from_response_with_complete_response(mocker):
         "response_status": 201,
         "response_headers": {"Content-Type": "application/json", "X-Source": "ResponseSource"},
         "response_duration_ms": 125,
+        "response_headers_ms": 125.0,
         "response_body": "Response body here",
+        "response_body_length": 18,
     }
 
     assert result == expected
@@ -168,3 +161,24 @@ def test_from_response_without_source_header_should_fallback_to_request_url_host
 
     result = HttpLogRecord.from_response(response)["http"]
     assert result["response_source"] == expected_response_source
+
+
+def test_from_response_keeps_the_whole_seconds_of_the_duration():
+    response = given_response(elapsed_microseconds=2_300_000)  # 2.3 s
+
+    result = HttpLogRecord.from_response(response)["http"]
+
+    assert result["response_duration_ms"] == 2300
+    assert result["response_headers_ms"] == 2300.0
+
+
+def test_from_response_with_the_exchange_durations():
+    durations = ExchangeDurations(headers_ms=1520.25, total_ms=1830.5, logging_overhead_ms=0.125, redirects=1)
+
+    result = HttpLogRecord.from_response(HttpResponseSnapshot(given_response(), durations=durations))["http"]
+
+    assert result["response_duration_ms"] == 1520
+    assert result["response_headers_ms"] == 1520.25
+    assert result["response_total_ms"] == 1830.5
+    assert result["logging_overhead_ms"] == 0.125
+    assert result["redirect_count"] == 1
@@ -0,0 +1,117 @@
+import re
+import threading
+import time
+
+import pytest
+import requests
+
+import logging_http_client
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_request_id import (
+    CounterRequestIdGenerator,
+    UlidRequestIdGenerator,
+    uuid4_request_id,
+)
+
+CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def decode_ulid_timestamp(ulid: str) -> int:
+    value = 0
+    for char in ulid:
+        value = value * 32 + CROCKFORD_BASE32.index(char)
+    return value >> 80
+
+
+def test_uuid4_request_id_is_a_random_uuid():
+    assert re.fullmatch(r"[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}", uuid4_request_id())
+
+
+def test_ulid_request_ids_are_26_crockford_base32_characters():
+    generator = UlidRequestIdGenerator()
+
+    ulid = generator()
+
+    assert len(ulid) == 26
+    assert set(ulid) <= set(CROCKFORD_BASE32)
+
+
+def test_ulid_request_ids_embed_their_creation_time():
+    before = time.time_ns() // 1_000_000
+    ulid = UlidRequestIdGenerator()()
+    after = time.time_ns() // 1_000_000
+
+    assert before <= decode_ulid_timestamp(ulid) <= after
+
+
+def test_ulid_request_ids_are_unique_across_pool_refills():
+    generator = UlidRequestIdGenerator(pool_size=2)
+
+    ids = [generator() for _ in range(1_000)]
+
+    assert len(set(ids)) == 1_000
+
+
+def test_ulid_request_ids_are_unique_across_threads():
+    generator = UlidRequestIdGenerator()
+    ids = []
+
+    def generate():
+        ids.extend(generator() for _ in range(500))
+
+    threads = [threading.Thread(target=generate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(ids)) == 2_000
+
+
+def test_ulid_request_id_generator_rejects_small_pools():
+    with pytest.raises(ValueError):
+        UlidRequestIdGenerator(pool_size=0)
+
+
+def test_counter_request_ids_share_a_random_prefix():
+    generator = CounterRequestIdGenerator()
+
+    first, second = generator(), generator()
+
+    assert re.fullmatch(r"[0-9a-f]{12}-1", first)
+    assert second == first[:-1] + "2"
+
+
+def test_counter_request_ids_use_the_given_prefix():
+    generator = CounterRequestIdGenerator(prefix="host-42")
+
+    assert [generator() for _ in range(17)][-1] == "host-42-11"
+
+
+def test_counter_request_id_generator_reseed_changes_the_random_prefix():
+    generator = CounterRequestIdGenerator()
+    first = generator()
+
+    generator.reseed()
+
+    assert generator() != first
+
+
+def test_default_request_id_provider_is_uuid4():
+    assert config.get_request_id_provider() is uuid4_request_id
+
+
+def test_reset_request_id_provider_restores_the_default():
+    logging_http_client.set_request_id_provider(CounterRequestIdGenerator())
+    logging_http_client.set_request_id_provider(None)
+
+    assert config.get_request_id_provider() is uuid4_request_id
+
+
+def test_session_uses_the_request_id_provider():
+    logging_http_client.set_request_id_provider(CounterRequestIdGenerator(prefix="test"))
+    session = logging_http_client.create().session
+
+    prepared = session.prepare_request(requests.Request("GET", "http://example.com"))
+
+    assert prepared.headers["x-request-id"] == "test-1"
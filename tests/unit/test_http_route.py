@@ -0,0 +1,102 @@
+import logging
+
+import pytest
+from requests import PreparedRequest
+
+from logging_http_client import MetricsRecorder, NormalizedUrl, RouteNormalizer, RouteRateSampler, SeriesKey
+from logging_http_client.logging_http_client_config import set_route_normalizer
+
+
+def given_request(url):
+    request = PreparedRequest()
+    request.prepare(method="GET", url=url)
+    return request
+
+
+# Tests for RouteNormalizer ==================================================================================
+
+
+@pytest.mark.parametrize(
+    "url, expected_route",
+    [
+        ("http://example.com/users/8123/orders/55", "/users/{id}/orders/{id}"),
+        ("http://example.com/items/0b9a3c1e-5d2f-4a6b-9c8d-7e6f5a4b3c2d", "/items/{uuid}"),
+        ("http://example.com/commits/4f1c2a9be07d6e3b5a8c", "/commits/{hash}"),
+        ("http://example.com/users/me?page=2#top", "/users/me"),
+        ("http://example.com/v2/health", "/v2/health"),
+        ("http://example.com", "/"),
+    ],
+)
+def test_normalizer_detects_the_id_like_segments(url, expected_route):
+    assert RouteNormalizer().normalize(url) == NormalizedUrl("example.com", expected_route)
+
+
+def test_normalizer_matches_the_templates_first():
+    normalizer = RouteNormalizer(["/users/{user_id}/orders/{order_id}", "/users/{name}"])
+
+    assert normalizer.normalize("http://example.com/users/8123/orders/55").route == "/users/{user_id}/orders/{order_id}"
+    assert normalizer.normalize("http://example.com/users/alice").route == "/users/{name}"
+    assert normalizer.normalize("http://example.com/teams/7").route == "/teams/{id}"
+
+
+def test_normalizer_without_id_detection():
+    normalizer = RouteNormalizer(["/users/{id}"], detect_ids=False)
+
+    assert normalizer.normalize("http://example.com/users/1").route == "/users/{id}"
+    assert normalizer.normalize("http://example.com/teams/7").route == "/teams/7"
+
+
+def test_normalizer_rejects_relative_templates():
+    with pytest.raises(ValueError):
+        RouteNormalizer(["users/{id}"])
+
+
+def test_normalizer_caches_the_urls_in_a_bounded_lru():
+    normalizer = RouteNormalizer(cache_size=2)
+
+    for url in ["http://example.com/a", "http://example.com/a?page=2", "http://example.com/b", "http://example.com/c"]:
+        normalizer.normalize(url)
+
+    info = normalizer.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 2)
+
+
+def test_normalizer_route_of_a_request():
+    recorder = MetricsRecorder(route=RouteNormalizer().route)
+
+    recorder.record(given_request("http://example.com/users/1"), 200, 1_000)
+    recorder.record(given_request("http://example.com/users/2"), 200, 1_000)
+
+    assert recorder.snapshot()[SeriesKey("example.com", "GET", "/users/{id}", "2xx")].count == 2
+
+
+def test_route_sampler_matches_the_route_templates():
+    sampler = RouteRateSampler({"example.com/users/{id}": 0.0}, normalizer=RouteNormalizer())
+
+    assert sampler.rate_for(given_request("http://example.com/users/42")) == 0.0
+    assert sampler.rate_for(given_request("http://example.com/users/me")) == 1.0
+
+
+# Tests for the log records ==================================================================================
+
+
+def test_log_records_have_the_request_route(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    set_route_normalizer(RouteNormalizer())
+    client = given_client()
+
+    client.get("http://example.com:8080/users/42?verbose=1")
+
+    request_record, response_record = caplog.records
+    assert request_record.http["request_route"] == "/users/{id}"
+    assert response_record.http["request_route"] == "/users/{id}"
+    assert response_record.http["response_source"] == "example.com:8080"
+
+
+def test_log_records_have_no_route_without_a_normalizer(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    client = given_client()
+
+    client.get("http://example.com/users/42")
+
+    assert all("request_route" not in record.http for record in caplog.records)
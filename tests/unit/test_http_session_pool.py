@@ -0,0 +1,245 @@
+import contextlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from requests import Session
+
+import logging_http_client
+from logging_http_client import SessionPool, SessionPoolTimeout
+
+
+class ConnectionHandler(BaseHTTPRequestHandler):
+    """
+    Answers with the client port of the connection, and with the cookie of the request, if any.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.1)
+        body = f"{self.client_address[1]} {self.headers.get('Cookie', '')}".strip().encode()
+        self.send_response(200)
+        if self.path == "/login":
+            self.send_header("Set-Cookie", "token=secret")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("localhost", 0), ConnectionHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_the_warmest_session_is_checked_out_first():
+    pool = SessionPool(Session, max_size=2)
+
+    with pool.session() as first:
+        with pool.session() as second:
+            pass
+
+    with pool.session() as session:
+        assert session is first
+    assert second is not first
+    assert pool.stats()["size"] == 2
+
+
+def test_sessions_are_created_on_demand():
+    pool = SessionPool(Session, max_size=4)
+
+    for _ in range(3):
+        with pool.session():
+            pass
+
+    assert pool.stats() == {
+        "max_size": 4,
+        "size": 1,
+        "idle": 1,
+        "in_use": 0,
+        "checkouts": 3,
+        "waits": 0,
+        "timeouts": 0,
+        "wait_ms_total": 0.0,
+        "wait_ms_max": 0.0,
+    }
+
+
+def test_a_full_pool_waits_for_a_checkin():
+    pool = SessionPool(Session, max_size=1)
+    checked_out = threading.Event()
+
+    def hold_the_session():
+        with pool.session():
+            checked_out.set()
+            time.sleep(0.05)
+
+    holder = threading.Thread(target=hold_the_session)
+    holder.start()
+    checked_out.wait()
+    with pool.session():
+        stats = pool.stats()
+    holder.join()
+
+    assert stats["size"] == 1 and stats["in_use"] == 1
+    assert stats["waits"] == 1 and stats["wait_ms_max"] >= 25
+
+
+def test_a_full_pool_times_out():
+    pool = SessionPool(Session, max_size=1, timeout=0.01)
+
+    with pool.session():
+        with pytest.raises(SessionPoolTimeout):
+            with pool.session():
+                pass
+
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_failed_session_creations_free_their_slot():
+    factory_calls = []
+
+    def factory():
+        factory_calls.append(1)
+        if len(factory_calls) == 1:
+            raise RuntimeError("boom")
+        return Session()
+
+    pool = SessionPool(factory, max_size=1, timeout=0.01)
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            pass
+
+    with pool.session():
+        assert pool.stats()["size"] == 1
+
+
+def test_clear_replaces_the_sessions():
+    pool = SessionPool(Session, max_size=2)
+    with pool.session() as idle:
+        pass
+
+    with pool.session() as in_use:
+        pool.clear()
+    with pool.session() as session:
+        pass
+
+    assert idle is in_use
+    assert session is not in_use
+    assert pool.stats()["size"] == 1
+
+
+def test_closed_pool_refuses_checkouts():
+    pool = SessionPool(Session)
+    pool.close()
+
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            pass
+
+
+def test_invalid_max_size():
+    with pytest.raises(ValueError):
+        SessionPool(Session, max_size=0)
+
+
+# Tests for the pooled clients =============================================================================
+
+
+def test_pooled_client_reuses_its_connections(server_url):
+    client = logging_http_client.create(session_pool_size=2)
+
+    ports = {client.get(f"{server_url}/port").text for _ in range(3)}
+
+    assert len(ports) == 1
+    assert client.session_pool.stats()["checkouts"] == 3
+
+
+def test_disposable_sessions_open_a_connection_per_request(server_url):
+    client = logging_http_client.create(reusable_session=False)
+
+    ports = {client.get(f"{server_url}/port").text for _ in range(3)}
+
+    assert len(ports) == 3
+    assert client.session_pool is None
+
+
+def test_pooled_client_isolates_the_concurrent_requests(server_url):
+    client = logging_http_client.create(session_pool_size=4)
+    threads = [threading.Thread(target=client.get, args=(f"{server_url}/slow",)) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = client.session_pool.stats()
+    assert stats["size"] == 4 and stats["idle"] == 4 and stats["waits"] == 0
+
+
+def test_pooled_client_sessions_keep_their_own_cookies(server_url):
+    client = logging_http_client.create(session_pool_size=2)
+    pool = client.session_pool
+
+    with pool.session() as first, pool.session():
+        first.get(f"{server_url}/login")
+
+    with pool.session() as warmest, pool.session() as other:
+        assert warmest.get(f"{server_url}/port").text.endswith("token=secret")
+        assert "token" not in other.get(f"{server_url}/port").text
+
+
+def test_pooled_client_applies_the_new_shared_headers(server_url):
+    client = logging_http_client.create(session_pool_size=1, shared_headers={"x-foo": "bar"})
+    client.get(f"{server_url}/port")
+
+    client.shared_headers = {"x-foo": "baz"}
+
+    response = client.get(f"{server_url}/port")
+    assert response.request.headers["x-foo"] == "baz"
+
+
+def test_pooled_client_mounts_the_adapters_on_every_pooled_session(given_adapter):
+    client = logging_http_client.create(session_pool_size=4)
+    adapter = given_adapter()
+    with contextlib.ExitStack() as stack:
+        # The pool is full, with a session checked out while mounting.
+        for _ in range(4):
+            stack.enter_context(client.session_pool.session())
+        client.mount("http://example.com", adapter)
+
+    with contextlib.ExitStack() as stack:
+        sessions = [stack.enter_context(client.session_pool.session()) for _ in range(4)]
+
+        assert all(session.get_adapter("http://example.com/") is adapter for session in sessions)
+    assert client.get("http://example.com/").status_code == 200
+
+
+def test_pooled_client_batches(server_url):
+    client = logging_http_client.create(session_pool_size=1)
+
+    results = client.gather([f"{server_url}/port"] * 3)
+
+    assert [result.response.status_code for result in results] == [200, 200, 200]
+    assert client.session_pool.stats()["checkouts"] == 1
+
+
+def test_closing_a_pooled_client_closes_its_pool(server_url):
+    client = logging_http_client.create(session_pool_size=1)
+    client.get(f"{server_url}/port")
+
+    client.close()
+
+    with pytest.raises(RuntimeError):
+        client.get(f"{server_url}/port")
@@ -0,0 +1,201 @@
+import copy
+
+import pytest
+from requests import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.http_session import LoggingSession
+from logging_http_client.http_snapshot import FrozenHeaders, HttpRequestSnapshot, HttpResponseSnapshot
+from logging_http_client.logging_http_client_config import enable_request_body_logging
+
+
+def given_request(body=b'{"key": "value"}', headers=None):
+    request = PreparedRequest()
+    request.method = "POST"
+    request.url = "http://example.com/api"
+    request.headers = CaseInsensitiveDict(headers or {"X-Request-Id": "req-001", "Content-Type": "application/json"})
+    request.body = body
+    return request
+
+
+def given_response(request=None):
+    response = Response()
+    response.status_code = 200
+    response._content = b"response body"
+    response.headers = CaseInsensitiveDict({"Content-Type": "text/plain"})
+    response.request = request or given_request()
+    return response
+
+
+# Tests for FrozenHeaders ===================================================================================
+
+
+def test_frozen_headers_are_case_insensitive():
+    headers = FrozenHeaders({"Content-Type": "application/json"})
+
+    assert headers["content-type"] == "application/json"
+    assert headers.get("CONTENT-TYPE") == "application/json"
+    assert "content-TYPE" in headers
+
+
+def test_frozen_headers_keep_the_original_key_case():
+    headers = FrozenHeaders({"X-Request-Id": "req-001"})
+    assert dict(headers) == {"X-Request-Id": "req-001"}
+
+
+def test_frozen_headers_cannot_be_mutated():
+    headers = FrozenHeaders({"X-Request-Id": "req-001"})
+
+    with pytest.raises(TypeError):
+        # noinspection PyUnresolvedReferences
+        headers["X-Request-Id"] = "tampered"
+
+
+def test_frozen_headers_do_not_reflect_later_changes_to_the_live_headers():
+    live = CaseInsensitiveDict({"X-Request-Id": "req-001"})
+    headers = FrozenHeaders(live)
+
+    live["X-Request-Id"] = "tampered"
+
+    assert headers["x-request-id"] == "req-001"
+
+
+def test_frozen_headers_copy_is_mutable():
+    headers = FrozenHeaders({"X-Request-Id": "req-001"}).copy()
+    headers["x-request-id"] = "changed"
+    assert headers["X-Request-Id"] == "changed"
+
+
+# Tests for HttpRequestSnapshot =============================================================================
+
+
+def test_request_snapshot_exposes_the_request_attributes():
+    request = given_request()
+    snapshot = HttpRequestSnapshot(request)
+
+    assert snapshot.method == "POST"
+    assert snapshot.url == "http://example.com/api"
+    assert snapshot.headers["x-request-id"] == "req-001"
+    assert snapshot.body is request.body
+    assert snapshot.params == {}
+
+
+def test_request_snapshot_is_read_only():
+    snapshot = HttpRequestSnapshot(given_request())
+
+    with pytest.raises(AttributeError):
+        snapshot.method = "DELETE"
+
+
+def test_request_snapshot_exposes_mutable_bodies_as_read_only_views():
+    body = bytearray(b"payload")
+    snapshot = HttpRequestSnapshot(given_request(body=body))
+
+    assert snapshot.body == b"payload"
+    with pytest.raises(TypeError):
+        snapshot.body[0] = 0
+
+
+def test_request_snapshot_body_view_is_a_zero_copy_memoryview():
+    request = given_request()
+    view = HttpRequestSnapshot(request).body_view
+
+    assert isinstance(view, memoryview)
+    assert view.readonly
+    assert view.obj is request.body
+
+
+def test_request_snapshot_resolves_other_attributes_against_a_private_copy():
+    request = given_request()
+    request.hooks = {"response": []}
+    snapshot = HttpRequestSnapshot(request)
+
+    snapshot.hooks["response"].append("tampered")
+
+    assert request.hooks == {"response": []}
+
+
+def test_request_snapshot_deepcopy_yields_a_mutable_request():
+    request = given_request()
+    mutable = copy.deepcopy(HttpRequestSnapshot(request))
+
+    mutable.headers["X-Request-Id"] = "changed"
+
+    assert isinstance(mutable, PreparedRequest)
+    assert request.headers["X-Request-Id"] == "req-001"
+
+
+def test_request_snapshot_works_with_the_http_log_record():
+    enable_request_body_logging(True)
+
+    result = HttpLogRecord.from_request(HttpRequestSnapshot(given_request()))["http"]
+
+    assert result["request_id"] == "req-001"
+    assert result["request_body"] == '{"key": "value"}'
+    assert result["request_headers"] == {"X-Request-Id": "req-001", "Content-Type": "application/json"}
+
+
+# Tests for HttpResponseSnapshot ============================================================================
+
+
+def test_response_snapshot_exposes_the_response_attributes():
+    response = given_response()
+    snapshot = HttpResponseSnapshot(response)
+
+    assert snapshot.status_code == 200
+    assert snapshot.headers["content-type"] == "text/plain"
+    assert snapshot.content == b"response body"
+    assert snapshot.text == "response body"
+    assert bytes(snapshot.body_view) == b"response body"
+    assert isinstance(snapshot.request, HttpRequestSnapshot)
+    assert snapshot.request.headers["x-request-id"] == "req-001"
+
+
+def test_response_snapshot_is_read_only():
+    snapshot = HttpResponseSnapshot(given_response())
+
+    with pytest.raises(AttributeError):
+        snapshot.status_code = 500
+
+
+# Tests for the session hook runners ========================================================================
+
+
+def test_request_hooks_share_one_snapshot(mocker):
+    received = []
+
+    config.set_request_logging_hooks([lambda _, r: received.append(r), lambda _, r: received.append(r)])
+
+    LoggingSession("TEST", mocker.Mock())._run_logging_request_hooks(given_request())
+
+    assert len(received) == 2
+    assert received[0] is received[1]
+    assert isinstance(received[0], HttpRequestSnapshot)
+
+
+def test_response_hooks_share_one_snapshot(mocker):
+    received = []
+
+    config.set_response_logging_hooks([lambda _, r: received.append(r), lambda _, r: received.append(r)])
+
+    LoggingSession("TEST", mocker.Mock())._run_logging_response_hooks(given_response())
+
+    assert len(received) == 2
+    assert received[0] is received[1]
+    assert isinstance(received[0], HttpResponseSnapshot)
+
+
+def test_request_hooks_cannot_mutate_the_live_request(mocker):
+    def tampering_hook(_, request) -> None:
+        request.headers["X-Request-Id"] = "tampered"
+
+    logger = mocker.Mock()
+    request = given_request()
+    config.set_request_logging_hooks([tampering_hook])
+
+    LoggingSession("TEST", logger)._run_logging_request_hooks(request)
+
+    assert request.headers["X-Request-Id"] == "req-001"
+    logger.exception.assert_called_once()
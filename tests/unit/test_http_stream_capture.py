@@ -0,0 +1,172 @@
+import io
+
+import pytest
+from requests import PreparedRequest
+from requests.adapters import HTTPAdapter
+from requests.exceptions import JSONDecodeError
+from urllib3 import HTTPResponse
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_session import LoggingSession
+from logging_http_client.http_snapshot import HttpResponseSnapshot
+from logging_http_client.http_stream_capture import ResponseStreamCapture
+from logging_http_client.logging_http_client_config import (
+    enable_response_body_logging,
+    set_response_stream_capture_limit,
+)
+
+BODY = b"0123456789" * 10
+
+
+class StreamingAdapter(HTTPAdapter):
+    """
+    Answers every request with the given (not yet read) streamed body.
+    """
+
+    def __init__(self, body=BODY):
+        super().__init__()
+        self.body = body
+
+    def send(self, request: PreparedRequest, **kwargs):
+        raw = HTTPResponse(
+            body=io.BytesIO(self.body),
+            headers={"Content-Type": "text/plain; charset=utf-8"},
+            status=200,
+            preload_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+def given_session(mocker, body=BODY):
+    session = LoggingSession("TEST", mocker.Mock())
+    session.mount("http://", StreamingAdapter(body))
+    return session
+
+
+def given_recording_response_hook():
+    received = []
+    config.set_response_logging_hooks([lambda _, response: received.append(response)])
+    return received
+
+
+# Tests for ResponseStreamCapture ==========================================================================
+
+
+def test_capture_keeps_at_most_max_bytes_and_counts_all_bytes():
+    capture = ResponseStreamCapture(max_bytes=5, on_complete=lambda _: None)
+
+    capture.record(b"abc")
+    capture.record(b"defgh")
+    capture.record(memoryview(b"ij"))
+
+    assert capture.body == b"abcde"
+    assert capture.body_length == 10
+    assert capture.truncated
+
+
+def test_capture_completes_only_once(mocker):
+    on_complete = mocker.Mock()
+    capture = ResponseStreamCapture(max_bytes=5, on_complete=on_complete)
+
+    capture.complete()
+    capture.complete()
+
+    on_complete.assert_called_once_with(capture)
+
+
+# Tests for streamed responses =============================================================================
+
+
+def test_streamed_response_is_not_logged_before_the_stream_is_consumed(mocker):
+    received = given_recording_response_hook()
+
+    response = given_session(mocker).get("http://example.com/export", stream=True)
+
+    assert received == []
+    assert response.raw.capture.body_length == 0
+
+
+def test_streamed_response_is_logged_once_the_stream_is_exhausted(mocker):
+    received = given_recording_response_hook()
+    enable_response_body_logging()
+    set_response_stream_capture_limit(16)
+
+    response = given_session(mocker).get("http://example.com/export", stream=True)
+    chunks = list(response.iter_content(chunk_size=7))
+
+    assert b"".join(chunks) == BODY
+    assert len(received) == 1
+    assert isinstance(received[0], HttpResponseSnapshot)
+    assert received[0].content == BODY[:16]
+    assert received[0].body_length == len(BODY)
+
+
+def test_streamed_response_is_logged_when_closed_early(mocker):
+    received = given_recording_response_hook()
+
+    response = given_session(mocker).get("http://example.com/export", stream=True)
+    next(response.iter_content(chunk_size=10))
+    response.close()
+
+    assert len(received) == 1
+    assert received[0].body_length == 10
+    assert received[0].content == b""
+
+
+def test_streamed_response_content_is_still_available_to_the_caller(mocker):
+    received = given_recording_response_hook()
+
+    response = given_session(mocker).get("http://example.com/export", stream=True)
+
+    assert response.content == BODY
+    assert len(received) == 1
+
+
+def test_streamed_response_text_and_json_are_read_from_the_capture(mocker):
+    received = given_recording_response_hook()
+    enable_response_body_logging()
+
+    response = given_session(mocker, b'{"caf\xc3\xa9": [1, 2]}').get("http://example.com/export", stream=True)
+    list(response.iter_content(chunk_size=7))
+
+    assert received[0].text == '{"café": [1, 2]}'
+    assert received[0].json() == {"café": [1, 2]}
+
+
+def test_truncated_streamed_response_json_raises_a_decode_error(mocker):
+    received = given_recording_response_hook()
+    enable_response_body_logging()
+    set_response_stream_capture_limit(4)
+
+    response = given_session(mocker, b'{"items": []}').get("http://example.com/export", stream=True)
+    list(response.iter_content(chunk_size=7))
+
+    assert received[0].text == '{"it'
+    with pytest.raises(JSONDecodeError):
+        received[0].json()
+
+
+def test_non_streamed_response_is_logged_immediately(mocker):
+    received = given_recording_response_hook()
+
+    given_session(mocker).get("http://example.com/export")
+
+    assert len(received) == 1
+    assert received[0].stream_capture is None
+    assert received[0].content == BODY
+
+
+def test_streamed_response_body_length_is_logged_by_the_default_hook(mocker):
+    session = given_session(mocker)
+
+    response = session.get("http://example.com/export", stream=True)
+    next(response.iter_content(chunk_size=10))
+    response.close()
+
+    extra = session._logger.log.call_args.kwargs["extra"]
+    assert extra["http"]["response_body_length"] == 10
+
+
+def test_stream_capture_limit_must_not_be_negative():
+    with pytest.raises(ValueError):
+        set_response_stream_capture_limit(-1)
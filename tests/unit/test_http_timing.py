@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+import logging_http_client
+from logging_http_client import ConnectionTimings, MetricsRecorder, SeriesKey, TimingHTTPAdapter
+from logging_http_client.logging_http_client_config import enable_connection_timings, set_metrics_recorder
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/items")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = b"response body"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path == "/slow-body":
+            self.wfile.flush()
+            time.sleep(0.05)
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("localhost", 0), OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def given_client():
+    return logging_http_client.create(logger=logging.getLogger("test"))
+
+
+def response_records(caplog):
+    return [r for r in caplog.records if r.msg == "RESPONSE"]
+
+
+def test_timings_of_a_new_connection(server_url):
+    enable_connection_timings()
+
+    response = given_client().get(f"{server_url}/items")
+
+    timings = response.timings
+    assert isinstance(timings, ConnectionTimings)
+    assert not timings.connection_reused
+    assert timings.dns_ms >= 0 and timings.connect_ms >= 0 and timings.ttfb_ms > 0
+    assert timings.download_ms >= 0
+    assert timings.tls_ms is None
+    assert response.text == "response body"
+
+
+def test_timings_of_a_reused_connection(server_url):
+    enable_connection_timings()
+    client = given_client()
+
+    client.get(f"{server_url}/first")
+    timings = client.get(f"{server_url}/second").timings
+
+    assert timings.connection_reused
+    assert timings.dns_ms is None and timings.connect_ms is None
+    assert timings.ttfb_ms > 0
+
+
+def test_timings_of_a_streamed_response(server_url):
+    enable_connection_timings()
+
+    response = given_client().get(f"{server_url}/items", stream=True)
+
+    assert response.timings.ttfb_ms > 0
+    assert response.timings.download_ms is None
+    assert response.text == "response body"
+
+
+def test_no_timings_unless_enabled(server_url):
+    client = given_client()
+
+    response = client.get(f"{server_url}/items")
+
+    assert not isinstance(client.session.get_adapter(server_url), TimingHTTPAdapter)
+    assert getattr(response, "timings", None) is None
+
+
+def test_client_scope_can_enable_the_timings(server_url):
+    client = logging_http_client.create(logging_config={"connection_timings_enabled": True})
+
+    assert client.get(f"{server_url}/items").timings is not None
+
+
+def test_timings_are_logged(server_url, caplog):
+    caplog.set_level(logging.INFO, logger="test")
+    enable_connection_timings()
+    client = given_client()
+
+    client.get(f"{server_url}/first")
+    client.get(f"{server_url}/second")
+
+    first, second = (record.http for record in response_records(caplog))
+    assert first["timing_ttfb_ms"] > 0 and "timing_connect_ms" in first
+    assert "connection_reused" not in first
+    assert second["connection_reused"] is True
+    assert "timing_connect_ms" not in second
+
+
+def test_timings_are_recorded_as_metrics(server_url):
+    recorder = MetricsRecorder()
+    set_metrics_recorder(recorder)
+    enable_connection_timings()
+    client = given_client()
+
+    client.get(f"{server_url}/items")
+    client.get(f"{server_url}/items")
+
+    host = server_url.split("//")[1]
+    phases = {phase: histogram.count for (key, phase), histogram in recorder.phase_snapshot().items()}
+    assert phases == {"dns": 1, "connect": 1, "ttfb": 2, "download": 2}
+    assert {key for key, _ in recorder.phase_snapshot()} == {SeriesKey(host, "GET", "/items", "2xx")}
+
+
+# Tests for the exchange durations ==========================================================================
+
+
+def test_durations_cover_the_body_download(server_url, caplog):
+    caplog.set_level(logging.INFO, logger="test")
+
+    given_client().get(f"{server_url}/slow-body")
+
+    (record,) = response_records(caplog)
+    assert record.http["response_total_ms"] >= 50
+    assert record.http["response_headers_ms"] < record.http["response_total_ms"]
+    assert record.http["response_duration_ms"] == int(record.http["response_headers_ms"])
+    assert record.http["logging_overhead_ms"] > 0
+
+
+def test_durations_of_a_streamed_response_cover_its_consumption(server_url, caplog):
+    caplog.set_level(logging.INFO, logger="test")
+
+    response = given_client().get(f"{server_url}/items", stream=True)
+    time.sleep(0.05)
+    response.close()
+
+    (record,) = response_records(caplog)
+    assert record.http["response_total_ms"] >= 50
+
+
+def test_redirect_hops_are_logged_once_with_the_chain_durations(server_url, caplog):
+    caplog.set_level(logging.INFO, logger="test")
+
+    given_client().get(f"{server_url}/redirect")
+
+    # The hop followed by the redirect completes (and so is logged) first.
+    second, first = response_records(caplog)
+    assert (first.http["response_status"], second.http["response_status"]) == (302, 200)
+    assert first.http["redirect_count"] == 1
+    assert "redirect_count" not in second.http
+    assert first.http["response_headers_ms"] >= second.http["response_headers_ms"]
+    assert first.http["response_total_ms"] >= second.http["response_total_ms"]
+
+
+def test_async_durations_cover_the_body_download(caplog):
+    caplog.set_level(logging.INFO, logger="test")
+
+    async def stream_body():
+        yield b"response "
+        await asyncio.sleep(0.05)
+        yield b"body"
+
+    async def exchange():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=stream_body()))
+        async with logging_http_client.create_async(logger=logging.getLogger("test"), transport=transport) as client:
+            await client.get("http://example.com/items")
+
+    asyncio.run(exchange())
+
+    (record,) = response_records(caplog)
+    assert record.http["response_total_ms"] >= 50
+    assert record.http.get("response_headers_ms", 0) < 50
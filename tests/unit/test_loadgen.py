@@ -0,0 +1,182 @@
+import asyncio
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from logging_http_client import loadgen
+from logging_http_client.loadgen import RequestTemplate, logging_config_of, read_request_file, run_tasks, run_threads
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status = 503 if self.path == "/unavailable" else 200
+        body = b"response body"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("localhost", 0), OkHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return f"http://localhost:{sock.getsockname()[1]}"
+
+
+def test_closed_loop_records_every_request(server_url):
+    templates = [RequestTemplate("GET", f"{server_url}/items"), RequestTemplate("GET", f"{server_url}/unavailable")]
+
+    result = run_threads(templates, concurrency=2, duration_s=0.3)
+
+    assert result.requests > 0
+    assert sum(result.statuses.values()) == result.requests
+    assert set(result.statuses) == {200, 503}
+    assert result.histogram.errors == result.statuses[503]
+    assert result.error_rate == pytest.approx(result.statuses[503] / result.requests)
+
+
+def test_open_loop_sends_at_the_rate(server_url):
+    result = run_threads([RequestTemplate("GET", f"{server_url}/items")], concurrency=2, duration_s=0.5, rate=40)
+
+    assert result.requests == 20
+    assert result.histogram.percentile(50) > 0
+
+
+def test_exceptions_are_counted_as_errors():
+    result = run_threads([RequestTemplate("GET", closed_port_url())], concurrency=1, duration_s=0.2, rate=20)
+
+    assert result.errors == {"ConnectionError": result.requests}
+    assert result.error_rate == 1.0
+
+
+def test_asyncio_tasks(server_url):
+    template = RequestTemplate("POST", f"{server_url}/items", {"x-foo": "bar"}, b"request body")
+
+    result = asyncio.run(run_tasks([template], concurrency=4, duration_s=0.3))
+
+    assert result.requests > 0
+    assert result.statuses == {200: result.requests}
+
+
+def test_logging_modes():
+    assert logging_config_of("full") == {}
+    assert logging_config_of("off") == {"request_logging_enabled": False, "response_logging_enabled": False}
+    assert logging_config_of("sampled", 0.5)["logging_sampler"].rate == 0.5
+    with pytest.raises(ValueError):
+        logging_config_of("verbose")
+
+
+def test_read_request_file(tmp_path):
+    path = tmp_path / "requests.txt"
+    path.write_text("# The hot routes\nhttp://localhost/items\n\npost http://localhost/orders\n")
+
+    assert read_request_file(str(path)) == [
+        RequestTemplate("GET", "http://localhost/items"),
+        RequestTemplate("POST", "http://localhost/orders"),
+    ]
+
+
+def test_read_empty_request_file(tmp_path):
+    path = tmp_path / "requests.txt"
+    path.write_text("# Nothing yet\n")
+
+    with pytest.raises(ValueError):
+        read_request_file(str(path))
+
+
+@pytest.mark.parametrize("mode, logged", [("full", True), ("off", False)])
+def test_main_reports_as_json(server_url, tmp_path, capsys, mode, logged):
+    log_file = tmp_path / "records.log"
+
+    exit_code = loadgen.main(
+        [f"{server_url}/items", "-c", "2", "-d", "0.2", "--logging", mode, "--log-file", str(log_file), "--json"]
+    )
+
+    report = json.loads(capsys.readouterr().out)
+    assert exit_code == 0
+    assert report["logging"] == mode
+    assert report["requests"] > 0 and report["statuses"] == {"200": report["requests"]}
+    assert set(report["percentiles_ms"]) >= {"50", "99", "99.9"}
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert bool(records) is logged
+    assert all(record["message"] in ("REQUEST", "RESPONSE") for record in records)
+
+
+def test_main_prints_a_report(server_url, capsys):
+    loadgen.main([f"{server_url}/items", "-c", "1", "-d", "0.2", "--rate", "20", "--logging", "sampled"])
+
+    report = capsys.readouterr().out
+    assert "Throughput:" in report and "p99.9" in report and "logging: sampled" in report
+
+
+def test_main_sends_the_headers(mocker):
+    run = mocker.patch.object(loadgen, "run_threads", side_effect=RuntimeError("stop"))
+
+    with pytest.raises(RuntimeError):
+        loadgen.main(["http://localhost/items", "-H", " X-Trace :  a:b ", "-H", "Accept:"])
+
+    (template,) = run.call_args.args[0]
+    assert template.headers == {"X-Trace": "a:b", "Accept": ""}
+
+
+@pytest.mark.parametrize("header", ["X-Trace", ": value", " : value"])
+def test_main_rejects_invalid_headers(capsys, header):
+    with pytest.raises(SystemExit) as exit_info:
+        loadgen.main(["http://localhost/items", "-H", header])
+
+    assert exit_info.value.code == 2
+    assert f"invalid header {header!r}" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("sample_rate", ["-0.1", "1.5", "half"])
+def test_main_rejects_invalid_sample_rates(capsys, sample_rate):
+    with pytest.raises(SystemExit) as exit_info:
+        loadgen.main(["http://localhost/items", "--sample-rate", sample_rate])
+
+    assert exit_info.value.code == 2
+    assert "--sample-rate" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("option", [["-X", "POST"], ["-H", "Accept: */*"], ["--data", "{}"]])
+def test_main_rejects_the_url_options_with_a_request_file(tmp_path, capsys, option):
+    path = tmp_path / "requests.txt"
+    path.write_text("http://localhost/items\n")
+
+    with pytest.raises(SystemExit) as exit_info:
+        loadgen.main(["-f", str(path), *option])
+
+    assert exit_info.value.code == 2
+    assert "--request-file" in capsys.readouterr().err
+
+
+def test_main_reports_the_missing_asyncio_dependency(mocker, capsys):
+    mocker.patch.dict("sys.modules", {"httpx": None})
+
+    with pytest.raises(SystemExit) as exit_info:
+        loadgen.main(["http://localhost/items", "--mode", "asyncio"])
+
+    assert exit_info.value.code == 2
+    assert "requires httpx" in capsys.readouterr().err
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from requests import ConnectionError
+
+import logging_http_client
+from logging_http_client import LogAggregator, RouteNormalizer
+from logging_http_client.logging_http_client_config import (
+    disable_log_aggregation,
+    enable_log_aggregation,
+    set_response_logging_hooks,
+    set_route_normalizer,
+)
+
+
+def aggregate_records(caplog):
+    return [r.http for r in caplog.records if r.msg == "AGGREGATE"]
+
+
+# Tests for LogAggregator ===================================================================================
+
+
+@pytest.mark.parametrize("kwargs", [{"window_s": 0}, {"max_keys": 0}])
+def test_aggregator_rejects_invalid_bounds(kwargs):
+    with pytest.raises(ValueError):
+        LogAggregator(**kwargs)
+
+
+def test_repeated_exchanges_are_collapsed(caplog, given_adapter, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    aggregator = enable_log_aggregation(window_s=60)
+    client = given_client(given_adapter(body=b"pong"))
+
+    for _ in range(5):
+        client.get("http://example.com/health")
+    client.post("http://example.com/health", data=b"ping")
+    client.get("http://example.com/missing?status=404")
+
+    assert caplog.records == []
+    assert aggregator.flush() == 3
+
+    records = {(r["aggregate_method"], r["aggregate_status"]): r for r in aggregate_records(caplog)}
+    health = records[("GET", 200)]
+    assert health["aggregate_host"] == "example.com"
+    assert health["aggregate_route"] == "/health"
+    assert health["aggregate_count"] == 5
+    assert health["aggregate_duration_min_ms"] <= health["aggregate_duration_avg_ms"]
+    assert health["aggregate_duration_avg_ms"] <= health["aggregate_duration_max_ms"]
+    assert health["aggregate_response_bytes"] == 20
+    assert health["aggregate_sample_request_id"]
+    assert records[("POST", 200)]["aggregate_request_bytes"] == 4
+    assert records[("GET", 404)]["aggregate_count"] == 1
+
+
+def test_routes_come_from_the_route_normalizer(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    set_route_normalizer(RouteNormalizer())
+    aggregator = enable_log_aggregation(window_s=60)
+    client = given_client()
+
+    client.get("http://example.com/jobs/1")
+    client.get("http://example.com/jobs/2")
+    aggregator.flush()
+
+    (record,) = aggregate_records(caplog)
+    assert (record["aggregate_route"], record["aggregate_count"]) == ("/jobs/{id}", 2)
+
+
+def test_only_the_matching_exchanges_are_aggregated(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    enable_log_aggregation(window_s=60, predicate=lambda request: request.path_url == "/health")
+    client = given_client()
+
+    client.get("http://example.com/health")
+    client.get("http://example.com/orders")
+
+    assert [r.msg for r in caplog.records] == ["REQUEST", "RESPONSE"]
+    assert caplog.records[0].http["request_url"] == "http://example.com/orders"
+
+
+def test_new_keys_are_logged_as_usual_once_the_bound_is_reached(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    aggregator = enable_log_aggregation(window_s=60, max_keys=1)
+    client = given_client()
+
+    client.get("http://example.com/first")
+    client.get("http://example.com/second")
+
+    assert [r.msg for r in caplog.records] == ["REQUEST", "RESPONSE"]
+    assert caplog.records[0].http["request_url"] == "http://example.com/second"
+    assert aggregator.stats() == {"keys": 1, "aggregated": 1, "overflow": 1, "summaries": 0}
+
+
+def test_raised_exchanges_are_aggregated_under_their_error(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    aggregator = enable_log_aggregation(window_s=60)
+    client = given_client()
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            client.get("http://example.com/down")
+
+    assert caplog.records == []
+    aggregator.flush()
+    (record,) = aggregate_records(caplog)
+    assert record["aggregate_route"] == "/down"
+    assert record["aggregate_error"] == "ConnectionError"
+    assert record["aggregate_count"] == 2
+    # The status 0 of the raised exchanges is omitted, as any zero value.
+    assert "aggregate_status" not in record
+
+
+def test_raised_exchanges_of_new_keys_are_logged_as_usual_once_the_bound_is_reached(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    aggregator = enable_log_aggregation(window_s=60, max_keys=1)
+    client = given_client()
+
+    client.get("http://example.com/health")
+    with pytest.raises(ConnectionError):
+        client.get("http://example.com/down")
+
+    assert [r.msg for r in caplog.records] == ["REQUEST"]
+    assert caplog.records[0].http["request_url"] == "http://example.com/down"
+    assert aggregator.stats()["overflow"] == 1
+
+
+def test_exchanges_are_logged_as_usual_with_a_custom_response_hook(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    responses = []
+    set_response_logging_hooks([lambda _, response: responses.append(response.status_code)])
+    aggregator = enable_log_aggregation(window_s=60)
+    client = given_client()
+
+    client.get("http://example.com/health")
+
+    assert [r.msg for r in caplog.records] == ["REQUEST"]
+    assert responses == [200]
+    assert aggregator.flush() == 0
+
+
+def test_exchanges_are_logged_as_usual_once_the_aggregator_is_stopped(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    aggregator = enable_log_aggregation(window_s=60)
+    aggregator.shutdown()
+    client = given_client()
+
+    client.get("http://example.com/health")
+    with pytest.raises(ConnectionError):
+        client.get("http://example.com/down")
+
+    assert [r.msg for r in caplog.records] == ["REQUEST", "RESPONSE", "REQUEST"]
+
+
+def test_async_raised_exchanges_are_aggregated_under_their_error(caplog):
+    httpx = pytest.importorskip("httpx")
+    caplog.set_level(logging.INFO, logger="test")
+    aggregator = enable_log_aggregation(window_s=60)
+
+    def refuse(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def scenario():
+        transport = httpx.MockTransport(refuse)
+        async with logging_http_client.create_async(logger=logging.getLogger("test"), transport=transport) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://example.com/down")
+
+    asyncio.run(scenario())
+
+    assert caplog.records == []
+    aggregator.flush()
+    (record,) = aggregate_records(caplog)
+    assert (record["aggregate_error"], record["aggregate_count"]) == ("ConnectError", 1)
+
+
+def test_windows_are_flushed_on_a_timer(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    enable_log_aggregation(window_s=0.05)
+
+    given_client().get("http://example.com/health")
+
+    deadline = time.monotonic() + 2
+    while not aggregate_records(caplog) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert aggregate_records(caplog)[0]["aggregate_count"] == 1
+
+
+def test_disabling_flushes_the_window(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    aggregator = enable_log_aggregation(window_s=60)
+    client = given_client()
+    client.get("http://example.com/health")
+
+    disable_log_aggregation()
+    client.get("http://example.com/health")
+
+    assert [r.msg for r in caplog.records] == ["AGGREGATE", "REQUEST", "RESPONSE"]
+    assert aggregator.stats()["summaries"] == 1
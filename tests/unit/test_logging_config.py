@@ -0,0 +1,148 @@
+import dataclasses
+import logging
+import threading
+
+import pytest
+
+import logging_http_client
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client import LoggingConfig, get_logging_config
+from logging_http_client.logging_http_client_config import (
+    disable_request_logging,
+    disable_response_logging,
+    enable_response_body_logging,
+    set_logging_sampler,
+    set_request_logging_hooks,
+    set_response_logging_hooks,
+)
+
+# Tests for the snapshot ====================================================================================
+
+
+def test_setters_build_a_new_snapshot():
+    before = get_logging_config()
+
+    enable_response_body_logging(True)
+
+    after = get_logging_config()
+    assert after is not before
+    assert after.version == before.version + 1
+    assert after.response_body_logging_enabled
+    assert not before.response_body_logging_enabled
+
+
+def test_snapshot_is_immutable():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        get_logging_config().request_logging_enabled = False
+
+
+def test_getters_return_copies_of_the_hooks():
+    def hook(_, __):
+        pass
+
+    set_request_logging_hooks([hook])
+    config.get_request_logging_hooks().append(hook)
+
+    assert get_logging_config().request_logging_hooks == (hook,)
+    assert config.get_request_logging_hooks() == [hook]
+
+
+@pytest.mark.parametrize(
+    "request_disabled, response_disabled, hooks, logs_requests, logs_responses, logs_nothing",
+    [
+        (False, False, True, True, True, False),
+        (True, False, True, False, True, False),
+        (True, True, True, False, False, True),
+        (False, False, False, False, False, True),
+    ],
+)
+def test_snapshot_precomputes_the_decisions(
+    request_disabled, response_disabled, hooks, logs_requests, logs_responses, logs_nothing
+):
+    disable_request_logging(request_disabled)
+    disable_response_logging(response_disabled)
+    if not hooks:
+        set_request_logging_hooks([])
+        set_response_logging_hooks([])
+
+    settings = get_logging_config()
+
+    assert settings.logs_requests == logs_requests
+    assert settings.logs_responses == logs_responses
+    assert settings.logs_nothing == logs_nothing
+
+
+def test_concurrent_setters_do_not_lose_updates():
+    version = get_logging_config().version
+
+    def toggle():
+        for i in range(500):
+            disable_request_logging(i % 2 == 0)
+
+    threads = [threading.Thread(target=toggle) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert get_logging_config().version == version + 2000
+
+
+def test_snapshot_defaults():
+    settings = LoggingConfig()
+
+    assert settings.request_logging_enabled and settings.response_logging_enabled
+    assert not settings.logs_requests and not settings.logs_responses
+    assert settings.default_hooks_logging_level == logging.INFO
+
+
+# Tests for the sessions ====================================================================================
+
+
+def test_an_exchange_is_logged_with_the_configuration_read_when_it_started(given_client):
+    seen = []
+
+    def request_hook(_, request):
+        seen.append(request.config)
+        # A concurrent change (here, from a hook) does not affect the exchange in flight.
+        set_response_logging_hooks([])
+
+    def response_hook(_, response):
+        seen.append(response.config)
+
+    set_request_logging_hooks([request_hook])
+    set_response_logging_hooks([response_hook])
+
+    given_client().get("http://example.com")
+
+    assert len(seen) == 2
+    assert seen[0] is seen[1]
+    assert get_logging_config().response_logging_hooks == ()
+
+
+def test_an_exchange_skips_everything_when_nothing_is_logged(mocker, given_client):
+    sampler = mocker.Mock()
+    set_logging_sampler(sampler)
+    disable_request_logging()
+    disable_response_logging()
+
+    response = given_client().get("http://example.com")
+
+    assert response.status_code == 200
+    sampler.sample_request.assert_not_called()
+
+
+def test_the_default_hooks_use_the_configuration_of_the_exchange(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+
+    def request_hook(logger, request):
+        enable_response_body_logging(True)
+        logging_http_client.default_request_logging_hook(logger, request)
+
+    set_request_logging_hooks([request_hook])
+
+    given_client().get("http://example.com")
+
+    response_record = caplog.records[-1]
+    assert response_record.msg == "RESPONSE"
+    assert "response_body" not in response_record.http
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+
+import httpx
+import pytest
+
+import logging_http_client
+from logging_http_client import LoggingConfigScope, get_logging_config
+from logging_http_client.http_request_id import uuid4_request_id
+from logging_http_client.logging_http_client_config import (
+    disable_request_logging,
+    set_default_hooks_logging_level,
+    set_request_logging_hooks,
+)
+
+
+def response_records(caplog):
+    return [r for r in caplog.records if r.msg == "RESPONSE"]
+
+
+# Tests for LoggingConfigScope ===============================================================================
+
+
+def test_scope_overrides_the_global_configuration():
+    scope = LoggingConfigScope(response_body_logging_enabled=True)
+
+    resolved = scope.resolve()
+
+    assert resolved.response_body_logging_enabled
+    assert not get_logging_config().response_body_logging_enabled
+    assert resolved.response_logging_hooks == get_logging_config().response_logging_hooks
+
+
+def test_scope_follows_the_global_configuration_changes():
+    scope = LoggingConfigScope(response_body_logging_enabled=True)
+    first = scope.resolve()
+
+    set_default_hooks_logging_level(logging.DEBUG)
+
+    second = scope.resolve()
+    assert second is not first
+    assert second.default_hooks_logging_level == logging.DEBUG
+    assert second.response_body_logging_enabled
+
+
+def test_scope_is_resolved_once_per_global_configuration():
+    scope = LoggingConfigScope(response_body_logging_enabled=True)
+
+    assert scope.resolve() is scope.resolve()
+
+
+def test_scope_recomputes_the_derived_decisions():
+    disable_request_logging()
+
+    resolved = LoggingConfigScope(request_logging_enabled=True).resolve()
+
+    assert resolved.logs_requests
+
+
+def test_scope_stores_the_sequences_as_tuples():
+    def hook(_, __):
+        pass
+
+    scope = LoggingConfigScope(request_logging_hooks=[hook], response_logging_hooks=None, request_id_provider=None)
+
+    assert scope.overrides["request_logging_hooks"] == (hook,)
+    assert scope.resolve().response_logging_hooks == ()
+    assert scope.resolve().request_id_provider is uuid4_request_id
+
+
+@pytest.mark.parametrize("name", ["unknown", "version", "logs_nothing"])
+def test_scope_rejects_unsupported_overrides(name):
+    with pytest.raises(TypeError):
+        LoggingConfigScope(**{name: True})
+
+
+def test_scope_of_a_mapping():
+    scope = LoggingConfigScope.of({"response_body_logging_enabled": True})
+
+    assert scope.overrides == {"response_body_logging_enabled": True}
+    assert LoggingConfigScope.of(scope) is scope
+    assert LoggingConfigScope.of(None) is None
+
+
+# Tests for the clients =====================================================================================
+
+
+def test_clients_have_their_own_configuration(caplog, given_adapter, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    adapter = given_adapter(body=b"response body", headers={"Content-Type": "text/plain"})
+    verbose = given_client(adapter, logging_config={"response_body_logging_enabled": True})
+    cheap = given_client(adapter)
+
+    verbose.get("http://example.com/verbose")
+    cheap.get("http://example.com/cheap")
+
+    verbose_record, cheap_record = response_records(caplog)
+    assert verbose_record.http["response_body"] == "response body"
+    assert "response_body" not in cheap_record.http
+    assert verbose.logging_config.overrides == {"response_body_logging_enabled": True}
+    assert cheap.logging_config is None
+
+
+def test_client_scope_applies_to_disposable_sessions(caplog, given_adapter):
+    caplog.set_level(logging.INFO, logger="test")
+    client = logging_http_client.create(
+        logger=logging.getLogger("test"),
+        reusable_session=False,
+        logging_config=LoggingConfigScope(request_logging_enabled=False),
+    )
+    session = client.session
+    session.mount("http://", given_adapter())
+
+    session.get("http://example.com")
+
+    assert [r.msg for r in caplog.records] == ["RESPONSE"]
+
+
+def test_client_scope_can_override_the_hooks(given_client):
+    seen = []
+    set_request_logging_hooks([lambda _, request: seen.append("global")])
+    client = given_client(logging_config={"request_logging_hooks": [lambda _, request: seen.append("scoped")]})
+
+    client.get("http://example.com")
+
+    assert seen == ["scoped"]
+
+
+def test_async_client_has_its_own_configuration(caplog):
+    caplog.set_level(logging.INFO, logger="test")
+
+    async def exchange():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="response body"))
+        client = logging_http_client.create_async(
+            logger=logging.getLogger("test"),
+            logging_config={"response_body_logging_enabled": True},
+            transport=transport,
+        )
+        async with client:
+            await client.get("http://example.com")
+
+    asyncio.run(exchange())
+
+    assert response_records(caplog)[0].http["response_body"] == "response body"
@@ -0,0 +1,122 @@
+import threading
+from http.cookiejar import Cookie
+
+import pytest
+
+import logging_http_client
+import logging_http_client.logging_default_client as default_client
+from logging_http_client.logging_default_client import (
+    configure_default_client,
+    get_default_client,
+    reset_default_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_default_client_after_each_test():
+    yield
+    configure_default_client()
+
+
+def given_cookie(name="session", value="secret"):
+    return Cookie(
+        0, name, value, None, False, "example.com", True, False, "/", True, False, None, False, None, None, {}
+    )
+
+
+def test_default_client_is_created_once():
+    assert get_default_client() is get_default_client()
+
+
+def test_default_client_is_created_once_across_threads():
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_default_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_default_client_pools_its_sessions():
+    client = get_default_client()
+
+    assert client.session_pool is not None
+    assert client.session_pool.max_size == default_client.DEFAULT_SESSION_POOL_SIZE
+
+
+def test_default_client_never_shares_a_session_between_threads(mocker):
+    sessions, in_use, barrier = [], set(), threading.Barrier(4)
+    lock = threading.Lock()
+
+    def send(session, request, **kwargs):
+        with lock:
+            assert session not in in_use
+            in_use.add(session)
+            sessions.append(session)
+        barrier.wait(timeout=5)
+        with lock:
+            in_use.discard(session)
+        return mocker.Mock(status_code=200)
+
+    mocker.patch("logging_http_client.http_session.LoggingSession.send", autospec=True, side_effect=send)
+    threads = [threading.Thread(target=logging_http_client.get, args=("http://example.com",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 4
+    assert get_default_client().session_pool.stats()["idle"] == 4
+
+
+def test_configure_default_client_sizes_the_session_pool():
+    configure_default_client(session_pool_size=2, session_pool_timeout=0.5)
+
+    pool = get_default_client().session_pool
+
+    assert (pool.max_size, pool.timeout) == (2, 0.5)
+
+
+def test_configure_default_client_rejects_an_empty_session_pool():
+    with pytest.raises(ValueError):
+        configure_default_client(session_pool_size=0)
+
+
+def test_configure_default_client_applies_the_pool_limits():
+    configure_default_client(pool_connections=4, pool_maxsize=32, pool_block=True)
+
+    with get_default_client().session_pool.session() as session:
+        adapter = session.get_adapter("https://example.com")
+
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_block is True
+
+
+def test_reset_default_client_creates_a_new_client():
+    first = get_default_client()
+    reset_default_client()
+    assert get_default_client() is not first
+
+
+def test_default_client_is_forgotten_after_fork():
+    first = get_default_client()
+    default_client._forget_default_client_after_fork()
+    assert get_default_client() is not first
+
+
+def test_default_client_does_not_persist_response_cookies():
+    with get_default_client().session_pool.session() as session:
+        assert session.cookies._policy.set_ok(given_cookie(), None) is False
+
+
+@pytest.mark.parametrize("method", ["get", "post", "put", "delete", "patch", "head", "options"])
+def test_module_helpers_use_the_default_client(mocker, method):
+    client = mocker.Mock()
+    mocker.patch("logging_http_client.get_default_client", return_value=client)
+
+    getattr(logging_http_client, method)("http://example.com")
+
+    getattr(client, method).assert_called_once_with("http://example.com")
@@ -0,0 +1,206 @@
+import logging
+import threading
+
+import pytest
+from requests import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client import default_request_logging_hook
+from logging_http_client.http_snapshot import HttpRequestSnapshot
+from logging_http_client.logging_emission_pipeline import LogEmissionPipeline, OverflowPolicy
+from logging_http_client.logging_http_client_config import enable_async_logging, disable_async_logging
+
+
+def given_logger(mocker):
+    logger = mocker.Mock()
+    logger.isEnabledFor.return_value = True
+    return logger
+
+
+def given_request():
+    request = PreparedRequest()
+    request.method = "GET"
+    request.url = "http://example.com/api"
+    request.headers = CaseInsensitiveDict({"X-Request-Id": "req-001"})
+    return request
+
+
+def blocking_factory(release: threading.Event, started: threading.Event):
+    def factory(exchange):
+        started.set()
+        release.wait(5)
+        return {"http": exchange}
+
+    return factory
+
+
+# Tests for the pipeline ===================================================================================
+
+
+def test_pipeline_emits_records_on_a_worker_thread(mocker):
+    logger = given_logger(mocker)
+    emitting_threads = []
+
+    def factory(exchange):
+        emitting_threads.append(threading.current_thread())
+        return {"http": exchange}
+
+    pipeline = LogEmissionPipeline()
+    pipeline.submit(logger, logging.INFO, "REQUEST", factory, {"request_id": "req-001"})
+
+    assert pipeline.flush(timeout=5)
+    logger.log.assert_called_once_with(logging.INFO, "REQUEST", extra={"http": {"request_id": "req-001"}})
+    assert emitting_threads[0] is not threading.current_thread()
+    assert pipeline.emitted_count == 1
+
+    pipeline.shutdown()
+
+
+def test_pipeline_skips_records_below_the_logger_level(mocker):
+    logger = given_logger(mocker)
+    logger.isEnabledFor.return_value = False
+    factory = mocker.Mock()
+
+    pipeline = LogEmissionPipeline()
+    pipeline.submit(logger, logging.DEBUG, "REQUEST", factory, {})
+    pipeline.flush(timeout=5)
+
+    factory.assert_not_called()
+    logger.log.assert_not_called()
+
+
+def test_pipeline_drops_and_counts_records_when_full(mocker):
+    logger = given_logger(mocker)
+    release, started = threading.Event(), threading.Event()
+
+    pipeline = LogEmissionPipeline(max_queue_size=1, overflow_policy=OverflowPolicy.DROP)
+    pipeline.submit(logger, logging.INFO, "REQUEST", blocking_factory(release, started), {})
+    started.wait(5)
+
+    assert pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: {}, {})
+    assert not pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: {}, {})
+    assert pipeline.dropped_count == 1
+
+    release.set()
+    pipeline.shutdown()
+    assert pipeline.emitted_count == 2
+
+
+def test_pipeline_spills_records_on_the_calling_thread_when_full(mocker):
+    logger = given_logger(mocker)
+    release, started = threading.Event(), threading.Event()
+    spilled_on = []
+
+    pipeline = LogEmissionPipeline(max_queue_size=1, overflow_policy="spill")
+    pipeline.submit(logger, logging.INFO, "REQUEST", blocking_factory(release, started), {})
+    started.wait(5)
+    pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: {}, {})
+    pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: spilled_on.append(threading.current_thread()), {})
+
+    assert spilled_on == [threading.current_thread()]
+    assert pipeline.spilled_count == 1
+    assert pipeline.dropped_count == 0
+
+    release.set()
+    pipeline.shutdown()
+
+
+def test_pipeline_blocks_up_to_the_timeout_before_dropping(mocker):
+    logger = given_logger(mocker)
+    release, started = threading.Event(), threading.Event()
+
+    pipeline = LogEmissionPipeline(max_queue_size=1, overflow_policy=OverflowPolicy.BLOCK, block_timeout=0.01)
+    pipeline.submit(logger, logging.INFO, "REQUEST", blocking_factory(release, started), {})
+    started.wait(5)
+    pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: {}, {})
+
+    assert not pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: {}, {})
+    assert pipeline.dropped_count == 1
+
+    release.set()
+    pipeline.shutdown()
+
+
+def test_pipeline_counts_failed_records(mocker):
+    logger = given_logger(mocker)
+
+    def failing_factory(_):
+        raise ValueError("boom")
+
+    pipeline = LogEmissionPipeline()
+    pipeline.submit(logger, logging.INFO, "REQUEST", failing_factory, {})
+    pipeline.flush(timeout=5)
+
+    assert pipeline.failed_count == 1
+    logger.exception.assert_called_once()
+
+    pipeline.shutdown()
+
+
+def test_pipeline_emits_synchronously_after_shutdown(mocker):
+    logger = given_logger(mocker)
+
+    pipeline = LogEmissionPipeline()
+    pipeline.shutdown()
+    pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: {}, {})
+
+    logger.log.assert_called_once()
+
+
+def test_pipeline_does_not_lose_records_submitted_during_shutdown(mocker):
+    logger = given_logger(mocker)
+    pipeline = LogEmissionPipeline()
+    pipeline.submit(logger, logging.INFO, "REQUEST", lambda e: {}, {})
+    shutting_down = threading.Thread(target=pipeline.shutdown)
+    put_nowait = pipeline._queue.put_nowait
+
+    def put_racing_the_shutdown(item):
+        # The record is queued once the shutdown has started.
+        shutting_down.start()
+        shutting_down.join(0.1)
+        put_nowait(item)
+
+    mocker.patch.object(pipeline._queue, "put_nowait", side_effect=put_racing_the_shutdown)
+    pipeline.submit(logger, logging.INFO, "RESPONSE", lambda e: {}, {})
+    shutting_down.join(5)
+
+    assert [c.args[1] for c in logger.log.call_args_list] == ["REQUEST", "RESPONSE"]
+    assert pipeline.emitted_count == 2
+
+
+def test_pipeline_rejects_non_positive_queue_sizes():
+    with pytest.raises(ValueError):
+        LogEmissionPipeline(max_queue_size=0)
+
+
+# Tests for the configuration ==============================================================================
+
+
+def test_async_logging_is_disabled_by_default():
+    assert config.get_log_emission_pipeline() is None
+
+
+def test_enable_async_logging_replaces_the_previous_pipeline():
+    first = enable_async_logging()
+    second = enable_async_logging(max_queue_size=10, overflow_policy=OverflowPolicy.SPILL)
+
+    assert config.get_log_emission_pipeline() is second
+    assert first is not second
+
+    disable_async_logging()
+    assert config.get_log_emission_pipeline() is None
+
+
+def test_default_request_hook_queues_a_frozen_snapshot(mocker):
+    logger = given_logger(mocker)
+    pipeline = enable_async_logging()
+    submit = mocker.spy(pipeline, "submit")
+
+    default_request_logging_hook(logger, given_request())
+    pipeline.flush(timeout=5)
+
+    exchange = submit.call_args.args[4]
+    assert isinstance(exchange, HttpRequestSnapshot)
+    logger.log.assert_called_once_with(logging.INFO, "REQUEST", extra=mocker.ANY)
+    assert logger.log.call_args.kwargs["extra"]["http"]["request_id"] == "req-001"
@@ -0,0 +1,132 @@
+import io
+import json
+import logging
+import sys
+
+import pytest
+
+import logging_http_client.logging_json as logging_json
+from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.logging_json import BufferedJsonLineHandler, HttpJsonFormatter
+
+
+def given_record(level=logging.INFO, msg="RESPONSE", http=None, exc_info=None) -> logging.LogRecord:
+    record = logging.LogRecord("test", level, __file__, 1, msg, (), exc_info)
+    record.created = 1_700_000_000.25
+    if http is not None:
+        record.http = http
+    return record
+
+
+def test_formatter_writes_the_http_record_as_a_json_line():
+    http = HttpLogRecord(request_id="req-001", response_status=200).to_dict()
+
+    line = HttpJsonFormatter().format(given_record(http=http))
+
+    assert "\n" not in line
+    assert json.loads(line) == {
+        "timestamp": "2023-11-14T22:13:20.250Z",
+        "level": "INFO",
+        "logger": "test",
+        "message": "RESPONSE",
+        "http": {"request_id": "req-001", "response_status": 200},
+    }
+
+
+def test_formatter_writes_records_without_http_record():
+    line = HttpJsonFormatter().format(given_record(msg="hello"))
+
+    assert json.loads(line)["message"] == "hello"
+    assert "http" not in json.loads(line)
+
+
+def test_formatter_writes_the_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = given_record(level=logging.ERROR, exc_info=sys.exc_info())
+
+    assert "ValueError: boom" in json.loads(HttpJsonFormatter().format(record))["exception"]
+
+
+def test_formatter_serializes_unsupported_values_as_strings():
+    line = HttpJsonFormatter(use_orjson=False).format(given_record(http={"value": object}))
+
+    assert json.loads(line)["http"]["value"] == str(object)
+
+
+def test_formatter_serializes_a_record_once(mocker):
+    record = given_record(http={"request_id": "req-001"})
+    first, second = HttpJsonFormatter(use_orjson=False), HttpJsonFormatter(use_orjson=False)
+    first_line = first.format(record)
+    dumps = mocker.spy(json.JSONEncoder, "encode")
+
+    assert second.format(record) == first_line
+    dumps.assert_not_called()
+
+
+def test_formatter_uses_the_given_key():
+    record = given_record()
+    record.custom = {"request_id": "req-001"}
+
+    assert json.loads(HttpJsonFormatter(key="custom").format(record))["custom"] == {"request_id": "req-001"}
+
+
+def test_formatter_uses_orjson_when_installed(mocker):
+    orjson = mocker.Mock()
+    orjson.dumps.return_value = b'{"orjson":true}'
+    mocker.patch.object(logging_json, "orjson", orjson)
+
+    assert HttpJsonFormatter().format(given_record()) == '{"orjson":true}'
+    assert HttpJsonFormatter(use_orjson=False).format(given_record()) != '{"orjson":true}'
+
+
+def test_handler_buffers_the_lines_up_to_its_capacity():
+    stream = io.StringIO()
+    handler = BufferedJsonLineHandler(stream, capacity=3, flush_interval=60)
+
+    handler.handle(given_record(msg="1"))
+    handler.handle(given_record(msg="2"))
+    assert stream.getvalue() == ""
+
+    handler.handle(given_record(msg="3"))
+    assert [json.loads(line)["message"] for line in stream.getvalue().splitlines()] == ["1", "2", "3"]
+
+
+def test_handler_writes_immediately_at_the_flush_level():
+    stream = io.StringIO()
+    handler = BufferedJsonLineHandler(stream, capacity=100, flush_interval=60)
+
+    handler.handle(given_record(msg="1"))
+    handler.handle(given_record(level=logging.ERROR, msg="2"))
+
+    assert len(stream.getvalue().splitlines()) == 2
+
+
+def test_handler_writes_after_the_flush_interval(mocker):
+    stream = io.StringIO()
+    monotonic = mocker.patch("logging_http_client.logging_json.time.monotonic", return_value=100.0)
+    handler = BufferedJsonLineHandler(stream, capacity=100, flush_interval=1.0)
+
+    handler.handle(given_record(msg="1"))
+    assert stream.getvalue() == ""
+
+    monotonic.return_value = 101.5
+    handler.handle(given_record(msg="2"))
+    assert len(stream.getvalue().splitlines()) == 2
+
+
+def test_handler_writes_the_buffered_lines_on_close():
+    stream = io.StringIO()
+    handler = BufferedJsonLineHandler(stream, capacity=100, flush_interval=60)
+
+    handler.handle(given_record(msg="1"))
+    handler.close()
+
+    assert stream.getvalue().endswith("\n")
+    assert json.loads(stream.getvalue())["message"] == "1"
+
+
+def test_handler_rejects_non_positive_capacities():
+    with pytest.raises(ValueError):
+        BufferedJsonLineHandler(io.StringIO(), capacity=0)
@@ -0,0 +1,233 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from requests import ConnectionError, PreparedRequest
+
+import logging_http_client
+from logging_http_client import LatencyHistogram, MetricsRecorder, SeriesKey
+from logging_http_client.logging_http_client_config import (
+    disable_request_logging,
+    disable_response_logging,
+    set_logging_sampler,
+    set_metrics_recorder,
+)
+from logging_http_client.logging_metrics import _BUCKETS, _bucket_range
+from logging_http_client.logging_sampling import RateSampler
+
+
+def given_request(url="http://example.com/users", method="GET"):
+    request = PreparedRequest()
+    request.prepare(method=method, url=url)
+    return request
+
+
+# Tests for LatencyHistogram ================================================================================
+
+
+def test_histogram_percentiles_are_within_the_bucket_precision():
+    histogram = LatencyHistogram()
+    for value_us in range(1, 100_001):
+        histogram.record(value_us)
+
+    assert histogram.count == 100_000
+    assert histogram.percentile(50) == pytest.approx(50.0, rel=0.03)
+    assert histogram.percentile(99) == pytest.approx(99.0, rel=0.03)
+    assert histogram.percentile(100) == 100.0
+    assert histogram.mean_ms == pytest.approx(50.0, rel=0.001)
+
+
+def test_histogram_buckets_cover_the_values_without_gaps():
+    previous_highest = -1
+    for index in range(_BUCKETS):
+        lowest, highest = _bucket_range(index)
+        assert lowest == previous_highest + 1
+        previous_highest = highest
+
+
+def test_histogram_clamps_the_values():
+    histogram = LatencyHistogram()
+
+    histogram.record(-5)
+    histogram.record(10**15)
+
+    assert histogram.min_us == 0
+    assert sum(histogram.counts) == 2
+
+
+def test_histogram_merge():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(1_000)
+    second.record(3_000, error=True)
+
+    merged = LatencyHistogram().merge(first).merge(second)
+
+    assert merged.to_dict()["count"] == 2
+    assert merged.errors == 1
+    assert merged.min_us == 1_000 and merged.max_us == 3_000
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().to_dict() == {
+        "count": 0,
+        "errors": 0,
+        "min_ms": 0.0,
+        "mean_ms": 0.0,
+        "max_ms": 0.0,
+        "p50_ms": 0.0,
+        "p90_ms": 0.0,
+        "p99_ms": 0.0,
+        "p999_ms": 0.0,
+    }
+
+
+# Tests for MetricsRecorder =================================================================================
+
+
+def test_recorder_keys_the_series():
+    recorder = MetricsRecorder()
+
+    recorder.record(given_request("http://example.com/users?page=2"), 200, 5_000_000)
+    recorder.record(given_request("http://example.com/users", "POST"), 503, 7_000_000)
+    recorder.record(given_request("http://example.com:8080/users"), None, 1_000_000)
+
+    snapshot = recorder.snapshot()
+    assert snapshot[SeriesKey("example.com", "GET", "/users", "2xx")].percentile(50) == pytest.approx(5.0, rel=0.03)
+    assert snapshot[SeriesKey("example.com", "POST", "/users", "5xx")].errors == 1
+    assert snapshot[SeriesKey("example.com:8080", "GET", "/users", "error")].errors == 1
+
+
+def test_recorder_uses_the_route_function():
+    recorder = MetricsRecorder(route=lambda request: "/users/{id}")
+
+    recorder.record(given_request("http://example.com/users/1"), 200, 1_000)
+    recorder.record(given_request("http://example.com/users/2"), 200, 1_000)
+
+    assert recorder.snapshot()[SeriesKey("example.com", "GET", "/users/{id}", "2xx")].count == 2
+
+
+def test_recorder_bounds_the_series():
+    recorder = MetricsRecorder(max_series=2)
+
+    for i in range(10):
+        recorder.record(given_request(f"http://example.com/users/{i}"), 200, 1_000)
+
+    snapshot = recorder.snapshot()
+    assert len(snapshot) == 3
+    assert snapshot[SeriesKey("example.com", "GET", "<other>", "2xx")].count == 8
+
+
+def test_recorder_merges_the_threads():
+    recorder = MetricsRecorder()
+    barrier = threading.Barrier(4)
+
+    def record():
+        barrier.wait()
+        for _ in range(1_000):
+            recorder.record(given_request(), 200, 1_000_000)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.record(given_request(), 200, 1_000_000)
+
+    assert recorder.snapshot()[SeriesKey("example.com", "GET", "/users", "2xx")].count == 4_001
+    # The shards of the finished threads were merged once.
+    assert len(recorder._shards) == 1
+
+
+def test_recorder_retires_the_shards_of_short_lived_threads_without_reads():
+    recorder = MetricsRecorder()
+
+    for _ in range(50):
+        thread = threading.Thread(target=recorder.record, args=(given_request(), 200, 1_000_000))
+        thread.start()
+        thread.join()
+
+    # Only the shard of the last thread is left, the others having been merged by the next threads.
+    assert len(recorder._shards) == 1
+    assert recorder.snapshot()[SeriesKey("example.com", "GET", "/users", "2xx")].count == 50
+
+
+def test_recorder_reset():
+    recorder = MetricsRecorder()
+    recorder.record(given_request(), 200, 1_000)
+    thread = threading.Thread(target=recorder.record, args=(given_request(), 200, 1_000))
+    thread.start()
+    thread.join()
+
+    recorder.reset()
+    assert recorder.snapshot() == {}
+
+    recorder.record(given_request(), 200, 1_000)
+    assert recorder.snapshot()[SeriesKey("example.com", "GET", "/users", "2xx")].count == 1
+
+
+# Tests for the sessions ====================================================================================
+
+
+def test_session_records_every_exchange_once(given_client):
+    recorder = MetricsRecorder()
+    set_metrics_recorder(recorder)
+    client = given_client()
+
+    client.get("http://example.com/items?status=201")
+    client.get("http://example.com/redirect")
+    with pytest.raises(ConnectionError):
+        client.get("http://example.com/down")
+
+    assert {key: histogram.count for key, histogram in recorder.snapshot().items()} == {
+        SeriesKey("example.com", "GET", "/items", "2xx"): 1,
+        SeriesKey("example.com", "GET", "/redirect", "2xx"): 1,
+        SeriesKey("example.com", "GET", "/down", "error"): 1,
+    }
+
+
+def test_session_records_the_exchanges_that_are_not_logged(given_client):
+    recorder = MetricsRecorder()
+    set_metrics_recorder(recorder)
+    set_logging_sampler(RateSampler(0.0))
+    disable_request_logging()
+    disable_response_logging()
+
+    given_client().get("http://example.com/items")
+
+    assert sum(histogram.count for histogram in recorder.snapshot().values()) == 1
+
+
+def test_session_survives_a_failing_recorder(mocker, caplog, given_client):
+    recorder = mocker.Mock(spec=MetricsRecorder)
+    recorder.record.side_effect = RuntimeError("boom")
+    set_metrics_recorder(recorder)
+
+    response = given_client().get("http://example.com/items")
+
+    assert response.status_code == 200
+    assert "Error recording exchange metrics" in caplog.text
+
+
+def test_client_scope_can_enable_the_metrics(given_client):
+    recorder = MetricsRecorder()
+    client = given_client(logging_config={"metrics_recorder": recorder})
+
+    client.get("http://example.com/items")
+    given_client().get("http://example.com/items")
+
+    assert sum(histogram.count for histogram in recorder.snapshot().values()) == 1
+
+
+def test_async_session_records_every_exchange():
+    recorder = MetricsRecorder()
+    set_metrics_recorder(recorder)
+
+    async def exchange():
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+        async with logging_http_client.create_async(transport=transport) as client:
+            await client.get("http://example.com/items")
+
+    asyncio.run(exchange())
+
+    assert recorder.snapshot()[SeriesKey("example.com", "GET", "/items", "4xx")].count == 1
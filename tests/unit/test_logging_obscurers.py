@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 import pytest
 from requests import Response, PreparedRequest
 
@@ -106,7 +108,7 @@ def test_response_obscurers_functionality():
     response = Response()
     response.status_code = 200
     response._content = b"original_response_body"
-    response.elapsed = type("Elapsed", (object,), {"microseconds": 5000})()
+    response.elapsed = timedelta(microseconds=5000)
 
     request = PreparedRequest()
     # noinspection PyTypeChecker
@@ -0,0 +1,114 @@
+import logging
+import threading
+
+import pytest
+from requests import PreparedRequest
+
+from logging_http_client import LogRateLimiter
+from logging_http_client.logging_http_client_config import (
+    disable_log_rate_limit,
+    enable_log_aggregation,
+    enable_log_rate_limit,
+)
+
+
+def given_request(url="http://example.com/items"):
+    request = PreparedRequest()
+    request.prepare(method="GET", url=url)
+    return request
+
+
+def summaries(caplog):
+    return {r.http["suppressed_key"]: r.http["suppressed_count"] for r in caplog.records if r.msg == "SUPPRESSED"}
+
+
+# Tests for LogRateLimiter ==================================================================================
+
+
+@pytest.mark.parametrize("kwargs", [{"rate": 0}, {"rate": 1, "summary_interval_s": 0}])
+def test_limiter_rejects_invalid_rates(kwargs):
+    with pytest.raises(ValueError):
+        LogRateLimiter(**kwargs)
+
+
+def test_limiter_allows_the_burst_then_the_rate(mocker, caplog):
+    caplog.set_level(logging.INFO, logger="test")
+    clock = mocker.patch("logging_http_client.logging_rate_limit.time.monotonic", return_value=100.0)
+    limiter = LogRateLimiter(rate=2, burst=3)
+    logger = logging.getLogger("test")
+
+    assert [limiter.allow(logger, logging.INFO, given_request()) for _ in range(4)] == [True, True, True, False]
+
+    clock.return_value = 100.5
+    assert limiter.allow(logger, logging.INFO, given_request())
+    assert not limiter.allow(logger, logging.INFO, given_request())
+
+
+def test_limiter_keys_the_buckets_by_host(caplog):
+    caplog.set_level(logging.INFO, logger="test")
+    limiter = LogRateLimiter(rate=1, summary_interval_s=60)
+    logger = logging.getLogger("test")
+
+    assert limiter.allow(logger, logging.INFO, given_request("http://first.com"))
+    assert limiter.allow(logger, logging.INFO, given_request("http://second.com"))
+    assert not limiter.allow(logger, logging.INFO, given_request("http://first.com/other"))
+
+
+def test_limiter_bounds_the_keys(caplog):
+    caplog.set_level(logging.INFO, logger="test")
+    limiter = LogRateLimiter(rate=1, max_keys=1, summary_interval_s=60)
+    logger = logging.getLogger("test")
+
+    assert limiter.allow(logger, logging.INFO, given_request("http://first.com"))
+    assert limiter.allow(logger, logging.INFO, given_request("http://second.com"))
+    assert not limiter.allow(logger, logging.INFO, given_request("http://third.com"))
+
+    assert set(limiter._buckets) == {"first.com", "<other>"}
+
+
+def test_limiter_counts_every_suppressed_record_across_threads(caplog):
+    caplog.set_level(logging.INFO, logger="test")
+    limiter = LogRateLimiter(rate=0.001, burst=1, summary_interval_s=60)
+    logger = logging.getLogger("test")
+
+    def log():
+        for _ in range(1_000):
+            limiter.allow(logger, logging.INFO, given_request())
+
+    threads = [threading.Thread(target=log) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    limiter.flush()
+
+    assert summaries(caplog) == {"example.com": 3_999}
+
+
+# Tests for the default hooks ===============================================================================
+
+
+def test_default_hooks_records_are_rate_limited(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    enable_log_rate_limit(rate=0.001, burst=4, summary_interval_s=60)
+    client = given_client()
+
+    for _ in range(5):
+        client.get("http://example.com/items")
+    disable_log_rate_limit()
+
+    assert [r.msg for r in caplog.records] == ["REQUEST", "RESPONSE", "REQUEST", "RESPONSE", "SUPPRESSED"]
+    assert summaries(caplog) == {"example.com": 6}
+
+
+def test_aggregated_exchanges_take_no_token(caplog, given_client):
+    caplog.set_level(logging.INFO, logger="test")
+    enable_log_rate_limit(rate=0.001, burst=1, summary_interval_s=60)
+    enable_log_aggregation(window_s=60, predicate=lambda request: request.path_url == "/health")
+    client = given_client()
+
+    for _ in range(3):
+        client.get("http://example.com/health")
+    client.get("http://example.com/items")
+
+    assert [r.msg for r in caplog.records] == ["REQUEST"]
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from requests import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_log_record import HttpLogRecord
+from logging_http_client.logging_redaction import RedactionRules, Redactor
+
+
+def given_record(**fields) -> HttpLogRecord:
+    record = HttpLogRecord()
+    for name, value in fields.items():
+        setattr(record, name, value)
+    return record
+
+
+def test_compile_returns_a_redactor():
+    assert isinstance(RedactionRules().compile(), Redactor)
+
+
+def test_redactor_redacts_the_headers_case_insensitively():
+    redactor = RedactionRules(headers=("Authorization", "set-cookie")).compile()
+    record = given_record(
+        request_headers={"authorization": "Bearer secret", "Accept": "*/*"},
+        response_headers={"Set-Cookie": "session=secret"},
+    )
+
+    redactor(record)
+
+    assert record.request_headers == {"authorization": "****", "Accept": "*/*"}
+    assert record.response_headers == {"Set-Cookie": "****"}
+
+
+def test_redactor_keeps_the_headers_without_matches_as_is():
+    redactor = RedactionRules(headers=("authorization",)).compile()
+    headers = {"Accept": "*/*"}
+
+    record = redactor(given_record(request_headers=headers))
+
+    assert record.request_headers is headers
+
+
+def test_redactor_redacts_the_query_params_and_the_url():
+    redactor = RedactionRules(query_params=("api_key",)).compile()
+    record = given_record(
+        request_url="https://example.com/search?q=python&API_KEY=secret#top",
+        request_query_params={"q": "python", "api_key": "secret"},
+    )
+
+    redactor(record)
+
+    assert record.request_url == "https://example.com/search?q=python&API_KEY=****#top"
+    assert record.request_query_params == {"q": "python", "api_key": "****"}
+
+
+@pytest.mark.parametrize(
+    "path, body, expected",
+    [
+        ("password", {"user": "bob", "password": "secret"}, {"user": "bob", "password": "****"}),
+        ("user.ssn", {"user": {"ssn": "123", "name": "bob"}}, {"user": {"ssn": "****", "name": "bob"}}),
+        ("cards.*.number", {"cards": [{"number": "4111"}, {"number": "5500"}]}, {"cards": [{"number": "****"}] * 2}),
+        ("*.token", {"a": {"token": "x"}, "b": {"token": "y"}}, {"a": {"token": "****"}, "b": {"token": "****"}}),
+        ("0.token", [{"token": "x"}, {"token": "y"}], [{"token": "****"}, {"token": "y"}]),
+        ("missing.path", {"missing": "as-is"}, {"missing": "as-is"}),
+    ],
+)
+def test_redactor_redacts_the_json_body_fields(path, body, expected):
+    redactor = RedactionRules(json_fields=(path,)).compile()
+
+    record = redactor(given_record(request_body=json.dumps(body), response_body=json.dumps(body)))
+
+    assert json.loads(record.request_body) == expected
+    assert json.loads(record.response_body) == expected
+
+
+def test_redactor_redacts_the_json_fields_of_truncated_bodies_by_name():
+    redactor = RedactionRules(json_fields=("user.password", "pin")).compile()
+    body = '{"user": {"password": "sec\\"ret"}, "pin": 1234, "items": ["...[truncated 42 bytes]...'
+
+    record = redactor(given_record(response_body=body))
+
+    assert record.response_body == '{"user": {"password": "****"}, "pin": "****", "items": ["...[truncated 42 bytes]...'
+
+
+def test_redactor_redacts_the_patterns_from_the_bodies_and_the_url():
+    redactor = RedactionRules(patterns=(r"\b\d{16}\b", r"sk_live_\w+")).compile()
+    record = given_record(
+        request_url="https://example.com/cards/4111111111111111",
+        request_body="card=4111111111111111&key=sk_live_abc123",
+        response_body="not a json body with sk_live_xyz",
+    )
+
+    redactor(record)
+
+    assert record.request_url == "https://example.com/cards/****"
+    assert record.request_body == "card=****&key=****"
+    assert record.response_body == "not a json body with ****"
+
+
+def test_redactor_uses_the_given_replacement():
+    redactor = RedactionRules(headers=("authorization",), replacement="[REDACTED]").compile()
+
+    record = redactor(given_record(request_headers={"Authorization": "secret"}))
+
+    assert record.request_headers == {"Authorization": "[REDACTED]"}
+
+
+def test_redactor_plugs_into_the_obscurer_slot():
+    config.set_request_log_record_obscurers([RedactionRules(headers=("authorization",)).compile()])
+    request = PreparedRequest()
+    request.method = "GET"
+    request.url = "https://example.com"
+    request.headers = CaseInsensitiveDict({"Authorization": "Bearer secret"})
+    request.body = None
+
+    record = HttpLogRecord.from_request(request)
+
+    assert record["http"]["request_headers"] == {"Authorization": "****"}
+
+
+def test_redactor_redacts_the_json_fields_matching_a_trailing_wildcard():
+    redactor = RedactionRules(json_fields=("secrets.*",)).compile()
+
+    record = redactor(given_record(request_body='{"secrets": {"a": 1, "b": [2]}, "public": 3}'))
+
+    assert json.loads(record.request_body) == {"secrets": {"a": "****", "b": "****"}, "public": 3}
+
+
+def test_redactor_does_not_parse_json_bodies_without_the_field_names(mocker):
+    loads = mocker.patch("logging_http_client.logging_redaction.json.loads")
+    redactor = RedactionRules(json_fields=("password",)).compile()
+
+    record = redactor(given_record(request_body='{"user": "bob"}'))
+
+    assert record.request_body == '{"user": "bob"}'
+    loads.assert_not_called()
@@ -0,0 +1,206 @@
+from datetime import timedelta
+
+import pytest
+from requests import PreparedRequest, Response, ConnectionError
+
+import logging_http_client.logging_http_client_config_globals as config
+from logging_http_client.http_session import LoggingSession
+from logging_http_client.logging_http_client_config import set_logging_sampler
+from logging_http_client.logging_sampling import (
+    RateSampler,
+    RouteRateSampler,
+    Sampler,
+    SamplingDecision,
+    TailSampler,
+)
+
+
+def given_session(mocker, adapter):
+    session = LoggingSession("TEST", mocker.Mock())
+    session.mount("http://", adapter)
+    return session
+
+
+def given_recording_hooks():
+    requests, responses = [], []
+    config.set_request_logging_hooks([lambda _, r: requests.append(r)])
+    config.set_response_logging_hooks([lambda _, r: responses.append(r)])
+    return requests, responses
+
+
+def given_request(url):
+    request = PreparedRequest()
+    request.url = url
+    return request
+
+
+def given_response(status=200, elapsed_ms=0):
+    response = Response()
+    response.status_code = status
+    response.elapsed = timedelta(milliseconds=elapsed_ms)
+    return response
+
+
+# Tests for the samplers ===================================================================================
+
+
+@pytest.mark.parametrize("rate", [-0.1, 1.1])
+def test_rate_sampler_rejects_invalid_rates(rate):
+    with pytest.raises(ValueError):
+        RateSampler(rate)
+
+
+def test_rate_sampler_samples_the_configured_percentage(mocker):
+    mocker.patch("logging_http_client.logging_sampling.random.random", side_effect=[0.05, 0.5])
+    sampler = RateSampler(0.1)
+
+    assert sampler.sample_request(given_request("http://a.com")) == SamplingDecision(True, 0.1)
+    assert sampler.sample_request(given_request("http://a.com")) == SamplingDecision(False, 0.1)
+
+
+@pytest.mark.parametrize(
+    "url, expected_rate",
+    [
+        ("http://api.example.com/users/1", 0.5),
+        ("http://API.EXAMPLE.COM/users/1", 0.5),
+        ("http://other.example.com/health", 0.0),
+        ("http://other.example.com/users", 0.2),
+        ("http://unknown.com/", 1.0),
+    ],
+)
+def test_route_rate_sampler_matches_hosts_then_patterns(url, expected_rate):
+    sampler = RouteRateSampler(
+        {
+            "api.example.com": 0.5,
+            "*.example.com/health*": 0.0,
+            "other.example.com/*": 0.2,
+        }
+    )
+    assert sampler.rate_for(given_request(url)) == expected_rate
+
+
+@pytest.mark.parametrize(
+    "url, expected_rate",
+    [
+        ("http://api.example.com/Users/1", 0.3),
+        ("http://API.example.com/Users/1", 0.3),
+        ("http://api.example.com/users/1", 1.0),
+    ],
+)
+def test_route_rate_sampler_matches_the_paths_case_sensitively(url, expected_rate):
+    sampler = RouteRateSampler({"API.Example.com/Users/*": 0.3})
+    assert sampler.rate_for(given_request(url)) == expected_rate
+
+
+def test_tail_sampler_keeps_errors_and_slow_responses():
+    sampler = TailSampler(RateSampler(0.0), error_status=500, slow_threshold_ms=1000)
+    decision = sampler.sample_request(given_request("http://a.com"))
+
+    assert sampler.sample_response(decision, given_response(503)) == SamplingDecision(True, 1.0, "error")
+    assert sampler.sample_response(decision, given_response(200, 1500)) == SamplingDecision(True, 1.0, "slow")
+    assert sampler.sample_response(decision, given_response(200, 10)) == SamplingDecision(False, 0.0, "head")
+
+
+def test_only_the_samplers_overriding_the_tail_sampling_have_tail_rules():
+    class StatusSampler(Sampler):
+        def keep_response(self, decision, response):
+            return "status" if response.status_code == 429 else None
+
+    assert not Sampler().has_tail_rules
+    assert not RateSampler(0.5).has_tail_rules
+    assert TailSampler(RateSampler(0.5)).has_tail_rules
+    assert StatusSampler().has_tail_rules
+
+
+# Tests for the session ====================================================================================
+
+
+def test_session_logs_everything_without_a_sampler(mocker, given_adapter):
+    requests, responses = given_recording_hooks()
+
+    given_session(mocker, given_adapter()).get("http://example.com/")
+
+    assert len(requests) == 1 and len(responses) == 1
+    assert requests[0].sampling is None
+
+
+def test_session_skips_hooks_of_exchanges_not_sampled(mocker, given_adapter):
+    requests, responses = given_recording_hooks()
+    set_logging_sampler(RateSampler(0.0))
+
+    given_session(mocker, given_adapter()).get("http://example.com/")
+
+    assert requests == [] and responses == []
+
+
+def test_session_attaches_the_sampling_decision_to_the_records(mocker, given_adapter):
+    set_logging_sampler(RateSampler(1.0))
+    session = given_session(mocker, given_adapter())
+
+    session.get("http://example.com/")
+
+    for call in session._logger.log.call_args_list:
+        assert call.kwargs["extra"]["http"]["sampling_rate"] == 1.0
+        assert call.kwargs["extra"]["http"]["sampling_reason"] == "head"
+
+
+def test_session_logs_request_late_for_exchanges_kept_by_a_tail_rule(mocker, given_adapter):
+    requests, responses = given_recording_hooks()
+    set_logging_sampler(TailSampler(RateSampler(0.0)))
+
+    given_session(mocker, given_adapter(status=500)).get("http://example.com/")
+
+    assert len(requests) == 1 and len(responses) == 1
+    assert requests[0].sampling == SamplingDecision(True, 1.0, "error")
+    assert responses[0].sampling == SamplingDecision(True, 1.0, "error")
+
+
+def test_session_records_re_weight_to_the_exchange_counts_with_tail_rules(mocker, given_adapter):
+    # The head sampler samples every other exchange, the errors being kept by the tail rule either way.
+    mocker.patch("logging_http_client.logging_sampling.random.random", side_effect=[0.1, 0.9] * 4)
+    requests, responses = given_recording_hooks()
+    set_logging_sampler(TailSampler(RateSampler(0.5)))
+    session = given_session(mocker, given_adapter())
+
+    for status in (200, 200, 200, 200, 500, 500, 500, 500):
+        session.get(f"http://example.com/?status={status}")
+
+    assert sum(1 / record.sampling.rate for record in requests) == 8
+    assert sum(1 / record.sampling.rate for record in responses) == 8
+    assert sum(1 / record.sampling.rate for record in responses if record.status_code == 500) == 4
+    assert [record.sampling for record in requests] == [record.sampling for record in responses]
+
+
+def test_session_logs_request_with_the_head_decision_of_exchanges_kept_up_front(mocker, given_adapter):
+    requests, responses = given_recording_hooks()
+    set_logging_sampler(TailSampler(RateSampler(1.0)))
+
+    given_session(mocker, given_adapter()).get("http://example.com/")
+
+    assert requests[0].sampling == responses[0].sampling == SamplingDecision(True, 1.0, "head")
+
+
+def test_session_logs_request_of_exchanges_raising_an_exception(mocker, given_adapter):
+    requests, responses = given_recording_hooks()
+    set_logging_sampler(TailSampler(RateSampler(0.0)))
+
+    with pytest.raises(ConnectionError):
+        given_session(mocker, given_adapter(exception=ConnectionError("down"))).get("http://example.com/")
+
+    assert len(requests) == 1 and responses == []
+    assert requests[0].sampling.reason == "exception"
+
+
+def test_session_logs_everything_when_the_sampler_fails(mocker, given_adapter):
+    class FailingSampler(Sampler):
+        def rate_for(self, request):
+            raise ValueError("boom")
+
+    requests, responses = given_recording_hooks()
+    set_logging_sampler(FailingSampler())
+    session = given_session(mocker, given_adapter())
+
+    session.get("http://example.com/")
+
+    assert len(requests) == 1 and len(responses) == 1
+    session._logger.exception.assert_called_once()
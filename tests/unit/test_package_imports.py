@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import logging_http_client
+
+# The budget of `import logging_http_client`, in microseconds (requests alone takes ~70ms on a laptop).
+IMPORT_TIME_BUDGET_US = 50_000
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def imported_modules(importtime_output: str) -> dict:
+    # The `-X importtime` lines read: "import time: <self us> | <cumulative us> | <indented module name>".
+    modules = {}
+    for line in importtime_output.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_import_time_is_within_budget():
+    modules = imported_modules(run_python("-X", "importtime", "-c", "import logging_http_client").stderr)
+
+    assert modules["logging_http_client"] < IMPORT_TIME_BUDGET_US
+    assert not {"requests", "urllib3", "dataclasses"} & set(modules)
+    assert [name for name in modules if name.startswith("logging_http_client")] == ["logging_http_client"]
+
+
+def test_re_exports_are_imported_on_first_access():
+    from requests.exceptions import Timeout
+
+    from logging_http_client.logging_metrics import MetricsRecorder
+
+    assert logging_http_client.Timeout is Timeout
+    assert logging_http_client.MetricsRecorder is MetricsRecorder
+    assert "MetricsRecorder" in vars(logging_http_client)
+    assert "MetricsRecorder" in dir(logging_http_client)
+
+
+def test_every_exported_name_resolves():
+    for name in logging_http_client.__all__:
+        assert getattr(logging_http_client, name) is not None
+
+
+def test_star_import_does_not_need_the_optional_dependencies():
+    script = textwrap.dedent("""
+        import sys
+
+        sys.modules["httpx"] = None  # i.e. NOT installed, importing it raises ImportError.
+
+        from logging_http_client import *
+
+        print("AsyncLoggingHttpClient" in globals(), LoggingHttpClient.__name__)
+        """)
+
+    output = run_python("-c", script).stdout
+
+    assert output.strip() == "False LoggingHttpClient"
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        logging_http_client.NotAThing
+
+
+def test_default_hooks_are_installed_by_the_first_client():
+    script = textwrap.dedent("""
+        import logging_http_client
+
+        logging_http_client.create()
+        config = logging_http_client.get_logging_config()
+        print([hook.__name__ for hook in config.request_logging_hooks + config.response_logging_hooks])
+        """)
+
+    output = run_python("-c", script).stdout
+
+    assert output.strip() == "['default_request_logging_hook', 'default_response_logging_hook']"
+
+
+def test_default_hooks_do_not_replace_the_hooks_set_before_the_first_client():
+    script = textwrap.dedent("""
+        import logging_http_client
+
+        logging_http_client.set_request_logging_hooks([])
+        logging_http_client.create()
+        config = logging_http_client.get_logging_config()
+        print(len(config.request_logging_hooks), config.response_logging_hooks[0].__name__)
+        """)
+
+    output = run_python("-c", script).stdout
+
+    assert output.strip() == "0 default_response_logging_hook"